@@ -0,0 +1,29 @@
+from django.contrib import admin
+
+from audit.models import AuditEntry
+from audit.recorder import record_deletion
+
+
+class AuditAdminMixin:
+    """Records the deletions made in the admin panel, the other changes being recorded by the audit signals."""
+
+    def log_deletion(self, request, obj, object_repr):
+        record_deletion(obj, user=request.user)
+        return super().log_deletion(request, obj, object_repr)
+
+
+@admin.register(AuditEntry)
+class AuditEntryAdmin(admin.ModelAdmin):
+    """Defines how audit entries appear in the admin panel, read-only."""
+
+    list_display = ("id", "model", "object_id", "action", "user", "date_created")
+    list_filter = ("model", "action")
+    list_select_related = ("user",)
+    readonly_fields = ("model", "object_id", "action", "changes", "user", "date_created")
+    ordering = ("-date_created", "-id")
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
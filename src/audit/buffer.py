@@ -0,0 +1,77 @@
+"""In-process buffer of the audit entries, written to the database in batches.
+
+Recording a change only appends it to a list, so writes through the API and the admin panel pay no INSERT.
+A background thread of each process writes the buffered entries with bulk INSERTs every AUDIT["FLUSH_INTERVAL"]
+seconds, or as soon as AUDIT["BATCH_SIZE"] entries are waiting, and the remaining entries are written when
+the process exits. Entries which fail to be written are kept for the next flush. Beyond AUDIT["MAX_PENDING"]
+waiting entries, the writers flush by themselves, so that the buffer stays bounded when the thread lags.
+Entries still buffered when a process is killed are lost.
+"""
+import atexit
+import logging
+import os
+import threading
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections
+
+from audit.models import AuditEntry
+
+logger = logging.getLogger(__name__)
+
+
+class AuditBuffer:
+    def __init__(self):
+        self.reset()
+        os.register_at_fork(after_in_child=self.reset)
+        atexit.register(self.flush)
+
+    def reset(self):
+        """Forgets the entries and the thread inherited from the parent process after a fork."""
+        self.entries = []
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.thread = None
+
+    def add(self, entry):
+        config = settings.AUDIT
+        with self.lock:
+            self.entries.append(entry)
+            pending = len(self.entries)
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, name="audit-flush", daemon=True)
+                self.thread.start()
+        if pending >= config["MAX_PENDING"]:
+            self.flush()
+        elif pending >= config["BATCH_SIZE"]:
+            self.wakeup.set()
+
+    def run(self):
+        while True:
+            self.wakeup.wait(settings.AUDIT["FLUSH_INTERVAL"])
+            self.wakeup.clear()
+            close_old_connections()
+            self.flush()
+
+    def flush(self):
+        """Writes the buffered entries, AUDIT["BATCH_SIZE"] per INSERT. Returns the number of written entries."""
+        with self.flush_lock:
+            with self.lock:
+                entries, self.entries = self.entries, []
+            if not entries:
+                return 0
+            batch_size = settings.AUDIT["BATCH_SIZE"]
+            written = 0
+            try:
+                while written < len(entries):
+                    AuditEntry.objects.bulk_create(entries[written:written + batch_size])
+                    written += len(entries[written:written + batch_size])
+            except DatabaseError:
+                logger.exception("Writing %s audit entries failed, they are kept for the next flush.", len(entries))
+                with self.lock:
+                    self.entries[:0] = entries[written:]
+            return written
+
+
+BUFFER = AuditBuffer()
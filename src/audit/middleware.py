@@ -0,0 +1,18 @@
+from audit.recorder import current_request
+
+
+class AuditMiddleware:
+    """Makes the request available to the audit signals, to record the user making the changes.
+
+    The user is read when a change is recorded, so the users authenticated by the API views are found too.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = current_request.set(request)
+        try:
+            return self.get_response(request)
+        finally:
+            current_request.reset(token)
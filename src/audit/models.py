@@ -0,0 +1,38 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+from eventmanager import settings
+
+
+class AuditEntry(models.Model):
+    """Stores a change of a :model:`crm_api.Client`, :model:`crm_api.Contract`, :model:`crm_api.Event`
+    or :model:`authentication.CustomUser`, with the user who made it.
+
+    changes maps each changed field to its [old, new] values. Entries are written in batches by
+    audit.buffer, date_created being the time of the change rather than of the write.
+    """
+
+    class Action(models.TextChoices):
+        CREATE = 'C', _('Create')
+        UPDATE = 'U', _('Update')
+        DELETE = 'D', _('Delete')
+
+    model = models.CharField(max_length=50)
+    object_id = models.BigIntegerField()
+    action = models.CharField(max_length=1, choices=Action.choices)
+    changes = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    user = models.ForeignKey(to=settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
+    date_created = models.DateTimeField(default=timezone.now)
+
+    objects = models.Manager()
+
+    class Meta:
+        verbose_name_plural = "audit entries"
+        indexes = [
+            models.Index(fields=["model", "object_id", "date_created"], name="audit_object_time_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.id}. {self.model} {self.object_id} - {self.action}"
@@ -0,0 +1,103 @@
+"""Recording of the field-level changes of the audited models, with the user making them.
+
+Entries are handed to audit.buffer once the transaction of the change commits, so that rolled back
+changes are never recorded.
+"""
+import contextvars
+from functools import lru_cache
+
+from django.db import transaction
+from django.utils import timezone
+
+from audit.buffer import BUFFER
+from audit.models import AuditEntry
+
+# Request being served, set by audit.middleware.AuditMiddleware.
+current_request = contextvars.ContextVar("audit_current_request", default=None)
+
+IGNORED_FIELDS = {"version", "date_created", "date_updated", "date_deleted", "last_login"}
+MASKED_FIELDS = {"password"}
+MASK = "********"
+
+
+@lru_cache(maxsize=None)
+def get_audited_fields(model):
+    """Gets the attribute names of the fields of a model whose changes are recorded.
+
+    Bookkeeping fields and the summaries kept by database triggers (SUMMARY_FIELDS) are left out.
+    """
+    excluded = IGNORED_FIELDS | set(getattr(model, "SUMMARY_FIELDS", ()))
+    return tuple(
+        field.attname for field in model._meta.concrete_fields
+        if not field.primary_key and field.attname not in excluded
+    )
+
+
+def get_values(instance, fields=None):
+    """Gets the values of the audited fields of an object, leaving out its deferred fields instead of loading them."""
+    return {
+        name: instance.__dict__[name] for name in fields or get_audited_fields(type(instance))
+        if name in instance.__dict__
+    }
+
+
+def get_changes(previous, current):
+    """Gets the {field: [old, new]} changes between two dicts of values, previous being None for a creation."""
+    changes = {}
+    for name, value in current.items():
+        if previous is None:
+            old = None
+        elif name in previous and previous[name] != value:
+            old = previous[name]
+        else:
+            continue
+        changes[name] = [MASK, MASK] if name in MASKED_FIELDS else [old, value]
+    return changes
+
+
+def get_current_user_id():
+    """Gets the id of the user authenticated by the current request, None outside of a request."""
+    user = getattr(current_request.get(), "user", None)
+    return user.pk if user is not None and user.is_authenticated else None
+
+
+def record(model, object_id, action, changes, user=None):
+    """Records a change of an object, made by user or else by the user of the current request."""
+    entry = AuditEntry(
+        model=model._meta.label_lower,
+        object_id=object_id,
+        action=action,
+        changes=changes,
+        user_id=user.pk if user is not None else get_current_user_id(),
+        date_created=timezone.now(),
+    )
+    transaction.on_commit(lambda: BUFFER.add(entry))
+
+
+def record_deletion(instance, user=None):
+    """Records the deletion of an object with its last values. To call before deleting it."""
+    changes = {
+        name: [MASK if name in MASKED_FIELDS else value, None] for name, value in get_values(instance).items()
+    }
+    record(type(instance), instance.pk, AuditEntry.Action.DELETE, changes, user)
+
+
+def record_queryset_update(queryset, values, user=None):
+    """Records the changes that updating the objects of a queryset with values (QuerySet.update() arguments) makes.
+
+    Reads the current values of the updated fields with one query, so it is called before the update,
+    in its transaction.
+    """
+    model = queryset.model
+    new_values = {}
+    for name, value in values.items():
+        field = model._meta.get_field(name)
+        if field.attname in get_audited_fields(model):
+            new_values[field.attname] = getattr(value, "pk", value)
+    if not new_values:
+        return
+    names = list(new_values)
+    for pk, *old_values in queryset.order_by().values_list("pk", *names):
+        changes = get_changes(dict(zip(names, old_values)), new_values)
+        if changes:
+            record(model, pk, AuditEntry.Action.UPDATE, changes, user)
@@ -0,0 +1,17 @@
+from rest_framework.serializers import ModelSerializer
+
+from audit.models import AuditEntry
+
+
+class AuditEntrySerializer(ModelSerializer):
+    """Serializes objects from :model:`audit.AuditEntry`."""
+
+    class Meta:
+        model = AuditEntry
+        fields = [
+            "id",
+            "action",
+            "changes",
+            "user_id",
+            "date_created",
+        ]
@@ -0,0 +1,54 @@
+from django.db.models.signals import post_save, pre_save
+
+from audit.models import AuditEntry
+from audit.recorder import get_audited_fields, get_changes, get_values, record
+from authentication.models import CustomUser
+from crm_api.models import Client, Contract, Event
+
+AUDITED_MODELS = (Client, Contract, Event, CustomUser)
+
+
+def get_previous_values(instance):
+    """Gets the values of an object before its save, loading them only when the object was not loaded from the database.
+
+    The values loaded with the object (_loaded_values, see from_db) are used until its first save,
+    then the values it was saved with.
+    """
+    previous = instance.__dict__.get("_audit_values")
+    if previous is None:
+        previous = getattr(instance, "_loaded_values", None)
+    if previous is None:
+        previous = (
+            type(instance)._base_manager.filter(pk=instance.pk).values(*get_audited_fields(type(instance))).first()
+        )
+    return previous
+
+
+def remember_previous_values(sender, instance, raw=False, **kwargs):
+    """Keeps the values of an object before it is saved, before other receivers update the loaded values."""
+    if not raw and instance.pk is not None and not instance._state.adding:
+        instance._audit_previous = get_previous_values(instance)
+
+
+def record_saved(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    """Records the fields changed by a save through the API, the admin panel or the application code."""
+    if raw:
+        return
+    previous = None if created else instance.__dict__.pop("_audit_previous", None) or {}
+    fields = None
+    if update_fields is not None:
+        audited = get_audited_fields(sender)
+        fields = [sender._meta.get_field(name).attname for name in update_fields]
+        fields = [name for name in fields if name in audited]
+        if not fields:
+            return
+    current = get_values(instance, fields)
+    instance._audit_values = {**(previous or {}), **current}
+    changes = get_changes(previous, current)
+    if created or changes:
+        record(sender, instance.pk, AuditEntry.Action.CREATE if created else AuditEntry.Action.UPDATE, changes)
+
+
+for model in AUDITED_MODELS:
+    pre_save.connect(remember_previous_values, sender=model, dispatch_uid=f"audit_pre_save_{model._meta.label}")
+    post_save.connect(record_saved, sender=model, dispatch_uid=f"audit_post_save_{model._meta.label}")
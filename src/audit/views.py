@@ -0,0 +1,35 @@
+from django.db import transaction
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from audit.models import AuditEntry
+from audit.recorder import record_deletion
+from audit.serializers import AuditEntrySerializer
+
+
+class AuditHistoryMixin:
+    """Adds the history of the changes of an object to a viewset and records the deletions made through it.
+
+    Manages the following endpoint:
+    /<objects>/:id/history
+    """
+
+    @action(detail=True)
+    def history(self, request, *args, **kwargs):
+        """Lists the recorded changes of the object, the latest first. Accessible to the users who can see the object.
+
+        Changes are written in batches, so the changes of the last seconds may not be listed yet.
+        """
+        instance = self.get_object()
+        queryset = AuditEntry.objects.filter(
+            model=instance._meta.label_lower, object_id=instance.pk
+        ).order_by("-date_created", "-id")
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(AuditEntrySerializer(page, many=True).data)
+        return Response(AuditEntrySerializer(queryset, many=True).data)
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            record_deletion(instance)
+            super().perform_destroy(instance)
@@ -1,11 +1,13 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
 
+from audit.admin import AuditAdminMixin
 from authentication.models import CustomUser
+from crm_api.admin_filters import autocomplete_source
 
 
 @admin.register(CustomUser)
-class CustomUserAdmin(UserAdmin):
+class CustomUserAdmin(AuditAdminMixin, UserAdmin):
     """Defines how custom users appear in the admin panel."""
 
     list_display = ['id', 'first_name', 'last_name', "role"]
@@ -18,5 +20,15 @@ class CustomUserAdmin(UserAdmin):
         ),
     )
 
-    search_fields = ['first_name']
+    search_fields = ['first_name', 'last_name', 'username']
     ordering = ['first_name']
+
+    def get_search_results(self, request, queryset, search_term):
+        """Restricts the autocomplete choices of sales and support contacts to users of the matching role."""
+        queryset, may_have_duplicates = super().get_search_results(request, queryset, search_term)
+        model_name, field_name = autocomplete_source(request)
+        if field_name == "sales_contact":
+            queryset = queryset.filter(role="SA")
+        elif field_name == "support_contact":
+            queryset = queryset.filter(role="SU")
+        return queryset, may_have_duplicates
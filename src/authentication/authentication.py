@@ -0,0 +1,55 @@
+import time
+
+from django.core import signing
+from django.utils.crypto import constant_time_compare, salted_hmac
+from rest_framework.authentication import BaseAuthentication
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt import authentication
+
+from authentication.models import CustomUser
+
+from metrics.instruments import AUTHENTICATION_SECONDS
+
+
+class JWTAuthentication(authentication.JWTAuthentication):
+    """JWTAuthentication recording the duration and result of the authentications in the metrics."""
+
+    def authenticate(self, request):
+        start = time.perf_counter()
+        result = "failure"
+        try:
+            user_auth = super().authenticate(request)
+            result = "anonymous" if user_auth is None else "success"
+            return user_auth
+        finally:
+            AUTHENTICATION_SECONDS.observe(time.perf_counter() - start, result=result)
+
+
+FEED_TOKEN_SALT = "authentication.feed_token"
+
+
+def get_password_digest(user):
+    """Gets a digest of the user's password hash, so that changing the password revokes the feed tokens."""
+    return salted_hmac(FEED_TOKEN_SALT, user.password).hexdigest()[:16]
+
+
+def make_feed_token(user):
+    """Gets the token authenticating a user in the URL of a calendar feed, for clients subscribing by URL."""
+    return signing.Signer(salt=FEED_TOKEN_SALT).sign(f"{user.pk}.{get_password_digest(user)}")
+
+
+class FeedTokenAuthentication(BaseAuthentication):
+    """Authenticates the user of the signed token given in the "token" query parameter, see make_feed_token."""
+
+    def authenticate(self, request):
+        token = request.query_params.get("token")
+        if not token:
+            return None
+        try:
+            user_id, digest = signing.Signer(salt=FEED_TOKEN_SALT).unsign(token).split(".")
+        except (signing.BadSignature, ValueError):
+            raise AuthenticationFailed("Invalid feed token.")
+        user = CustomUser.objects.filter(pk=user_id, is_active=True).first()
+        if user is None or not constant_time_compare(digest, get_password_digest(user)):
+            raise AuthenticationFailed("Invalid feed token.")
+        return user, None
@@ -22,6 +22,13 @@ class CustomUser(AbstractUser):
     def __str__(self):
         return f"{self.username} - {self.role}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Keeps the values loaded from the database, to detect the changed fields when saving."""
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
     def save(self, *args, **kwargs):
         """
         Saves the user's role depending on its group (sales, support, management).
@@ -1,14 +1,94 @@
-from django.contrib import admin
+from django import forms
+from django.contrib import admin, messages
+from django.db import transaction
+from django.http import HttpResponseRedirect
 
+from audit.admin import AuditAdminMixin
 from authentication.models import CustomUser
-from crm_api.models import Client, Contract, Event
+from crm_api import admin_actions
+from crm_api.admin_filters import AutocompleteFilterMixin, AutocompleteListFilter, autocomplete_source
+from crm_api.deletion import delete_client
+from crm_api.models import Client, Contract, Event, VersionConflict
+from crm_api.pagination import EstimatedCountPaginator
+from crm_api.scheduling import find_assignment_conflicts, lock_support_contact, with_end_date
+from notifications.signals import notify_bulk_update
+
+NOTIFIED_FIELDS = ("id", "title", "status", "event_date", "support_contact_id", "client_id")
+
+
+class VersionedAdminForm(forms.ModelForm):
+    """Carries the version of the object loaded in the change form, to refuse overwriting a later change."""
+
+    loaded_version = forms.IntegerField(widget=forms.HiddenInput, required=False)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.instance.pk:
+            self.fields["loaded_version"].initial = self.instance.version
+
+    def clean(self):
+        cleaned_data = super().clean()
+        loaded_version = cleaned_data.get("loaded_version")
+        if self.instance.pk and loaded_version is not None and loaded_version != self.instance.version:
+            raise forms.ValidationError(
+                f"This {self.instance._meta.verbose_name} was modified by someone else since you opened it. "
+                f"Reload the page to see the changes before saving yours."
+            )
+        return cleaned_data
+
+
+class VersionedAdminMixin:
+    """Saves the objects of the change forms conditionally on the version the form was loaded with.
+
+    A change made between the form validation and the save is reported as an error message.
+    """
+
+    form = VersionedAdminForm
+
+    def save_model(self, request, obj, form, change):
+        loaded_version = form.cleaned_data.get("loaded_version")
+        if change and loaded_version is not None:
+            obj.version = loaded_version
+        super().save_model(request, obj, form, change)
+
+    def changeform_view(self, request, object_id=None, form_url="", extra_context=None):
+        try:
+            return super().changeform_view(request, object_id, form_url, extra_context)
+        except VersionConflict:
+            self.message_user(
+                request, "The object was modified by someone else while saving, your changes were not saved.",
+                messages.ERROR
+            )
+            return HttpResponseRedirect(request.path)
 
 
 @admin.register(Client)
-class ClientAdmin(admin.ModelAdmin):
+class ClientAdmin(AuditAdminMixin, VersionedAdminMixin, admin.ModelAdmin):
     """Defines how clients appear in the admin panel."""
-    list_display = ("id", "email", "company_name", "sales_contact", 'date_created', "date_updated")
+    list_display = (
+        "id", "email", "company_name", "sales_contact", "contract_count", "signed_amount", "next_event_date",
+        'date_created', "date_updated"
+    )
     list_filter = ("sales_contact",)
+    list_select_related = ("sales_contact",)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    search_fields = ("company_name", "last_name", "email")
+    autocomplete_fields = ("sales_contact",)
+    ordering = ("-id",)
+    action_form = admin_actions.SalesContactActionForm
+    actions = ("reassign_sales_contact",)
+
+    @admin.action(description="Reassign selected clients to the chosen sales contact", permissions=["change"])
+    def reassign_sales_contact(self, request, queryset):
+        admin_actions.reassign_sales_contact(self, request, queryset)
+
+    def get_actions(self, request):
+        """Removes the reassignment action when the user is in sales or support group."""
+        actions = super().get_actions(request)
+        if request.user.role in ("SA", "SU"):
+            actions.pop("reassign_sales_contact", None)
+        return actions
 
     def save_model(self, request, obj, form, change):
         """Sets the client's sales contact to the creator when creating a new client."""
@@ -33,15 +113,44 @@ class ClientAdmin(admin.ModelAdmin):
         if request.user.role == "SA":
             return Client.objects.filter(sales_contact=request.user.id)
         elif request.user.role == "SU":
-
             return Client.objects.filter(
-                client_event__in=Event.objects.filter(
-                        support_contact=request.user
-                )
-            ).distinct()
+                id__in=Event.objects.filter(support_contact=request.user).values("client_id")
+            )
         else:
             return Client.objects.all()
 
+    def get_deleted_objects(self, objs, request):
+        """Counts the contracts and events deleted with the clients instead of listing them one by one,
+        as listing them would load the whole history of large clients.
+        """
+        client_ids = [obj.pk for obj in objs]
+        model_count = {Client._meta.verbose_name_plural: len(client_ids)}
+        perms_needed = set()
+        for model in (Contract, Event):
+            model_count[model._meta.verbose_name_plural] = model.objects.filter(client_id__in=client_ids).count()
+            if not request.user.has_perm(f"crm_api.delete_{model._meta.model_name}"):
+                perms_needed.add(model._meta.verbose_name)
+        return [str(obj) for obj in objs], model_count, perms_needed, []
+
+    def delete_model(self, request, obj):
+        """Deletes a client with its history in chunks, in the background for large clients."""
+        if delete_client(obj, user=request.user) is not None:
+            self.message_user(request, f"{obj} is being deleted in the background.", messages.INFO)
+
+    def delete_queryset(self, request, queryset):
+        """Deletes the selected clients one by one with their history in chunks."""
+        for client in queryset.select_related(None):
+            self.delete_model(request, client)
+
+    def get_search_results(self, request, queryset, search_term):
+        """Restricts the autocomplete choices of an event's client to clients with a signed contract."""
+        queryset, may_have_duplicates = super().get_search_results(request, queryset, search_term)
+        if not queryset.ordered:
+            queryset = queryset.order_by(*self.get_ordering(request))
+        if autocomplete_source(request) == ("event", "client"):
+            queryset = queryset.filter(id__in=Contract.objects.filter(signed=True).values("client_id"))
+        return queryset, may_have_duplicates
+
     def formfield_for_foreignkey(self, db_field, request, **kwargs):
         """Sets the sales_contact field's choices to staff users from the sales group only."""
         if db_field.name == "sales_contact":
@@ -50,12 +159,36 @@ class ClientAdmin(admin.ModelAdmin):
 
 
 @admin.register(Contract)
-class ContractAdmin(admin.ModelAdmin):
+class ContractAdmin(AuditAdminMixin, VersionedAdminMixin, AutocompleteFilterMixin, admin.ModelAdmin):
     """Defines how contracts appear in the admin panel."""
 
     list_display = ("id", "amount", "payment_due", "signed", "sales_contact", "client",)
-    list_filter = ("sales_contact", "client",)
-    search_fields = ("sales_contact",)
+    list_filter = ("sales_contact", ("client", AutocompleteListFilter),)
+    search_fields = ("client__company_name", "client__last_name")
+    autocomplete_fields = ("sales_contact", "client")
+    ordering = ("-id",)
+    action_form = admin_actions.SalesContactActionForm
+    actions = ("sign_contracts", "reassign_sales_contact")
+    list_select_related = ("sales_contact", "client")
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    @admin.action(description="Sign selected contracts", permissions=["change"])
+    def sign_contracts(self, request, queryset):
+        """Signs all the selected unsigned contracts at once."""
+        count = admin_actions.bulk_update(queryset.filter(signed=False), signed=True)
+        self.message_user(request, f"{count} contracts signed.", messages.SUCCESS)
+
+    @admin.action(description="Reassign selected contracts to the chosen sales contact", permissions=["change"])
+    def reassign_sales_contact(self, request, queryset):
+        admin_actions.reassign_sales_contact(self, request, queryset)
+
+    def get_actions(self, request):
+        """Removes the reassignment action when the user is in sales or support group."""
+        actions = super().get_actions(request)
+        if request.user.role in ("SA", "SU"):
+            actions.pop("reassign_sales_contact", None)
+        return actions
 
     def save_model(self, request, obj, form, change):
         """Sets the contract's sales contact to the creator when creating a new contract."""
@@ -82,6 +215,20 @@ class ContractAdmin(admin.ModelAdmin):
         else:
             return Contract.objects.all()
 
+    def get_search_results(self, request, queryset, search_term):
+        """Restricts the autocomplete choices of an event's contract to signed contracts.
+
+        When creating a new event, only contracts with no event yet are proposed.
+        """
+        queryset, may_have_duplicates = super().get_search_results(request, queryset, search_term)
+        if not queryset.ordered:
+            queryset = queryset.order_by(*self.get_ordering(request))
+        if autocomplete_source(request) == ("event", "contract"):
+            queryset = queryset.filter(signed=True)
+            if '/add/' in request.headers.get("Referer", ""):
+                queryset = queryset.filter(contract_event__isnull=True)
+        return queryset, may_have_duplicates
+
     def formfield_for_foreignkey(self, db_field, request, **kwargs):
         """
         Sets the sales_contact field's choices to staff users from the sales group only
@@ -94,12 +241,96 @@ class ContractAdmin(admin.ModelAdmin):
         return super().formfield_for_foreignkey(db_field, request, **kwargs)
 
 
+class EventAdminForm(VersionedAdminForm):
+    """Refuses to give the support contact of an event two events at the same time."""
+
+    def clean(self):
+        cleaned_data = super().clean()
+        support_contact = cleaned_data.get("support_contact", self.instance.support_contact)
+        start = cleaned_data.get("event_date", self.instance.event_date)
+        duration = cleaned_data.get("duration", self.instance.duration)
+        status = cleaned_data.get("status", self.instance.status)
+        if support_contact is None or start is None or duration is None or status == Event.Status.COMPLETED:
+            return cleaned_data
+        # The change view runs in a transaction, the support contact stays locked until the event is saved.
+        lock_support_contact(support_contact.id)
+        conflicts = find_assignment_conflicts([(self.instance.pk, start, start + duration)], support_contact.id)
+        if conflicts:
+            event_ids = ", ".join(str(conflict[1]) for conflict in conflicts)
+            raise forms.ValidationError(f"{support_contact} already has events at that time: {event_ids}.")
+        return cleaned_data
+
+
 @admin.register(Event)
-class EventAdmin(admin.ModelAdmin):
+class EventAdmin(AuditAdminMixin, VersionedAdminMixin, AutocompleteFilterMixin, admin.ModelAdmin):
     """Defines how events appear in the admin panel."""
 
     list_display = ("id", "title", "status", "event_date", "support_contact", "contract", "client")
-    list_filter = ("client", "contract", "support_contact")
+    list_filter = (
+        ("client", AutocompleteListFilter), ("contract", AutocompleteListFilter), "support_contact", "event_date"
+    )
+    search_fields = ("title", "client__company_name")
+    autocomplete_fields = ("support_contact", "client", "contract")
+    ordering = ("-id",)
+    form = EventAdminForm
+    action_form = admin_actions.SupportContactActionForm
+    actions = ("mark_to_do", "mark_in_progress", "mark_completed", "assign_support_contact")
+    list_select_related = ("support_contact", "contract__client", "client")
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def _set_status(self, request, queryset, status):
+        """Sets the status of all the selected events at once."""
+        queryset = queryset.exclude(status=status)
+        events = list(queryset.select_related(None).only(*NOTIFIED_FIELDS))
+        count = admin_actions.bulk_update(queryset, status=status)
+        notify_bulk_update(events, status=status)
+        self.message_user(request, f"{count} events marked as {status.label}.", messages.SUCCESS)
+
+    @admin.action(description="Mark selected events as to do", permissions=["change"])
+    def mark_to_do(self, request, queryset):
+        self._set_status(request, queryset, Event.Status.TO_DO)
+
+    @admin.action(description="Mark selected events as in progress", permissions=["change"])
+    def mark_in_progress(self, request, queryset):
+        self._set_status(request, queryset, Event.Status.IN_PROGRESS)
+
+    @admin.action(description="Mark selected events as completed", permissions=["change"])
+    def mark_completed(self, request, queryset):
+        self._set_status(request, queryset, Event.Status.COMPLETED)
+
+    @admin.action(description="Assign selected events to the chosen support contact", permissions=["change"])
+    def assign_support_contact(self, request, queryset):
+        """Sets the support contact chosen in the action form on all the selected events."""
+        support_contact = admin_actions.get_staff_from_action(self, request, "support_contact", "SU")
+        if support_contact is None:
+            return
+        with transaction.atomic():
+            lock_support_contact(support_contact.id)
+            conflicts = find_assignment_conflicts(
+                list(
+                    with_end_date(queryset.select_related(None).exclude(status=Event.Status.COMPLETED))
+                    .values_list("id", "event_date", "end_date")
+                ),
+                support_contact.id
+            )
+            if conflicts:
+                pairs = ", ".join(f"{event_id} with {other_id}" for event_id, other_id in conflicts[:10])
+                self.message_user(
+                    request, f"{support_contact} would have events at the same time: {pairs}.", messages.ERROR
+                )
+                return
+            events = list(queryset.select_related(None).only(*NOTIFIED_FIELDS))
+            count = admin_actions.bulk_update(queryset, support_contact=support_contact)
+            notify_bulk_update(events, support_contact_id=support_contact.id)
+        self.message_user(request, f"{count} events assigned to {support_contact}.", messages.SUCCESS)
+
+    def get_actions(self, request):
+        """Removes the assignment action when the user is in sales or support group."""
+        actions = super().get_actions(request)
+        if request.user.role in ("SA", "SU"):
+            actions.pop("assign_support_contact", None)
+        return actions
 
     def save_model(self, request, obj, form, change):
         """Sets the event's support contact to no one when creating a new event."""
@@ -137,6 +368,8 @@ class EventAdmin(admin.ModelAdmin):
         Sets the contract field's choices to signed contracts only.
         Sets the support_contact field's choices to staff users from the support group only.
         When creating a new event, show only contracts which are signed but with no event yet.
+        These querysets validate the submitted value, the choices themselves are searched lazily by the
+        autocomplete widgets (see get_search_results of the related admins).
         """
         if db_field.name == "support_contact":
             kwargs['queryset'] = CustomUser.objects.filter(role="SU")
@@ -0,0 +1,62 @@
+from django import forms
+from django.contrib import messages
+from django.contrib.admin.helpers import ActionForm
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from audit.recorder import record_queryset_update
+from authentication.models import CustomUser
+
+
+class SalesContactActionForm(ActionForm):
+    """Adds the choice of a sales staff member to the admin actions."""
+
+    sales_contact = forms.ModelChoiceField(queryset=CustomUser.objects.filter(role="SA"), required=False)
+
+
+class SupportContactActionForm(ActionForm):
+    """Adds the choice of a support staff member to the admin actions."""
+
+    support_contact = forms.ModelChoiceField(queryset=CustomUser.objects.filter(role="SU"), required=False)
+
+
+def bulk_update(queryset, **values):
+    """Updates all the objects of a queryset with a single UPDATE query in a transaction.
+
+    Keeps date_updated current, as auto_now fields are not set by QuerySet.update(), and increments the versions.
+    The changes are recorded in the audit trail. Returns the number of updated rows.
+    """
+    with transaction.atomic():
+        record_queryset_update(queryset, values)
+        return queryset.update(date_updated=timezone.now(), version=F("version") + 1, **values)
+
+
+def get_staff_from_action(modeladmin, request, field_name, role):
+    """Gets the staff member chosen in the action form and checks their role.
+
+    The posted value is validated by the field of the admin's action form.
+    Sends an error message to the user and returns None when no valid staff member of this role was chosen.
+    """
+    try:
+        staff = modeladmin.action_form.base_fields[field_name].clean(request.POST.get(field_name))
+    except ValidationError:
+        staff = None
+    if staff is None or staff.role != role:
+        staff = None
+        modeladmin.message_user(
+            request, f"Please choose a staff member with the role {role} for this action.", messages.ERROR
+        )
+    return staff
+
+
+def reassign_sales_contact(modeladmin, request, queryset):
+    """Sets the sales contact chosen in the action form on all the selected objects."""
+    sales_contact = get_staff_from_action(modeladmin, request, "sales_contact", "SA")
+    if sales_contact is None:
+        return
+    count = bulk_update(queryset, sales_contact=sales_contact)
+    modeladmin.message_user(
+        request, f"{count} {modeladmin.opts.verbose_name_plural} reassigned to {sales_contact}.", messages.SUCCESS
+    )
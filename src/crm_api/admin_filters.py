@@ -0,0 +1,68 @@
+from django.contrib import admin
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.forms import ModelChoiceField
+
+
+class AutocompleteListFilter(admin.FieldListFilter):
+    """Filters a changelist on a foreign key through a search-backed autocomplete widget.
+
+    Unlike the default related filter, the related objects are not all rendered in the sidebar:
+    only the selected one is loaded and the others are searched lazily through the admin autocomplete view.
+    """
+
+    template = "admin/autocomplete_filter.html"
+
+    def __init__(self, field, request, params, model, model_admin, field_path):
+        self.lookup_kwarg = f"{field_path}__{field.target_field.name}__exact"
+        self.lookup_val = params.get(self.lookup_kwarg)
+        super().__init__(field, request, params, model, model_admin, field_path)
+        self.form_field = ModelChoiceField(
+            queryset=field.related_model._default_manager.all(),
+            widget=AutocompleteSelect(field, model_admin.admin_site),
+            required=False,
+        )
+
+    def has_output(self):
+        return True
+
+    def expected_parameters(self):
+        return [self.lookup_kwarg]
+
+    def choices(self, changelist):
+        """Returns the query strings used by the widget to apply or remove the filter."""
+        yield {
+            "selected": self.lookup_val is None,
+            "query_string": changelist.get_query_string(remove=[self.lookup_kwarg]),
+            "display": "All",
+        }
+
+    def rendered_widget(self):
+        """Renders the autocomplete widget with the current filter value as the only loaded choice."""
+        return self.form_field.widget.render(
+            name=self.lookup_kwarg,
+            value=self.lookup_val,
+            attrs={"id": f"id_filter_{self.lookup_kwarg}"},
+        )
+
+
+class AutocompleteFilterMixin:
+    """Adds the autocomplete assets to the changelist of an admin using :class:`AutocompleteListFilter`."""
+
+    @property
+    def media(self):
+        media = super().media
+        for list_filter in self.list_filter:
+            if isinstance(list_filter, tuple) and issubclass(list_filter[1], AutocompleteListFilter):
+                field = self.model._meta.get_field(list_filter[0])
+                return media + AutocompleteSelect(field, self.admin_site).media
+        return media
+
+
+def autocomplete_source(request):
+    """Gets the (model_name, field_name) of the field an admin autocomplete request is made for.
+
+    Returns (None, None) when the request does not come from the autocomplete view.
+    """
+    if not request.path.endswith("/autocomplete/"):
+        return None, None
+    return request.GET.get("model_name"), request.GET.get("field_name")
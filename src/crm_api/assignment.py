@@ -0,0 +1,184 @@
+import heapq
+from bisect import bisect_left, insort
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from audit.models import AuditEntry
+from audit.recorder import record
+from authentication.models import CustomUser
+from crm_api.models import Event
+from notifications.signals import notify_bulk_update
+
+
+def get_window_index(date, window_days):
+    """Gets the index of the load window of a date, windows being periods of window_days days."""
+    return timezone.localtime(date).date().toordinal() // window_days
+
+
+class Schedule:
+    """Periods of the events of a support contact, sorted by start, to check whether they are free.
+
+    Events are assumed to last at most max_duration.
+    """
+
+    def __init__(self, max_duration):
+        self.periods = []
+        self.max_duration = max_duration
+
+    def is_free(self, start, end):
+        """Checks that no period overlaps [start, end)."""
+        index = bisect_left(self.periods, (start,))
+        if index < len(self.periods) and self.periods[index][0] < end:
+            return False
+        while index > 0 and self.periods[index - 1][0] > start - self.max_duration:
+            index -= 1
+            if self.periods[index][1] > start:
+                return False
+        return True
+
+    def add(self, start, end):
+        insort(self.periods, (start, end))
+
+
+def plan_assignment(events, assigned_events, support_ids, window_days, max_events_per_window=None):
+    """Gives each event to the least loaded support contact who is free at that time.
+
+    events and assigned_events are lists of (id, start, end, attendees) tuples, the latter with the support contact
+    as fifth item. The load of a support contact is counted per load window, as their number of events then
+    their number of attendees in the window. Each window has a heap of the support contacts by load, so that
+    an event is given in O(log n) unless the least loaded support contacts are busy at that time.
+    Returns a dict mapping each assigned event's id to a support contact's id, and the ids of the events
+    no support contact is free for.
+    """
+    max_duration = max(
+        (end - start for _, start, end, *_ in events + assigned_events), default=timedelta(0)
+    )
+    schedules = {support_id: Schedule(max_duration) for support_id in support_ids}
+    loads = defaultdict(lambda: {support_id: (0, 0) for support_id in support_ids})
+    for _, start, end, attendees, support_id in assigned_events:
+        if support_id in schedules:
+            schedules[support_id].add(start, end)
+            window_loads = loads[get_window_index(start, window_days)]
+            count, total = window_loads[support_id]
+            window_loads[support_id] = (count + 1, total + attendees)
+
+    heaps = {}
+    plan = {}
+    unassigned = []
+    for event_id, start, end, attendees in sorted(events, key=lambda event: (event[1], event[0])):
+        window = get_window_index(start, window_days)
+        if window not in heaps:
+            heaps[window] = [(*load, support_id) for support_id, load in loads[window].items()]
+            heapq.heapify(heaps[window])
+        heap = heaps[window]
+        busy = []
+        support_id = None
+        while heap:
+            count, total, candidate = heapq.heappop(heap)
+            busy.append((count, total, candidate))
+            if max_events_per_window is not None and count >= max_events_per_window:
+                # The other support contacts of the heap have at least as many events in the window.
+                break
+            if schedules[candidate].is_free(start, end):
+                support_id = candidate
+                busy.pop()
+                break
+        for entry in busy:
+            heapq.heappush(heap, entry)
+        if support_id is None:
+            unassigned.append(event_id)
+            continue
+        plan[event_id] = support_id
+        schedules[support_id].add(start, end)
+        heapq.heappush(heap, (count + 1, total + attendees, support_id))
+    return plan, unassigned
+
+
+def assign_support_contacts(start=None, end=None, dry_run=False):
+    """Assigns the upcoming events which have no support contact to the support staff, balancing their workload.
+
+    Events of the window [start, end) (from now for SUPPORT_ASSIGNMENT["HORIZON_DAYS"] days by default) which are
+    not completed are planned with plan_assignment, considering the events already assigned from one load window
+    before start, so events are expected to last less than a load window. Events of clients being deleted in the
+    background are neither assigned nor counted in the workloads. The events and the support staff
+    are locked, then the assignments are written by a single bulk UPDATE and recorded in the audit trail.
+    With dry_run, the plan is computed and returned without modifying anything.
+    """
+    config = settings.SUPPORT_ASSIGNMENT
+    start = start or timezone.now()
+    end = end or start + timedelta(days=config["HORIZON_DAYS"])
+    window_days = config["LOAD_WINDOW_DAYS"]
+
+    with transaction.atomic():
+        supports = CustomUser.objects.filter(role="SU", is_active=True).order_by("id")
+        events = (
+            Event.objects.filter(
+                support_contact__isnull=True,
+                event_date__gte=start,
+                event_date__lt=end,
+                client__date_deleted__isnull=True,
+            )
+            .exclude(status=Event.Status.COMPLETED)
+            .order_by("event_date", "id")
+        )
+        if not dry_run:
+            supports = supports.select_for_update()
+            events = events.select_for_update(of=("self",))
+        support_ids = list(supports.values_list("id", flat=True))
+        events = list(events)
+        assigned_events = list(
+            Event.objects.filter(
+                support_contact_id__in=support_ids,
+                event_date__gte=start - timedelta(days=window_days),
+                event_date__lt=end,
+                client__date_deleted__isnull=True,
+            )
+            .exclude(status=Event.Status.COMPLETED)
+            .values_list("event_date", "duration", "attendees", "support_contact_id")
+        )
+
+        plan, unassigned = plan_assignment(
+            [(event.id, event.event_date, event.event_date + event.duration, event.attendees) for event in events],
+            [
+                (None, event_date, event_date + duration, attendees, support_id)
+                for event_date, duration, attendees, support_id in assigned_events
+            ],
+            support_ids,
+            window_days,
+            config["MAX_EVENTS_PER_WINDOW"],
+        )
+
+        if not dry_run and plan:
+            now = timezone.now()
+            planned_events = [event for event in events if event.id in plan]
+            groups = defaultdict(list)
+            for event in planned_events:
+                groups[plan[event.id]].append(event)
+            for support_id, group in groups.items():
+                notify_bulk_update(group, support_contact_id=support_id)
+            for event in planned_events:
+                record(Event, event.id, AuditEntry.Action.UPDATE, {"support_contact_id": [None, plan[event.id]]})
+                event.support_contact_id = plan[event.id]
+                event.date_updated = now
+                event.version += 1
+            Event.objects.bulk_update(planned_events, ["support_contact", "date_updated", "version"])
+
+    per_support = defaultdict(lambda: {"events": 0, "attendees": 0})
+    attendees = {event.id: event.attendees for event in events}
+    for event_id, support_id in plan.items():
+        per_support[support_id]["events"] += 1
+        per_support[support_id]["attendees"] += attendees[event_id]
+    return {
+        "dry_run": dry_run,
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "events": len(events),
+        "assigned": len(plan),
+        "unassigned": unassigned,
+        "support_contacts": [{"user": support_id, **per_support[support_id]} for support_id in support_ids],
+        "assignments": [{"event": event_id, "support_contact": support_id} for event_id, support_id in plan.items()],
+    }
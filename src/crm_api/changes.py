@@ -0,0 +1,86 @@
+from rest_framework.exceptions import ValidationError
+
+from crm_api import serializers
+from crm_api.models import ChangeLog, Client, Contract, Event
+
+FEED_MODELS = {
+    "client": (Client, serializers.ClientListSerializer),
+    "contract": (Contract, serializers.ContractListSerializer),
+    "event": (Event, serializers.EventListSerializer),
+}
+
+# Only changes of transactions older than every running transaction are visible in the feed:
+# a change appearing later can then never be placed before a cursor already given to a consumer.
+FINISHED_TRANSACTIONS = "txid < txid_snapshot_xmin(txid_current_snapshot())"
+
+
+def parse_cursor(cursor):
+    """Parses a "<txid>.<id>" cursor. An empty cursor starts from the beginning of the feed."""
+    if not cursor:
+        return 0, 0
+    try:
+        txid, change_id = cursor.split(".")
+        return int(txid), int(change_id)
+    except ValueError:
+        raise ValidationError({"detail": "Invalid cursor."})
+
+
+def format_cursor(change):
+    return f"{change.txid}.{change.id}"
+
+
+def get_head_cursor():
+    """Gets the cursor of the last visible change, for consumers starting with a full download."""
+    change = ChangeLog.objects.extra(where=[FINISHED_TRANSACTIONS]).order_by("-txid", "-id").first()
+    return format_cursor(change) if change else ""
+
+
+def get_changes(cursor, limit):
+    """Gets the batch of changes following a cursor, with the current state of the changed objects.
+
+    Several changes of the same object in a batch are compacted into the last one. A client being deleted
+    in the background is reported as deleted when it is hidden, then again when it is purged.
+    Returns the changes, the cursor to resume from and whether more changes are waiting.
+    """
+    txid, change_id = parse_cursor(cursor)
+    rows = list(
+        ChangeLog.objects.extra(where=["(txid, id) > (%s, %s)", FINISHED_TRANSACTIONS], params=[txid, change_id])
+        .order_by("txid", "id")[:limit + 1]
+    )
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if not rows:
+        return [], cursor or "", False
+
+    latest = {}
+    for row in rows:
+        latest.pop((row.model, row.object_id), None)
+        latest[(row.model, row.object_id)] = row
+
+    objects = {}
+    for model_name, (model, serializer_class) in FEED_MODELS.items():
+        ids = [object_id for name, object_id in latest if name == model_name]
+        if ids:
+            # The base manager also loads the clients being deleted in the background, which the default one hides.
+            objects[model_name] = (model._base_manager.in_bulk(ids), serializer_class)
+
+    changes = []
+    for (model_name, object_id), row in latest.items():
+        operation = row.operation
+        data = None
+        if operation != ChangeLog.Operation.DELETE and model_name in objects:
+            instances, serializer_class = objects[model_name]
+            instance = instances.get(object_id)
+            if getattr(instance, "date_deleted", None) is not None:
+                # A soft-deleted client is gone for the API, it is reported as deleted right away.
+                operation = ChangeLog.Operation.DELETE
+            elif instance is not None:
+                data = serializer_class(instance).data
+        changes.append({
+            "model": model_name,
+            "id": object_id,
+            "operation": operation,
+            "date": row.date_created,
+            "data": data,
+        })
+    return changes, format_cursor(rows[-1]), has_more
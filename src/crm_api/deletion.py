@@ -0,0 +1,67 @@
+from collections import Counter
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from crm_api.models import Client, Contract, Event
+from jobs.registry import enqueue
+
+
+def delete_in_chunks(queryset, batch_size):
+    """Deletes the objects of a queryset batch by batch, each batch in its own short transaction.
+
+    Only the ids of one batch are loaded at a time. Returns the number of deleted objects per model.
+    """
+    counts = Counter()
+    while True:
+        ids = list(queryset.order_by().values_list("id", flat=True)[:batch_size])
+        if not ids:
+            return counts
+        counts.update(queryset.model._base_manager.filter(id__in=ids).delete()[1])
+
+
+def purge_client(client_id, batch_size=None):
+    """Deletes a client with all its events and contracts, in chunks so that memory and locks stay bounded.
+
+    Events are deleted first, so that deleting a chunk of contracts finds no events to cascade to.
+    Returns the number of deleted objects per model.
+    """
+    batch_size = batch_size or settings.CLIENT_DELETION["BATCH_SIZE"]
+    counts = Counter()
+    for queryset in (
+        Event.objects.filter(client_id=client_id),
+        Contract.objects.filter(client_id=client_id),
+        Client.all_objects.filter(id=client_id),
+    ):
+        counts.update(delete_in_chunks(queryset, batch_size))
+    return dict(counts)
+
+
+def count_history(client, limit):
+    """Counts the contracts and events of a client, stopping after limit of each."""
+    return (
+        Contract.objects.filter(client=client)[:limit].count()
+        + Event.objects.filter(client=client)[:limit].count()
+    )
+
+
+def delete_client(client, user=None):
+    """Deletes a client with its contracts and events.
+
+    A client with few contracts and events is deleted at once, in a single transaction.
+    A larger client is soft-deleted, so that it disappears from the clients right away,
+    and purged by a background job. Returns this job, or None when the client was deleted at once.
+    """
+    threshold = settings.CLIENT_DELETION["ASYNC_THRESHOLD"]
+    if count_history(client, threshold + 1) <= threshold:
+        with transaction.atomic():
+            purge_client(client.id)
+        return None
+    with transaction.atomic():
+        now = timezone.now()
+        Client.all_objects.filter(id=client.id).update(
+            date_deleted=now, date_updated=now, version=F("version") + 1
+        )
+        return enqueue("crm_api.purge_client", {"client_id": client.id}, user=user)
@@ -0,0 +1,112 @@
+import time
+from functools import cached_property, lru_cache
+from operator import attrgetter
+
+from django.db import models
+from rest_framework import serializers
+from rest_framework.settings import api_settings
+
+from metrics.instruments import SERIALIZER_SECONDS
+
+DATETIME_DIRECTIVES = {
+    "Y": ("%04d", "year"),
+    "m": ("%02d", "month"),
+    "d": ("%02d", "day"),
+    "H": ("%02d", "hour"),
+    "M": ("%02d", "minute"),
+    "S": ("%02d", "second"),
+    "f": ("%06d", "microsecond"),
+}
+
+
+@lru_cache(maxsize=None)
+def compile_datetime_format(output_format):
+    """Compiles a strftime format into a printf-style template and a getter of the datetime attributes it uses.
+
+    Returns None when the format uses other directives than the numeric ones, strftime being needed then.
+    """
+    template, attributes = [], []
+    chars = iter(output_format)
+    for char in chars:
+        if char != "%":
+            template.append(char)
+            continue
+        directive = next(chars, "")
+        if directive == "%":
+            template.append("%%")
+        elif directive in DATETIME_DIRECTIVES:
+            spec, attribute = DATETIME_DIRECTIVES[directive]
+            template.append(spec)
+            attributes.append(attribute)
+        else:
+            return None
+    if not attributes:
+        return None
+    return "".join(template), attrgetter(*attributes)
+
+
+class DateTimeField(serializers.DateTimeField):
+    """DateTimeField formatting with a template compiled once per format instead of calling strftime.
+
+    Datetimes are kept as is, in the field's timezone, when the accepted renderer encodes them natively.
+    """
+
+    @cached_property
+    def native_datetimes(self):
+        request = self.context.get("request")
+        return getattr(getattr(request, "accepted_renderer", None), "native_datetimes", False)
+
+    def to_representation(self, value):
+        if value and not isinstance(value, str) and self.native_datetimes:
+            return self.enforce_timezone(value)
+        output_format = getattr(self, "format", api_settings.DATETIME_FORMAT)
+        compiled = compile_datetime_format(output_format) if isinstance(output_format, str) else None
+        if not value or compiled is None or isinstance(value, str):
+            return super().to_representation(value)
+        template, getter = compiled
+        return template % getter(self.enforce_timezone(value))
+
+
+class TimedListSerializer(serializers.ListSerializer):
+    """ListSerializer recording the duration of the serialization of its whole list in the metrics."""
+
+    @property
+    def data(self):
+        start = time.perf_counter()
+        try:
+            return super().data
+        finally:
+            SERIALIZER_SECONDS.observe(time.perf_counter() - start, serializer=type(self.child).__name__)
+
+
+class ModelSerializer(serializers.ModelSerializer):
+    """ModelSerializer mapping the model datetime fields to the compiled DateTimeField,
+    and recording the duration of its serializations in the metrics.
+    """
+
+    serializer_field_mapping = {
+        **serializers.ModelSerializer.serializer_field_mapping,
+        models.DateTimeField: DateTimeField,
+    }
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        """Times the lists with TimedListSerializer, unless the Meta declares another list serializer class.
+
+        Builds the list serializer the same way as DRF's BaseSerializer.many_init.
+        """
+        if hasattr(getattr(cls, "Meta", None), "list_serializer_class"):
+            return super().many_init(*args, **kwargs)
+        list_options = {key: kwargs.pop(key, None) for key in ("allow_empty", "max_length", "min_length")}
+        list_kwargs = {key: value for key, value in list_options.items() if value is not None}
+        list_kwargs["child"] = cls(*args, **kwargs)
+        list_kwargs.update({key: value for key, value in kwargs.items() if key in serializers.LIST_SERIALIZER_KWARGS})
+        return TimedListSerializer(*args, **list_kwargs)
+
+    @property
+    def data(self):
+        start = time.perf_counter()
+        try:
+            return super().data
+        finally:
+            SERIALIZER_SECONDS.observe(time.perf_counter() - start, serializer=type(self).__name__)
@@ -16,13 +16,20 @@ class CustomUserFilter(filters.FilterSet):
 
 
 class ClientFilter(filters.FilterSet):
+    ordering = filters.OrderingFilter(
+        fields=("id", "company_name", "contract_count", "signed_amount", "open_event_count", "next_event_date")
+    )
 
     class Meta:
         model = Client
         fields = {
             "first_name": ["icontains"],
             "last_name": ["icontains"],
-            "company_name": ["icontains"]
+            "company_name": ["icontains"],
+            "contract_count": ["lte", "gte"],
+            "signed_amount": ["lte", "gte"],
+            "open_event_count": ["lte", "gte"],
+            "next_event_date": ["lte", "gte"]
         }
 
 
@@ -33,7 +40,7 @@ class ContractFilter(filters.FilterSet):
         fields = {
             "amount": ["lte", "gte"],
             "payment_due": ["lte", "gte"],
-            "signed": ["icontains"]
+            "signed": ["exact", "icontains"]
         }
 
 
@@ -43,6 +50,6 @@ class EventFilter(filters.FilterSet):
         model = Event
         fields = {
             "title": ["icontains"],
-            "status": ["icontains"],
+            "status": ["exact", "icontains"],
             "event_date": ["lte", "gte"]
         }
\ No newline at end of file
@@ -0,0 +1,141 @@
+import heapq
+
+from django.db import transaction
+from django.db.models import Count, F
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from audit.recorder import record_queryset_update
+from authentication.models import CustomUser
+from crm_api.models import Client, Contract
+
+
+def get_sales_staff(user_ids):
+    """Gets the sales staff members with the given ids, in the same order.
+
+    Raises a ValidationError when one of them does not exist or is not a sales staff.
+    """
+    users = CustomUser.objects.in_bulk(user_ids)
+    for user_id in user_ids:
+        user = users.get(user_id)
+        if user is None:
+            raise ValidationError({"detail": f"User {user_id} does not exist."})
+        if user.role != "SA":
+            raise ValidationError({"detail": f"User {user_id} is not a sales staff."})
+    return [users[user_id] for user_id in user_ids]
+
+
+def validate_handover(from_user_id, to_user_ids):
+    """Checks that a handover goes from a sales staff member to at least one other sales staff member.
+
+    Returns the departing sales contact and the list of targets.
+    """
+    if not to_user_ids:
+        raise ValidationError({"detail": "At least one sales contact to hand over to is required."})
+    if from_user_id in to_user_ids:
+        raise ValidationError({"detail": "A sales contact can't hand over to themselves."})
+    from_user, *targets = get_sales_staff([from_user_id] + list(dict.fromkeys(to_user_ids)))
+    return from_user, targets
+
+
+def plan_handover(client_ids, targets):
+    """Spreads the clients over the target sales contacts, giving each client to the least loaded one.
+
+    The load of a target is its current number of clients.
+    Returns a dict mapping each target's id to the list of client ids it receives.
+    """
+    loads = dict(
+        Client.objects.filter(sales_contact__in=targets)
+        .values_list("sales_contact")
+        .annotate(count=Count("id"))
+    )
+    heap = [(loads.get(target.id, 0), target.id) for target in targets]
+    heapq.heapify(heap)
+    quotas = {target.id: 0 for target in targets}
+    for _ in client_ids:
+        load, target_id = heapq.heappop(heap)
+        quotas[target_id] += 1
+        heapq.heappush(heap, (load + 1, target_id))
+
+    plan = {}
+    start = 0
+    for target_id, quota in quotas.items():
+        plan[target_id] = client_ids[start:start + quota]
+        start += quota
+    return plan
+
+
+def plan_contract_handover(contracts, client_plan, loads):
+    """Gives each contract to the target which receives its client in client_plan.
+
+    contracts is a list of (contract id, client id) tuples. The contracts whose client is not handed over (client
+    of another sales contact, without sales contact or being deleted) are given to the least loaded target,
+    loads being the current number of contracts of each target.
+    Returns a dict mapping each target's id to the list of contract ids it receives.
+    """
+    client_targets = {client_id: target_id for target_id, client_ids in client_plan.items() for client_id in client_ids}
+    plan = {target_id: [] for target_id in client_plan}
+    others = []
+    for contract_id, client_id in contracts:
+        if client_id in client_targets:
+            plan[client_targets[client_id]].append(contract_id)
+        else:
+            others.append(contract_id)
+    heap = [(loads.get(target_id, 0) + len(contract_ids), target_id) for target_id, contract_ids in plan.items()]
+    heapq.heapify(heap)
+    for contract_id in others:
+        load, target_id = heapq.heappop(heap)
+        plan[target_id].append(contract_id)
+        heapq.heappush(heap, (load + 1, target_id))
+    return plan
+
+
+def hand_over_sales_contact(from_user_id, to_user_ids, dry_run=False, user=None):
+    """Moves all clients and contracts of a sales staff member to one or several other sales staff members.
+
+    Clients are spread by load over the targets and each contract follows its client, the contracts whose client
+    is not handed over being spread by load too. Everything runs in one transaction with one UPDATE per target
+    for clients and for contracts. Each moved client and contract is recorded in the audit trail, as changed by user.
+    With dry_run, the plan is computed and returned without locking or modifying anything.
+    """
+    from_user, targets = validate_handover(from_user_id, to_user_ids)
+
+    with transaction.atomic():
+        clients = Client.objects.filter(sales_contact=from_user).order_by("id")
+        contracts = Contract.objects.filter(sales_contact=from_user).order_by("id")
+        if not dry_run:
+            clients = clients.select_for_update()
+            contracts = contracts.select_for_update()
+        client_plan = plan_handover(list(clients.values_list("id", flat=True)), targets)
+        contract_loads = dict(
+            Contract.objects.filter(sales_contact__in=targets)
+            .values_list("sales_contact")
+            .annotate(count=Count("id"))
+        )
+        contract_plan = plan_contract_handover(
+            list(contracts.values_list("id", "client_id")), client_plan, contract_loads
+        )
+
+        if not dry_run:
+            now = timezone.now()
+            for model, plan in ((Client, client_plan), (Contract, contract_plan)):
+                for target_id, object_ids in plan.items():
+                    if object_ids:
+                        queryset = model.objects.filter(id__in=object_ids)
+                        record_queryset_update(queryset, {"sales_contact": target_id}, user)
+                        queryset.update(sales_contact_id=target_id, date_updated=now, version=F("version") + 1)
+
+    return {
+        "from_user": from_user.id,
+        "dry_run": dry_run,
+        "clients": sum(len(ids) for ids in client_plan.values()),
+        "contracts": sum(len(ids) for ids in contract_plan.values()),
+        "targets": [
+            {
+                "user": target_id,
+                "clients": len(client_plan[target_id]),
+                "contracts": len(contract_plan[target_id]),
+            }
+            for target_id in client_plan
+        ],
+    }
@@ -0,0 +1,55 @@
+from datetime import timezone as dt_timezone
+
+
+def escape_text(value):
+    """Escapes a text value as required by RFC 5545."""
+    return (
+        value.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def fold_line(line):
+    """Folds a content line in chunks of 75 octets, continuation lines starting with a space."""
+    encoded = line.encode()
+    if len(encoded) <= 75:
+        return line + "\r\n"
+    chunks = []
+    while encoded:
+        size = 75 if not chunks else 74
+        # Never split a multi-byte UTF-8 character.
+        while size < len(encoded) and (encoded[size] & 0xC0) == 0x80:
+            size -= 1
+        chunks.append(encoded[:size].decode())
+        encoded = encoded[size:]
+    return "\r\n ".join(chunks) + "\r\n"
+
+
+def format_datetime(value):
+    """Formats an aware datetime as a UTC iCalendar date-time."""
+    return value.astimezone(dt_timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def event_lines(event):
+    """Gets the content lines of the VEVENT component of an event from :model:`crm_api.Event`."""
+    yield "BEGIN:VEVENT"
+    yield f"UID:event-{event.id}@epicevents"
+    yield f"DTSTAMP:{format_datetime(event.date_updated)}"
+    yield f"LAST-MODIFIED:{format_datetime(event.date_updated)}"
+    yield f"DTSTART:{format_datetime(event.event_date)}"
+    yield f"SUMMARY:{escape_text(event.title)}"
+    yield f"DESCRIPTION:{escape_text(event.notes)}"
+    yield f"STATUS:{'CONFIRMED' if event.status != 'T' else 'TENTATIVE'}"
+    yield "END:VEVENT"
+
+
+def iter_calendar(events, name):
+    """Yields an iCalendar document chunk by chunk, one chunk per event, so that it can be streamed."""
+    yield fold_line("BEGIN:VCALENDAR") + fold_line("VERSION:2.0") + fold_line("PRODID:-//Epic Events//CRM//EN") \
+        + fold_line(f"X-WR-CALNAME:{escape_text(name)}")
+    for event in events:
+        yield "".join(fold_line(line) for line in event_lines(event))
+    yield fold_line("END:VCALENDAR")
@@ -0,0 +1,285 @@
+"""Load generator simulating sales, support and management staff against a running server.
+
+Every virtual user is a coroutine with its own keep-alive HTTP/1.1 connection, so thousands of them run
+in one process. Only the standard library is used.
+"""
+import asyncio
+import json
+import random
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urlsplit
+
+
+class HTTPConnection:
+    """Minimal keep-alive HTTP/1.1 client connection sending and receiving JSON."""
+
+    def __init__(self, url):
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == "https" else 80)
+        self.ssl = parts.scheme == "https"
+        self.host_header = parts.netloc
+        self.reader = self.writer = None
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.reader = self.writer = None
+
+    async def request(self, method, path, body=None, token=None):
+        """Sends a request and returns its status and decoded JSON body (None when empty or not JSON)."""
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port, ssl=self.ssl or None)
+        payload = json.dumps(body).encode() if body is not None else b""
+        head = [
+            f"{method} {path} HTTP/1.1",
+            f"Host: {self.host_header}",
+            "Accept: application/json",
+            f"Content-Length: {len(payload)}",
+        ]
+        if payload:
+            head.append("Content-Type: application/json")
+        if token:
+            head.append(f"Authorization: Bearer {token}")
+        try:
+            self.writer.write(("\r\n".join(head) + "\r\n\r\n").encode() + payload)
+            await self.writer.drain()
+            status, headers, content = await self.read_response()
+        except (OSError, asyncio.IncompleteReadError, ValueError):
+            await self.close()
+            raise
+        if headers.get("connection", "").lower() == "close":
+            await self.close()
+        try:
+            data = json.loads(content) if content else None
+        except ValueError:
+            data = None
+        return status, data
+
+    async def read_response(self):
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionResetError("Connection closed by the server.")
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        if "content-length" in headers:
+            content = await self.reader.readexactly(int(headers["content-length"]))
+        elif headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await self.reader.readline()).split(b";")[0], 16)
+                if size == 0:
+                    await self.reader.readline()
+                    break
+                chunks.append(await self.reader.readexactly(size))
+                await self.reader.readline()
+            content = b"".join(chunks)
+        else:
+            content = await self.reader.read()
+            headers["connection"] = "close"
+        return status, headers, content
+
+
+def percentile(values, fraction):
+    """Gets a percentile of sorted values, by the nearest rank."""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, max(0, round(fraction * len(values)) - 1))]
+
+
+class Stats:
+    """Collects the latency and status of every call, per endpoint."""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(Counter)
+
+    def record(self, endpoint, latency, status):
+        self.latencies[endpoint].append(latency)
+        self.statuses[endpoint][status] += 1
+
+    def report(self, elapsed):
+        """Gets a row per endpoint, plus a total row, with throughput, error rate and latency percentiles."""
+        rows = []
+        endpoints = sorted(self.latencies)
+        for endpoint in endpoints + ["TOTAL"]:
+            if endpoint == "TOTAL":
+                latencies = sorted(value for name in endpoints for value in self.latencies[name])
+                statuses = sum((self.statuses[name] for name in endpoints), Counter())
+            else:
+                latencies = sorted(self.latencies[endpoint])
+                statuses = self.statuses[endpoint]
+            errors = sum(count for status, count in statuses.items() if status == "error" or status >= 400)
+            rows.append({
+                "endpoint": endpoint,
+                "requests": len(latencies),
+                "rps": len(latencies) / elapsed if elapsed else 0.0,
+                "error_rate": errors / len(latencies) if latencies else 0.0,
+                "p50": percentile(latencies, 0.5) * 1000,
+                "p90": percentile(latencies, 0.9) * 1000,
+                "p99": percentile(latencies, 0.99) * 1000,
+                "max": (latencies[-1] if latencies else 0.0) * 1000,
+                "statuses": ", ".join(f"{status}: {count}" for status, count in sorted(statuses.items(), key=str)),
+            })
+        return rows
+
+
+class VirtualUser:
+    """Logs in as a staff member, then calls the tasks of its role, weighted, with random think times."""
+
+    def __init__(self, url, account, password, context, stats, think_time):
+        self.connection = HTTPConnection(url)
+        self.account = account
+        self.password = password
+        self.context = context
+        self.stats = stats
+        self.think_time = think_time
+        self.token = None
+        self.client_ids = []
+
+    async def call(self, endpoint, method, path, body=None):
+        """Sends a request and records it under the endpoint name. Returns the decoded body, None on error."""
+        start = time.perf_counter()
+        try:
+            status, data = await self.connection.request(method, path, body, self.token)
+        except (OSError, asyncio.IncompleteReadError, ValueError):
+            self.stats.record(endpoint, time.perf_counter() - start, "error")
+            return None
+        self.stats.record(endpoint, time.perf_counter() - start, status)
+        return data if status < 400 else None
+
+    async def login(self):
+        data = await self.call(
+            "POST /login/", "POST", "/login/", {"username": self.account["username"], "password": self.password}
+        )
+        self.token = data.get("access") if data else None
+        return self.token is not None
+
+    async def list_clients(self):
+        data = await self.call("GET /clients/", "GET", "/clients/?limit=20&count=none")
+        if data:
+            self.client_ids = [client["id"] for client in data["results"]]
+
+    async def list_events(self):
+        data = await self.call("GET /events/", "GET", "/events/?limit=20&count=none")
+        return data["results"] if data else []
+
+    async def create_client(self):
+        number = random.randrange(10 ** 9)
+        data = await self.call("POST /clients/", "POST", "/clients/", {
+            "first_name": "Load",
+            "last_name": f"Test {number}",
+            "email": f"load{number}@example.com",
+            "phone": "0000000000",
+            "mobile": "0000000000",
+            "company_name": f"Load test {number}",
+        })
+        if data:
+            self.client_ids.append(data["id"])
+
+    async def create_contract_and_event(self):
+        if not self.client_ids:
+            return await self.list_clients()
+        client_id = random.choice(self.client_ids)
+        due = datetime.now(timezone.utc) + timedelta(days=random.randint(1, 365))
+        contract = await self.call(
+            "POST /clients/:id/contracts/", "POST", f"/clients/{client_id}/contracts/",
+            {"amount": round(random.uniform(100, 100000), 2), "payment_due": due.isoformat(), "signed": True}
+        )
+        if contract:
+            await self.call("POST /clients/:id/events/", "POST", f"/clients/{client_id}/events/", {
+                "title": "Load test",
+                "notes": "Created by the load test.",
+                "attendees": random.randint(1, 500),
+                "status": "T",
+                "event_date": (due + timedelta(days=7)).isoformat(),
+                "contract_id": contract["id"],
+            })
+
+    async def list_client_contracts(self):
+        if not self.client_ids:
+            return await self.list_clients()
+        client_id = random.choice(self.client_ids)
+        await self.call("GET /clients/:id/contracts/", "GET", f"/clients/{client_id}/contracts/?limit=20")
+
+    async def update_event_status(self):
+        events = await self.list_events()
+        if events:
+            event = random.choice(events)
+            await self.call(
+                "PATCH /clients/:id/events/:id/", "PATCH", f"/clients/{event['client_id']}/events/{event['id']}/",
+                {"status": random.choice(("T", "I", "C"))}
+            )
+
+    async def reassign_sales_contact(self):
+        if not self.client_ids:
+            return await self.list_clients()
+        await self.call(
+            "PATCH /clients/:id/", "PATCH", f"/clients/{random.choice(self.client_ids)}/",
+            {"sales_contact": random.choice(self.context["sales_ids"])}
+        )
+
+    async def assign_support_contact(self):
+        events = await self.list_events()
+        if events and self.context["support_ids"]:
+            event = random.choice(events)
+            await self.call(
+                "PATCH /clients/:id/events/:id/", "PATCH", f"/clients/{event['client_id']}/events/{event['id']}/",
+                {"support_contact_id": random.choice(self.context["support_ids"])}
+            )
+
+    def get_tasks(self):
+        """Gets the (weight, task) mix of the role of the account."""
+        return {
+            "SA": [
+                (4, self.list_clients), (2, self.create_client), (2, self.create_contract_and_event),
+                (2, self.list_client_contracts),
+            ],
+            "SU": [(4, self.list_clients), (3, self.list_events), (3, self.update_event_status)],
+            "M": [
+                (3, self.list_clients), (3, self.list_events), (2, self.reassign_sales_contact),
+                (2, self.assign_support_contact),
+            ],
+        }[self.account["role"]]
+
+    async def run(self, start_delay, deadline):
+        await asyncio.sleep(start_delay)
+        try:
+            if not await self.login():
+                return
+            weights, tasks = zip(*self.get_tasks())
+            while time.monotonic() < deadline:
+                await random.choices(tasks, weights)[0]()
+                await asyncio.sleep(random.expovariate(1 / self.think_time) if self.think_time else 0)
+        finally:
+            await self.connection.close()
+
+
+async def run_load_test(url, accounts, password, context, users, role_weights, duration, ramp_up, think_time):
+    """Runs the virtual users, spread over the roles by weight, and returns the stats and the elapsed time.
+
+    accounts maps each role to the accounts of this role, shared by the virtual users.
+    """
+    stats = Stats()
+    roles = [role for role in role_weights if accounts.get(role)]
+    weights = [role_weights[role] for role in roles]
+    start = time.monotonic()
+    deadline = start + ramp_up + duration
+    virtual_users = []
+    for index in range(users):
+        role = random.choices(roles, weights)[0]
+        account = accounts[role][index % len(accounts[role])]
+        virtual_users.append(
+            VirtualUser(url, account, password, context, stats, think_time).run(ramp_up * index / users, deadline)
+        )
+    await asyncio.gather(*virtual_users)
+    return stats, time.monotonic() - start
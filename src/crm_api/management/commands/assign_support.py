@@ -0,0 +1,23 @@
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from crm_api.assignment import assign_support_contacts
+
+
+class Command(BaseCommand):
+    """Assigns the upcoming events without support contact to the support staff."""
+
+    help = "Assigns the events of the coming days which have no support contact, balancing the support workloads."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=settings.SUPPORT_ASSIGNMENT["HORIZON_DAYS"])
+        parser.add_argument("--dry-run", action="store_true", help="Shows the plan without modifying anything.")
+
+    def handle(self, *args, **options):
+        start = timezone.now()
+        summary = assign_support_contacts(start, start + timedelta(days=options["days"]), dry_run=options["dry_run"])
+        self.stdout.write(json.dumps(summary, indent=2))
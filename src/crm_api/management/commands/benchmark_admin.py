@@ -0,0 +1,53 @@
+import time
+
+from django.contrib import admin
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from authentication.models import CustomUser
+from crm_api.models import Client, Contract, Event
+
+
+class Command(BaseCommand):
+    """Measures the render time and query count of the admin changelists."""
+
+    help = "Benchmarks the admin changelists of clients, contracts and events."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seed", type=int, default=0, help="Number of events to generate before measuring.")
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        """Seeds the data if asked, analyzes the tables and renders each changelist several times."""
+        if options["seed"]:
+            call_command("seed_crm", events=options["seed"], stdout=self.stdout)
+        with connection.cursor() as cursor:
+            for model in (Client, Contract, Event):
+                cursor.execute(f"ANALYZE {model._meta.db_table}")
+
+        user = CustomUser.objects.filter(is_superuser=True).first()
+        if user is None:
+            self.stderr.write("A superuser is needed to render the admin changelists.")
+            return
+
+        factory = RequestFactory()
+        self.stdout.write(f"{Event.objects.count()} events in database")
+        for model in (Client, Contract, Event):
+            model_admin = admin.site._registry[model]
+            url = f"/admin/crm_api/{model._meta.model_name}/"
+            timings = []
+            for _ in range(options["repeat"]):
+                request = factory.get(url)
+                request.user = user
+                with CaptureQueriesContext(connection) as queries:
+                    start = time.perf_counter()
+                    model_admin.changelist_view(request).render()
+                    timings.append(time.perf_counter() - start)
+            timings.sort()
+            self.stdout.write(
+                f"{model.__name__}: median {timings[len(timings) // 2] * 1000:.1f} ms, "
+                f"best {timings[0] * 1000:.1f} ms, {len(queries)} queries"
+            )
@@ -0,0 +1,71 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from django.core.management.base import BaseCommand
+
+# Run by a fresh interpreter for each measure, as the settings can only be loaded once per process.
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+from django.core.wsgi import get_wsgi_application
+application = get_wsgi_application()
+from django.urls import get_resolver
+get_resolver().url_patterns
+boot = time.perf_counter() - start
+requests = int(sys.argv[1])
+timings = {"boot": boot * 1000}
+if requests:
+    from django.test import Client
+    from django.test.utils import setup_test_environment
+    from rest_framework_simplejwt.tokens import RefreshToken
+    from authentication.models import CustomUser
+    setup_test_environment()
+    def measure(client, path, **headers):
+        client.get(path, **headers)
+        start = time.perf_counter()
+        for _ in range(requests):
+            client.get(path, **headers)
+        return (time.perf_counter() - start) * 1000000 / requests
+    timings["unauthenticated"] = measure(Client(), "/clients/")
+    user = CustomUser.objects.filter(role="M").first() or CustomUser.objects.filter(is_superuser=True).first()
+    if user is not None:
+        token = str(RefreshToken.for_user(user).access_token)
+        timings["authenticated"] = measure(
+            Client(), "/clients/?limit=1&count=none", HTTP_AUTHORIZATION=f"Bearer {token}"
+        )
+print(json.dumps(timings))
+"""
+
+
+class Command(BaseCommand):
+    """Compares the cold start and per-request overhead of the full and the API-only settings profiles."""
+
+    help = "Benchmarks the startup time and request overhead of settings profiles, each in a fresh process."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--profiles", nargs="+", default=["eventmanager.settings", "eventmanager.settings_api"],
+            help="Settings modules to compare."
+        )
+        parser.add_argument("--boots", type=int, default=5, help="Number of cold starts measured per profile.")
+        parser.add_argument("--requests", type=int, default=500, help="Number of requests measured per profile.")
+
+    def run_probe(self, profile, requests):
+        env = {**os.environ, "DJANGO_SETTINGS_MODULE": profile}
+        result = subprocess.run(
+            [sys.executable, "-c", PROBE, str(requests)], env=env, capture_output=True, text=True, check=True
+        )
+        return json.loads(result.stdout.strip().splitlines()[-1])
+
+    def handle(self, *args, **options):
+        for profile in options["profiles"]:
+            boots = [self.run_probe(profile, 0)["boot"] for _ in range(options["boots"])]
+            timings = self.run_probe(profile, options["requests"])
+            self.stdout.write(profile)
+            self.stdout.write(f"  cold start (setup and URLconf): median {statistics.median(boots):.0f} ms")
+            self.stdout.write(f"  401 on /clients/: {timings['unauthenticated']:.0f} µs per request")
+            if "authenticated" in timings:
+                self.stdout.write(f"  JWT GET /clients/?limit=1: {timings['authenticated']:.0f} µs per request")
@@ -0,0 +1,77 @@
+import time
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from rest_framework import serializers as drf_serializers
+from rest_framework.renderers import JSONRenderer
+
+from crm_api import serializers
+from crm_api.models import Client, Event
+from crm_api.renderers import FastJSONRenderer, orjson
+from eventmanager.middleware import compress
+
+
+class Command(BaseCommand):
+    """Measures the CPU time and size of large API pages, with the standard and the fast serialization."""
+
+    help = "Benchmarks the serialization, rendering and compression of large event and client pages."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seed", type=int, default=0, help="Number of events to generate before measuring.")
+        parser.add_argument("--size", type=int, default=1000, help="Number of objects per page.")
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def measure(self, func, repeat):
+        """Runs func several times and returns its best CPU time in milliseconds and its last result."""
+        timings = []
+        for _ in range(repeat):
+            start = time.process_time()
+            result = func()
+            timings.append(time.process_time() - start)
+        return min(timings) * 1000, result
+
+    def handle(self, *args, **options):
+        if options["seed"]:
+            call_command("seed_crm", events=options["seed"], stdout=self.stdout)
+        if orjson is None:
+            self.stderr.write("orjson is not installed, the fast renderer falls back to the standard encoder.")
+
+        level = settings.COMPRESSION["LEVEL"]
+        pages = (
+            (serializers.EventListSerializer, Event.objects.order_by("id")),
+            (serializers.ClientListSerializer, Client.objects.order_by("id")),
+        )
+        for serializer_class, queryset in pages:
+            objects = list(queryset[:options["size"]])
+            # Same serializer with the field mapping of DRF, formatting datetimes with strftime.
+            standard_class = type(
+                f"Standard{serializer_class.__name__}",
+                (serializer_class,),
+                {"serializer_field_mapping": drf_serializers.ModelSerializer.serializer_field_mapping},
+            )
+            standard_time, data = self.measure(
+                lambda: standard_class(objects, many=True).data, options["repeat"]
+            )
+            fast_time, fast_data = self.measure(
+                lambda: serializer_class(objects, many=True).data, options["repeat"]
+            )
+            if fast_data != data:
+                self.stderr.write(f"{serializer_class.__name__}: the fast serialization differs from the standard one")
+            render_time, body = self.measure(lambda: JSONRenderer().render(data), options["repeat"])
+            fast_render_time, fast_body = self.measure(lambda: FastJSONRenderer().render(data), options["repeat"])
+            if fast_body != body:
+                self.stderr.write(f"{serializer_class.__name__}: the fast rendering differs from the standard one")
+
+            self.stdout.write(f"{serializer_class.__name__}, {len(objects)} objects")
+            self.stdout.write(f"  serialize: standard {standard_time:.1f} ms, compiled datetimes {fast_time:.1f} ms")
+            self.stdout.write(
+                f"  render: JSONRenderer {render_time:.1f} ms, FastJSONRenderer {fast_render_time:.1f} ms"
+            )
+            self.stdout.write(f"  body: {len(body)} bytes")
+            for encoding in ("gzip", "deflate"):
+                compress_time, compressed = self.measure(lambda: compress(body, encoding, level), options["repeat"])
+                self.stdout.write(
+                    f"  {encoding} level {level}: {len(compressed)} bytes "
+                    f"({len(compressed) / len(body):.0%}) in {compress_time:.1f} ms"
+                )
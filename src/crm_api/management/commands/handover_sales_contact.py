@@ -0,0 +1,24 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.exceptions import ValidationError
+
+from crm_api.handover import hand_over_sales_contact
+
+
+class Command(BaseCommand):
+    """Hands over all clients and contracts of a departing sales staff member."""
+
+    help = "Moves all clients and contracts of a sales contact to one or several other sales contacts."
+
+    def add_arguments(self, parser):
+        parser.add_argument("from_user", type=int, help="Id of the departing sales contact.")
+        parser.add_argument("to_users", type=int, nargs="+", help="Ids of the sales contacts taking over.")
+        parser.add_argument("--dry-run", action="store_true", help="Shows the plan without modifying anything.")
+
+    def handle(self, *args, **options):
+        try:
+            summary = hand_over_sales_contact(options["from_user"], options["to_users"], dry_run=options["dry_run"])
+        except ValidationError as error:
+            raise CommandError(error.detail["detail"])
+        self.stdout.write(json.dumps(summary, indent=2))
@@ -0,0 +1,81 @@
+import asyncio
+
+from django.core.management.base import BaseCommand, CommandError
+
+from authentication.models import CustomUser
+from crm_api.loadtest import run_load_test
+
+
+def parse_mix(value):
+    """Parses a role mix such as "SA=5,SU=3,M=2" into a dict of weights."""
+    mix = {}
+    for item in value.split(","):
+        role, _, weight = item.partition("=")
+        if role.strip() not in CustomUser.Role.values:
+            raise CommandError(f"Unknown role {role.strip()}, expected one of {', '.join(CustomUser.Role.values)}.")
+        mix[role.strip()] = float(weight or 1)
+    return mix
+
+
+class Command(BaseCommand):
+    """Drives a running server with virtual sales, support and management users, and reports per endpoint."""
+
+    help = (
+        "Load-tests a running server with thousands of concurrent virtual users logged in as the load test "
+        "accounts (usernames starting with load_), and reports throughput, error rates and latency percentiles."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", default="http://127.0.0.1:8000")
+        parser.add_argument("--users", type=int, default=100, help="Number of concurrent virtual users.")
+        parser.add_argument("--mix", type=parse_mix, default="SA=5,SU=3,M=2", help="Weights of the roles.")
+        parser.add_argument("--duration", type=float, default=60, help="Seconds of full load, after the ramp-up.")
+        parser.add_argument("--ramp-up", type=float, default=10, help="Seconds to start all the virtual users.")
+        parser.add_argument("--think-time", type=float, default=1, help="Mean seconds between two calls of a user.")
+        parser.add_argument("--password", default="load-test-password")
+        parser.add_argument(
+            "--create-accounts", type=int, default=0,
+            help="Creates this number of load test accounts per role, with the password, when missing."
+        )
+
+    def create_accounts(self, count, password):
+        for role in CustomUser.Role.values:
+            for number in range(1, count + 1):
+                username = f"load_{role.lower()}_{number}"
+                if not CustomUser.objects.filter(username=username).exists():
+                    user = CustomUser(username=username, first_name="Load", last_name=f"{role} {number}", role=role)
+                    user.set_password(password)
+                    user.save()
+
+    def handle(self, *args, **options):
+        if options["create_accounts"]:
+            self.create_accounts(options["create_accounts"], options["password"])
+        load_users = CustomUser.objects.filter(username__startswith="load_")
+        accounts = {role: [] for role in CustomUser.Role.values}
+        for username, role in load_users.values_list("username", "role"):
+            accounts[role].append({"username": username, "role": role})
+        if not any(accounts[role] for role in options["mix"]):
+            raise CommandError("No load test account for the roles of the mix, use --create-accounts.")
+        context = {
+            "sales_ids": list(load_users.filter(role="SA").values_list("id", flat=True)),
+            "support_ids": list(load_users.filter(role="SU").values_list("id", flat=True)),
+        }
+
+        self.stdout.write(
+            f"{options['users']} virtual users on {options['url']} for {options['ramp_up']:.0f} s of ramp-up "
+            f"and {options['duration']:.0f} s of load"
+        )
+        stats, elapsed = asyncio.run(run_load_test(
+            options["url"], accounts, options["password"], context, options["users"], options["mix"],
+            options["duration"], options["ramp_up"], options["think_time"],
+        ))
+
+        self.stdout.write(
+            f"{'endpoint':32} {'requests':>9} {'req/s':>8} {'errors':>7} {'p50 ms':>8} {'p90 ms':>8} "
+            f"{'p99 ms':>8} {'max ms':>8}  statuses"
+        )
+        for row in stats.report(elapsed):
+            self.stdout.write(
+                f"{row['endpoint']:32} {row['requests']:9} {row['rps']:8.1f} {row['error_rate']:7.1%} "
+                f"{row['p50']:8.1f} {row['p90']:8.1f} {row['p99']:8.1f} {row['max']:8.1f}  {row['statuses']}"
+            )
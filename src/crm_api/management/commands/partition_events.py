@@ -0,0 +1,63 @@
+from datetime import date
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from crm_api import partitions
+
+
+def add_months(day, months):
+    """Gets the first day of the month a number of months after the month of a date."""
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+class Command(BaseCommand):
+    """Partitions the events table by event_date and maintains its partitions."""
+
+    help = (
+        "convert: turns the events table into a table partitioned by event_date (PostgreSQL 13 or later). "
+        "maintain: creates the partitions of the coming periods and archives the old ones holding completed events."
+    )
+
+    def add_arguments(self, parser):
+        config = settings.EVENT_PARTITIONS
+        parser.add_argument("action", choices=("convert", "maintain"))
+        parser.add_argument("--interval", choices=("month", "year"), default=config["INTERVAL"])
+        parser.add_argument("--ahead", type=int, default=config["AHEAD_MONTHS"])
+        parser.add_argument("--archive-after", type=int, default=config["ARCHIVE_AFTER_MONTHS"])
+        parser.add_argument("--drop", action="store_true", help="Drops archived partitions instead of keeping them.")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("Partitioning requires PostgreSQL.")
+        with connection.cursor() as cursor:
+            partitioned = partitions.is_partitioned(cursor)
+
+        if options["action"] == "convert":
+            if partitioned:
+                raise CommandError("The events table is already partitioned.")
+            try:
+                first, last = partitions.convert_to_partitioned(options["interval"])
+            except ValueError as error:
+                raise CommandError(str(error))
+            self.stdout.write(f"Events table partitioned by {options['interval']} from {first} to {last}")
+            return
+
+        if not partitioned:
+            raise CommandError("The events table is not partitioned, run the convert action first.")
+        today = timezone.now().date()
+        try:
+            created = partitions.create_partitions(today, add_months(today, options["ahead"]), options["interval"])
+        except ValueError as error:
+            raise CommandError(str(error))
+        self.stdout.write(f"{len(created)} partitions created{': ' + ', '.join(created) if created else ''}")
+        if options["archive_after"]:
+            archived, kept = partitions.archive_partitions(
+                add_months(today, -options["archive_after"]), drop=options["drop"]
+            )
+            self.stdout.write(f"{len(archived)} partitions {'dropped' if options['drop'] else 'archived'}")
+            for name in kept:
+                self.stdout.write(f"{name} kept as it holds events which are not completed")
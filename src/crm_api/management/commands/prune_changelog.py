@@ -0,0 +1,29 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from crm_api.models import ChangeLog
+
+
+class Command(BaseCommand):
+    """Deletes the old entries of the change feed."""
+
+    help = "Deletes change feed entries older than the given number of days."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=30)
+        parser.add_argument("--batch-size", type=int, default=10000)
+
+    def handle(self, *args, **options):
+        """Deletes the entries batch by batch so that no long transaction is held."""
+        limit = timezone.now() - timedelta(days=options["days"])
+        deleted = 0
+        while True:
+            ids = list(
+                ChangeLog.objects.filter(date_created__lt=limit).values_list("id", flat=True)[:options["batch_size"]]
+            )
+            if not ids:
+                break
+            deleted += ChangeLog.objects.filter(id__in=ids).delete()[0]
+        self.stdout.write(f"{deleted} change feed entries deleted")
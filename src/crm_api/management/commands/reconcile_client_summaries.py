@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from crm_api.summaries import reconcile_summaries
+
+
+class Command(BaseCommand):
+    """Recomputes the contract and event summaries of the clients and fixes the ones which drifted."""
+
+    help = (
+        "Checks the contract count, signed amount, open event count and next event date of every client against "
+        "its contracts and events, and fixes the differences."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--dry-run", action="store_true", help="Reports the differences without fixing them.")
+
+    def handle(self, *args, **options):
+        result = reconcile_summaries(options["batch_size"], dry_run=options["dry_run"])
+        fixed = result["fixed"]
+        self.stdout.write(
+            f"{result['checked']} clients checked, {len(fixed)} {'to fix' if options['dry_run'] else 'fixed'}"
+        )
+        if fixed:
+            self.stdout.write(f"Clients: {', '.join(str(client_id) for client_id in fixed[:100])}")
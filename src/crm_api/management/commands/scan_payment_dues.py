@@ -0,0 +1,26 @@
+import json
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+
+from crm_api.reminders import scan_payment_dues
+
+
+class Command(BaseCommand):
+    """Reminds the sales contacts of the payments due soon or overdue, to be run periodically."""
+
+    help = (
+        "Notifies the sales contacts of their signed contracts whose payment is due soon or overdue. "
+        "Contracts already reminded are skipped, so it can be run as often as needed (e.g. hourly with cron)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=settings.PAYMENT_REMINDERS["BATCH_SIZE"])
+
+    def handle(self, *args, **options):
+        try:
+            summary = scan_payment_dues(batch_size=options["batch_size"])
+        except ImproperlyConfigured as error:
+            raise CommandError(str(error))
+        self.stdout.write(json.dumps(summary, indent=2))
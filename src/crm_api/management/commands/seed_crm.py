@@ -0,0 +1,81 @@
+import random
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from authentication.models import CustomUser
+from crm_api.models import Client, Contract, Event
+
+
+class Command(BaseCommand):
+    """Seeds the database with generated clients, signed contracts and events for benchmarking."""
+
+    help = "Generates clients, signed contracts and events in bulk."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--events", type=int, default=1000000, help="Number of events (and contracts) to create.")
+        parser.add_argument("--events-per-client", type=int, default=10)
+        parser.add_argument("--batch-size", type=int, default=10000)
+
+    def handle(self, *args, **options):
+        """Creates the staff users if needed, then clients, contracts and events batch by batch."""
+        sales = self._get_staff("bench_sales", CustomUser.Role.SALES)
+        support = self._get_staff("bench_support", CustomUser.Role.SUPPORT)
+        now = timezone.now()
+        total = options["events"]
+        per_client = options["events_per_client"]
+        batch_size = options["batch_size"] - options["batch_size"] % per_client or per_client
+
+        created = 0
+        while created < total:
+            size = min(batch_size, total - created)
+            with transaction.atomic():
+                clients = Client.objects.bulk_create([
+                    Client(
+                        first_name="Bench",
+                        last_name=str(created + i),
+                        email=f"bench{created + i}@example.com",
+                        phone="0000000000",
+                        mobile="0000000000",
+                        company_name=f"Company {created + i}",
+                        sales_contact=sales,
+                    )
+                    for i in range(0, size, per_client)
+                ])
+                contracts = Contract.objects.bulk_create([
+                    Contract(
+                        amount=round(random.uniform(100, 100000), 2),
+                        payment_due=now + timedelta(days=random.randint(-365, 365)),
+                        signed=True,
+                        sales_contact=sales,
+                        client=clients[i // per_client],
+                    )
+                    for i in range(size)
+                ])
+                Event.objects.bulk_create([
+                    Event(
+                        title=f"Event {created + i}",
+                        notes="",
+                        attendees=random.randint(1, 500),
+                        status=random.choice(Event.Status.values),
+                        event_date=now + timedelta(hours=random.randint(-24 * 365 * 3, 24 * 365)),
+                        support_contact=support,
+                        client=contract.client,
+                        contract=contract,
+                    )
+                    for i, contract in enumerate(contracts)
+                ])
+            created += size
+            self.stdout.write(f"{created}/{total} events created")
+
+    @staticmethod
+    def _get_staff(username, role):
+        """Gets or creates a staff user of the given role."""
+        user = CustomUser.objects.filter(username=username).first()
+        if user is None:
+            user = CustomUser(username=username, first_name="Bench", last_name=role, role=role)
+            user.set_unusable_password()
+            user.save()
+        return user
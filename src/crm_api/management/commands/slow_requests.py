@@ -0,0 +1,49 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from eventmanager.profiling import read_profiles
+
+
+class Command(BaseCommand):
+    """Lists the slowest profiled requests with their top functions and SQL queries."""
+
+    help = "Reports the slowest requests profiled by the profiling middleware."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--limit", type=int, default=10, help="Number of requests to list.")
+        parser.add_argument("--hours", type=int, default=24, help="Only the requests of the last hours.")
+        parser.add_argument("--path", default="", help="Only the requests whose path starts with this prefix.")
+        parser.add_argument("--functions", type=int, default=5, help="Number of functions listed per request.")
+
+    def handle(self, *args, **options):
+        since = timezone.now() - timedelta(hours=options["hours"])
+        profiles = [
+            profile for profile in read_profiles(settings.PROFILING["DIRECTORY"])
+            if parse_datetime(profile["date"]) >= since and profile["path"].startswith(options["path"])
+        ]
+        profiles.sort(key=lambda profile: profile["duration_ms"], reverse=True)
+        if not profiles:
+            self.stdout.write("No profiled requests")
+            return
+
+        for profile in profiles[:options["limit"]]:
+            self.stdout.write(
+                f"{profile['duration_ms']:.1f} ms  {profile['method']} {profile['path']} -> {profile['status']}  "
+                f"{profile['date']}  {profile['queries']} queries in {profile['queries_ms']:.1f} ms"
+            )
+            self.stdout.write(f"  dump: {profile['dump']}")
+            for function in profile["project_functions"][:options["functions"]]:
+                self.stdout.write(
+                    f"  {function['cumulative_ms']:9.1f} ms cumulative  {function['calls']:6} calls  "
+                    f"{function['function']}"
+                )
+            for function in profile["top_functions"][:options["functions"]]:
+                self.stdout.write(
+                    f"  {function['own_ms']:9.1f} ms own         {function['calls']:6} calls  {function['function']}"
+                )
+            for query in profile["slowest_queries"]:
+                self.stdout.write(f"  {query['ms']:9.1f} ms SQL  {query['sql'][:200]}")
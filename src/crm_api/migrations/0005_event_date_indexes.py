@@ -0,0 +1,21 @@
+# Generated by Django 4.1.5 on 2026-10-19 00:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crm_api', '0004_alter_client_sales_contact_alter_event_contract'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['event_date'], name='event_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['support_contact', 'event_date'], name='event_support_date_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.1.5 on 2026-10-19 00:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crm_api', '0005_event_date_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='contract',
+            index=models.Index(fields=['signed', 'payment_due'], name='contract_signed_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['status', 'event_date'], name='event_status_date_idx'),
+        ),
+    ]
@@ -0,0 +1,53 @@
+from django.db import migrations
+
+TABLES = {
+    "client": "crm_api_client",
+    "contract": "crm_api_contract",
+    "event": "crm_api_event",
+}
+
+CREATE_FUNCTION = """
+CREATE OR REPLACE FUNCTION crm_api_record_change() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        INSERT INTO crm_api_changelog (txid, model, object_id, operation, date_created)
+        VALUES (txid_current(), TG_ARGV[0], OLD.id, 'D', now());
+        RETURN OLD;
+    END IF;
+    INSERT INTO crm_api_changelog (txid, model, object_id, operation, date_created)
+    VALUES (txid_current(), TG_ARGV[0], NEW.id, CASE WHEN TG_OP = 'INSERT' THEN 'C' ELSE 'U' END, now());
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+
+def create_triggers(apps, schema_editor):
+    """Records every change of clients, contracts and events, including bulk updates and cascades."""
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(CREATE_FUNCTION)
+    for model, table in TABLES.items():
+        schema_editor.execute(
+            f"CREATE TRIGGER {table}_change AFTER INSERT OR UPDATE OR DELETE ON {table} "
+            f"FOR EACH ROW EXECUTE PROCEDURE crm_api_record_change('{model}')"
+        )
+
+
+def drop_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for table in TABLES.values():
+        schema_editor.execute(f"DROP TRIGGER IF EXISTS {table}_change ON {table}")
+    schema_editor.execute("DROP FUNCTION IF EXISTS crm_api_record_change()")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crm_api', '0007_changelog'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_triggers, drop_triggers),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.1.5 on 2026-10-19 00:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crm_api', '0008_changelog_triggers'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='client',
+            name='date_deleted',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.1.5 on 2026-10-19 01:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crm_api', '0009_client_date_deleted'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='client',
+            name='version',
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+        migrations.AddField(
+            model_name='contract',
+            name='version',
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='version',
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 4.1.5 on 2026-10-19 01:06
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('crm_api', '0010_versions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PaymentReminder',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('D', 'Due soon'), ('O', 'Overdue')], max_length=1)),
+                ('payment_due', models.DateTimeField()),
+                ('date_created', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='contract',
+            index=models.Index(condition=models.Q(('signed', True)), fields=['payment_due', 'id'], name='contract_due_signed_idx'),
+        ),
+        migrations.AddField(
+            model_name='paymentreminder',
+            name='contract',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='payment_reminders', to='crm_api.contract'),
+        ),
+        migrations.AddField(
+            model_name='paymentreminder',
+            name='sales_contact',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddConstraint(
+            model_name='paymentreminder',
+            constraint=models.UniqueConstraint(fields=('contract', 'kind', 'payment_due'), name='payment_reminder_unique'),
+        ),
+    ]
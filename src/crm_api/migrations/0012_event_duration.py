@@ -0,0 +1,64 @@
+# Generated by Django 4.1.5 on 2026-10-19 01:09
+
+import datetime
+import django.core.validators
+from django.db import migrations, models
+
+PERIOD_FUNCTION = """
+CREATE OR REPLACE FUNCTION crm_api_event_period() RETURNS trigger AS $$
+BEGIN
+    NEW.period := tstzrange(NEW.event_date, NEW.event_date + NEW.duration);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+
+def create_period(apps, schema_editor):
+    """Keeps the period of every event as a range, indexed with its support contact to look for overlaps.
+
+    timestamptz + interval is not immutable, so the range can't be an index expression nor a generated column
+    and is written by a trigger instead.
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    schema_editor.execute("ALTER TABLE crm_api_event ADD COLUMN period tstzrange")
+    schema_editor.execute(PERIOD_FUNCTION)
+    schema_editor.execute(
+        "CREATE TRIGGER crm_api_event_period BEFORE INSERT OR UPDATE OF event_date, duration ON crm_api_event "
+        "FOR EACH ROW EXECUTE PROCEDURE crm_api_event_period()"
+    )
+    schema_editor.execute("UPDATE crm_api_event SET period = tstzrange(event_date, event_date + duration)")
+    schema_editor.execute(
+        "CREATE INDEX event_support_period_idx ON crm_api_event USING gist (support_contact_id, period) "
+        "WHERE status <> 'C'"
+    )
+
+
+def drop_period(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("DROP TRIGGER IF EXISTS crm_api_event_period ON crm_api_event")
+    schema_editor.execute("DROP FUNCTION IF EXISTS crm_api_event_period()")
+    schema_editor.execute("ALTER TABLE crm_api_event DROP COLUMN IF EXISTS period")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crm_api', '0011_payment_reminders'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='duration',
+            field=models.DurationField(default=datetime.timedelta(seconds=14400), validators=[django.core.validators.MinValueValidator(datetime.timedelta(seconds=60))]),
+        ),
+        migrations.AddConstraint(
+            model_name='event',
+            constraint=models.CheckConstraint(check=models.Q(('duration__gt', datetime.timedelta(0))), name='event_duration_positive'),
+        ),
+        migrations.RunPython(create_period, drop_period),
+    ]
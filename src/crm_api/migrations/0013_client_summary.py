@@ -0,0 +1,134 @@
+# Generated by Django 4.1.5 on 2026-10-19 01:14
+
+from django.db import migrations, models
+
+CONTRACT_FUNCTION = """
+CREATE OR REPLACE FUNCTION crm_api_client_contract_summary() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND OLD.client_id = NEW.client_id AND OLD.signed = NEW.signed AND OLD.amount = NEW.amount THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE crm_api_client SET contract_count = contract_count - 1,
+            signed_amount = signed_amount - CASE WHEN OLD.signed THEN OLD.amount ELSE 0 END
+        WHERE id = OLD.client_id;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        UPDATE crm_api_client SET contract_count = contract_count + 1,
+            signed_amount = signed_amount + CASE WHEN NEW.signed THEN NEW.amount ELSE 0 END
+        WHERE id = NEW.client_id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+# The next event date is only looked for again, on the partial index of open events, when the event leaving
+# the open events or moving was the next one.
+EVENT_FUNCTION = """
+CREATE OR REPLACE FUNCTION crm_api_client_event_summary() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND OLD.client_id = NEW.client_id AND OLD.status = NEW.status
+            AND OLD.event_date = NEW.event_date THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.status <> 'C' THEN
+        UPDATE crm_api_client SET open_event_count = open_event_count - 1,
+            next_event_date = CASE WHEN next_event_date < OLD.event_date THEN next_event_date ELSE (
+                SELECT min(event_date) FROM crm_api_event WHERE client_id = OLD.client_id AND status <> 'C'
+            ) END
+        WHERE id = OLD.client_id;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.status <> 'C' THEN
+        UPDATE crm_api_client SET open_event_count = open_event_count + 1,
+            next_event_date = LEAST(next_event_date, NEW.event_date)
+        WHERE id = NEW.client_id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+BACKFILL = """
+UPDATE crm_api_client SET
+    contract_count = (SELECT count(*) FROM crm_api_contract WHERE client_id = crm_api_client.id),
+    signed_amount = (
+        SELECT coalesce(sum(amount), 0) FROM crm_api_contract WHERE client_id = crm_api_client.id AND signed
+    ),
+    open_event_count = (
+        SELECT count(*) FROM crm_api_event WHERE client_id = crm_api_client.id AND status <> 'C'
+    ),
+    next_event_date = (
+        SELECT min(event_date) FROM crm_api_event WHERE client_id = crm_api_client.id AND status <> 'C'
+    )
+"""
+
+
+def create_triggers(apps, schema_editor):
+    """Computes the summaries of the existing clients and keeps them up to date on every change of their
+    contracts and events, including bulk updates and cascades.
+    """
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(CONTRACT_FUNCTION)
+        schema_editor.execute(
+            "CREATE TRIGGER crm_api_contract_summary AFTER INSERT OR UPDATE OR DELETE ON crm_api_contract "
+            "FOR EACH ROW EXECUTE PROCEDURE crm_api_client_contract_summary()"
+        )
+        schema_editor.execute(EVENT_FUNCTION)
+        schema_editor.execute(
+            "CREATE TRIGGER crm_api_event_summary AFTER INSERT OR UPDATE OR DELETE ON crm_api_event "
+            "FOR EACH ROW EXECUTE PROCEDURE crm_api_client_event_summary()"
+        )
+    schema_editor.execute(BACKFILL)
+
+
+def drop_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("DROP TRIGGER IF EXISTS crm_api_contract_summary ON crm_api_contract")
+    schema_editor.execute("DROP TRIGGER IF EXISTS crm_api_event_summary ON crm_api_event")
+    schema_editor.execute("DROP FUNCTION IF EXISTS crm_api_client_contract_summary()")
+    schema_editor.execute("DROP FUNCTION IF EXISTS crm_api_client_event_summary()")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crm_api', '0012_event_duration'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='client',
+            name='contract_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='client',
+            name='next_event_date',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='client',
+            name='open_event_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='client',
+            name='signed_amount',
+            field=models.FloatField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='client',
+            index=models.Index(fields=['signed_amount'], name='client_signed_amount_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='client',
+            index=models.Index(fields=['next_event_date'], name='client_next_event_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(condition=models.Q(('status', 'C'), _negated=True), fields=['client', 'event_date'], name='event_client_open_idx'),
+        ),
+        migrations.RunPython(create_triggers, drop_triggers),
+    ]
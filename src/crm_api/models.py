@@ -1,10 +1,57 @@
+from datetime import timedelta
+
+from django.core.validators import MinValueValidator
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 
 from eventmanager import settings
 
 
-class Client(models.Model):
+class VersionConflict(Exception):
+    """Raised when saving an object whose version changed in the database since it was loaded."""
+
+
+class VersionedModel(models.Model):
+    """Adds a version to a model, incremented by every save.
+
+    Updates are conditional on the version loaded (UPDATE ... WHERE id = %s AND version = %s), so that saving
+    an object modified in the meantime raises VersionConflict instead of overwriting the other change.
+    """
+
+    version = models.PositiveIntegerField(default=1, editable=False)
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Keeps the values loaded from the database, to detect the changed fields when saving."""
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def _do_update(self, base_qs, using, pk_val, values, update_fields, forced_update):
+        version_field = self._meta.get_field("version")
+        values = [value for value in values if value[0] is not version_field]
+        values.append((version_field, None, self.version + 1))
+        updated = super()._do_update(
+            base_qs.filter(version=self.version), using, pk_val, values, update_fields, forced_update
+        )
+        if updated:
+            self.version += 1
+        elif base_qs.filter(pk=pk_val).exists():
+            raise VersionConflict(f"{self._meta.verbose_name} {pk_val} was modified since version {self.version}.")
+        return updated
+
+
+class ClientManager(models.Manager):
+    """Excludes the clients being deleted in the background."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(date_deleted__isnull=True)
+
+
+class Client(VersionedModel):
     """Stores a client, related to :model:`authentication.CustomUser`."""
     first_name = models.CharField(max_length=25)
     last_name = models.CharField(max_length=25)
@@ -20,12 +67,34 @@ class Client(models.Model):
         null=True,
         related_name="client"
     )
+    date_deleted = models.DateTimeField(null=True, blank=True, editable=False)
+    # Summary of the contracts and events of the client, kept up to date by database triggers.
+    contract_count = models.PositiveIntegerField(default=0, editable=False)
+    signed_amount = models.FloatField(default=0, editable=False)
+    open_event_count = models.PositiveIntegerField(default=0, editable=False)
+    next_event_date = models.DateTimeField(null=True, blank=True, editable=False)
+
+    objects = ClientManager()
+    all_objects = models.Manager()
+
+    SUMMARY_FIELDS = ("contract_count", "signed_amount", "open_event_count", "next_event_date")
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["signed_amount"], name="client_signed_amount_idx"),
+            models.Index(fields=["next_event_date"], name="client_next_event_date_idx"),
+        ]
 
     def __str__(self):
         return f"{self.id}. {self.first_name} {self.last_name} - {self.company_name}"
 
+    def _do_update(self, base_qs, using, pk_val, values, update_fields, forced_update):
+        """Leaves the summary out of the UPDATE, so that saving a client never overwrites it with stale values."""
+        values = [value for value in values if value[0].name not in self.SUMMARY_FIELDS]
+        return super()._do_update(base_qs, using, pk_val, values, update_fields, forced_update)
 
-class Contract(models.Model):
+
+class Contract(VersionedModel):
     """Stores a contract, related to :model:`authentication.CustomUser`and :model:`crm_api.Client`."""
     amount = models.FloatField()
     payment_due = models.DateTimeField()
@@ -37,11 +106,46 @@ class Contract(models.Model):
 
     objects = models.Manager()
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["signed", "payment_due"], name="contract_signed_due_idx"),
+            # Only signed contracts have a payment to remind, so the reminder scans stay on a small index.
+            models.Index(fields=["payment_due", "id"], condition=models.Q(signed=True), name="contract_due_signed_idx"),
+        ]
+
     def __str__(self):
         return f"{self.id} - {self.client.first_name} {self.client.last_name} - {self.amount} - {self.signed}"
 
 
-class Event(models.Model):
+class PaymentReminder(models.Model):
+    """Stores a reminder sent to the sales contact of a :model:`crm_api.Contract` whose payment is due soon or overdue.
+
+    A contract gets at most one reminder of each kind per payment due date, so that scans can run again
+    without notifying twice, while a postponed payment is reminded again.
+    """
+
+    class Kind(models.TextChoices):
+        DUE_SOON = 'D', _('Due soon')
+        OVERDUE = 'O', _('Overdue')
+
+    contract = models.ForeignKey(to=Contract, on_delete=models.CASCADE, related_name="payment_reminders")
+    sales_contact = models.ForeignKey(to=settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True)
+    kind = models.CharField(max_length=1, choices=Kind.choices)
+    payment_due = models.DateTimeField()
+    date_created = models.DateTimeField(auto_now_add=True)
+
+    objects = models.Manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["contract", "kind", "payment_due"], name="payment_reminder_unique"),
+        ]
+
+    def __str__(self):
+        return f"{self.id}. Contract {self.contract_id} - {self.kind}"
+
+
+class Event(VersionedModel):
     """Stores an event, related to :model:`authentication.CustomUser`,
      :model:`crm_api.Client` and :model:`crm_api.Contract`.
      """
@@ -56,6 +160,7 @@ class Event(models.Model):
     attendees = models.IntegerField()
     status = models.CharField(max_length=1, choices=Status.choices)
     event_date = models.DateTimeField()
+    duration = models.DurationField(default=timedelta(hours=4), validators=[MinValueValidator(timedelta(minutes=1))])
     date_created = models.DateTimeField(auto_now_add=True)
     date_updated = models.DateTimeField(auto_now=True)
     support_contact = models.ForeignKey(to=settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True)
@@ -64,5 +169,45 @@ class Event(models.Model):
 
     objects = models.Manager()
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["event_date"], name="event_date_idx"),
+            models.Index(fields=["support_contact", "event_date"], name="event_support_date_idx"),
+            models.Index(fields=["status", "event_date"], name="event_status_date_idx"),
+            models.Index(
+                fields=["client", "event_date"], condition=~models.Q(status="C"), name="event_client_open_idx"
+            ),
+        ]
+        constraints = [
+            models.CheckConstraint(check=models.Q(duration__gt=timedelta(0)), name="event_duration_positive"),
+        ]
+
     def __str__(self):
         return f"{self.id}. {self.title} - {self.status}"
+
+
+class ChangeLog(models.Model):
+    """Stores a creation, update or deletion of a :model:`crm_api.Client`, :model:`crm_api.Contract`
+    or :model:`crm_api.Event`, written by database triggers for the change feed.
+    """
+
+    class Operation(models.TextChoices):
+        CREATE = 'C', _('Create')
+        UPDATE = 'U', _('Update')
+        DELETE = 'D', _('Delete')
+
+    txid = models.BigIntegerField()
+    model = models.CharField(max_length=20)
+    object_id = models.BigIntegerField()
+    operation = models.CharField(max_length=1, choices=Operation.choices)
+    date_created = models.DateTimeField(auto_now_add=True)
+
+    objects = models.Manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["txid", "id"], name="changelog_cursor_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.id}. {self.model} {self.object_id} - {self.operation}"
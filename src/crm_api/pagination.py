@@ -0,0 +1,108 @@
+from collections import OrderedDict
+
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.response import Response
+
+
+ESTIMATE_THRESHOLD = 100000
+
+
+def estimated_count(queryset):
+    """Gets the PostgreSQL planner estimate of the rows of a queryset's table.
+
+    Returns None when the queryset is filtered beyond its default manager, distinct or sliced, or when the table
+    has never been analyzed, as the estimate is only meaningful for a whole table.
+    """
+    query = queryset.query
+    if query.where != queryset.model._default_manager.all().query.where:
+        return None
+    if query.distinct or query.low_mark or query.high_mark is not None:
+        return None
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+            [queryset.model._meta.db_table]
+        )
+        row = cursor.fetchone()
+    if row is None or row[0] < 0:
+        return None
+    return row[0]
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator using the planner estimate instead of COUNT(*) for large unfiltered tables."""
+
+    @cached_property
+    def count(self):
+        """Returns the estimated number of objects when above the threshold, the exact one otherwise."""
+        if hasattr(self.object_list, "query"):
+            estimate = estimated_count(self.object_list)
+            if estimate is not None and estimate >= ESTIMATE_THRESHOLD:
+                return estimate
+        return super().count
+
+
+class CountModeLimitOffsetPagination(LimitOffsetPagination):
+    """Limit/offset pagination where the caller chooses how the total count is computed.
+
+    The "count" query parameter takes one of the following values:
+    exact: COUNT(*) on the queryset, as the standard pagination does (default).
+    estimate: PostgreSQL planner estimate when the list is unfiltered, exact count otherwise.
+    none: no count at all, limit + 1 rows are fetched to know whether there is a next page. "count" is null.
+    """
+
+    count_query_param = "count"
+    count_modes = ("exact", "estimate", "none")
+    default_count_mode = "exact"
+
+    def get_count_mode(self, request):
+        """Gets the count mode asked by the request."""
+        count_mode = request.query_params.get(self.count_query_param, self.default_count_mode)
+        if count_mode not in self.count_modes:
+            raise ValidationError({
+                "detail": f"'{self.count_query_param}' must be one of {', '.join(self.count_modes)}."
+            })
+        return count_mode
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.count_mode = self.get_count_mode(request)
+        if self.count_mode != "none":
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return None
+        self.offset = self.get_offset(request)
+        rows = list(queryset[self.offset:self.offset + self.limit + 1])
+        # The number of rows known so far is enough for the standard next/previous link logic.
+        self.count = self.offset + len(rows)
+        return rows[:self.limit]
+
+    def get_count(self, queryset):
+        """Returns the planner estimate in estimate mode when it is available, the exact count otherwise."""
+        if self.count_mode == "estimate" and hasattr(queryset, "query"):
+            estimate = estimated_count(queryset)
+            if estimate is not None:
+                return estimate
+        return super().get_count(queryset)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ("count", None if self.count_mode == "none" else self.count),
+            ("next", self.get_next_link()),
+            ("previous", self.get_previous_link()),
+            ("results", data)
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema["properties"]["count"]["nullable"] = True
+        return response_schema
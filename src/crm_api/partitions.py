@@ -0,0 +1,227 @@
+"""Range partitioning of the events table by event_date (PostgreSQL 13 or later).
+
+The table is converted once by ``convert_to_partitioned``, then ``create_partitions`` keeps partitions ready
+ahead of time and ``archive_partitions`` detaches old partitions holding completed events only.
+
+Unique indexes of a partitioned table must include the partition key, so the uniqueness of an event per contract
+is enforced by a trigger serializing the writes of a contract with an advisory lock.
+"""
+from datetime import date, datetime, timezone as dt_timezone
+
+from django.db import connection, transaction
+
+TABLE = "crm_api_event"
+DEFAULT_PARTITION = f"{TABLE}_default"
+SEQUENCE = f"{TABLE}_partitioned_id_seq"
+CHANGELOG_TABLE = "crm_api_changelog"
+
+UNIQUE_CONTRACT_FUNCTION = f"""
+CREATE OR REPLACE FUNCTION crm_api_event_unique_contract() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_advisory_xact_lock(hashtext('{TABLE}.contract_id'), (NEW.contract_id % 2147483647)::integer);
+    IF EXISTS (SELECT 1 FROM {TABLE} WHERE contract_id = NEW.contract_id AND id <> NEW.id) THEN
+        RAISE EXCEPTION 'duplicate key value violates unique constraint "{TABLE}_contract_id_key"'
+            USING ERRCODE = 'unique_violation';
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+UNIQUE_CONTRACT_TRIGGER = (
+    f"CREATE TRIGGER {TABLE}_unique_contract BEFORE INSERT OR UPDATE OF contract_id ON {TABLE} "
+    f"FOR EACH ROW EXECUTE PROCEDURE crm_api_event_unique_contract()"
+)
+
+
+def is_partitioned(cursor):
+    cursor.execute("SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = %s::regclass)", [TABLE])
+    return cursor.fetchone()[0]
+
+
+def period_start(value, interval):
+    """Gets the first day of the month or year of a date."""
+    return date(value.year, value.month if interval == "month" else 1, 1)
+
+
+def next_period(start, interval):
+    if interval == "year":
+        return date(start.year + 1, 1, 1)
+    return date(start.year + start.month // 12, start.month % 12 + 1, 1)
+
+
+def bound(day):
+    """Gets the UTC midnight of a day, as a partition bound."""
+    return datetime(day.year, day.month, day.day, tzinfo=dt_timezone.utc)
+
+
+def partition_name(start, interval):
+    return f"{TABLE}_p{start:%Y}" if interval == "year" else f"{TABLE}_p{start:%Y_%m}"
+
+
+def parse_partition_name(name):
+    """Gets the (start, end) dates of a partition from its name, or None for the default partition."""
+    suffix = name[len(f"{TABLE}_p"):]
+    if not name.startswith(f"{TABLE}_p") or not suffix[:4].isdigit():
+        return None
+    if len(suffix) == 4:
+        start = date(int(suffix), 1, 1)
+        return start, next_period(start, "year")
+    start = date(int(suffix[:4]), int(suffix[5:7]), 1)
+    return start, next_period(start, "month")
+
+
+def list_partitions(cursor):
+    """Gets the names of the partitions attached to the events table."""
+    cursor.execute(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = %s::regclass ORDER BY c.relname",
+        [TABLE]
+    )
+    return [row[0] for row in cursor.fetchall()]
+
+
+def create_partition(cursor, start, interval):
+    """Creates the partition of a month or year if it does not exist yet. Returns its name when created."""
+    name = partition_name(start, interval)
+    cursor.execute("SELECT to_regclass(%s)", [name])
+    if cursor.fetchone()[0] is not None:
+        return None
+    cursor.execute(
+        f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} WHERE event_date >= %s AND event_date < %s)",
+        [bound(start), bound(next_period(start, interval))]
+    )
+    if cursor.fetchone()[0]:
+        raise ValueError(f"The default partition holds events of {name}, move them before creating it.")
+    cursor.execute(
+        f"CREATE TABLE {name} PARTITION OF {TABLE} FOR VALUES FROM (%s) TO (%s)",
+        [bound(start), bound(next_period(start, interval))]
+    )
+    return name
+
+
+def create_partitions(first, last, interval):
+    """Creates the missing partitions from the period of first to the period of last, included."""
+    created = []
+    with transaction.atomic(), connection.cursor() as cursor:
+        start = period_start(first, interval)
+        while start <= last:
+            name = create_partition(cursor, start, interval)
+            if name:
+                created.append(name)
+            start = next_period(start, interval)
+    return created
+
+
+def convert_to_partitioned(interval):
+    """Converts the events table into a table partitioned by event_date, in a single transaction.
+
+    Partitions are created for the whole range of the existing events, plus a default partition.
+    Columns, indexes (unique ones becoming plain indexes), foreign keys and triggers are recreated
+    on the partitioned table, and the ids keep following the same sequence.
+    Raises ValueError if foreign keys of other tables reference the events table, as their single-column
+    references could not point to the partitioned table's (id, event_date) primary key.
+    """
+    with transaction.atomic(), connection.cursor() as cursor:
+        if is_partitioned(cursor):
+            raise ValueError("The events table is already partitioned.")
+        cursor.execute(f"LOCK TABLE {TABLE} IN ACCESS EXCLUSIVE MODE")
+
+        cursor.execute(
+            "SELECT conrelid::regclass::text, conname FROM pg_constraint "
+            "WHERE confrelid = %s::regclass AND contype = 'f'",
+            [TABLE]
+        )
+        references = cursor.fetchall()
+        if references:
+            raise ValueError(
+                "The events table can't be partitioned while foreign keys reference it: "
+                + ", ".join(f"{table}.{name}" for table, name in references) + "."
+            )
+
+        cursor.execute(
+            "SELECT indexdef FROM pg_indexes WHERE tablename = %s "
+            "AND indexname NOT IN (SELECT conname FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'p')",
+            [TABLE, TABLE]
+        )
+        indexes = [row[0].replace("CREATE UNIQUE INDEX", "CREATE INDEX") for row in cursor.fetchall()]
+        cursor.execute(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = %s::regclass AND contype = 'f'",
+            [TABLE]
+        )
+        foreign_keys = cursor.fetchall()
+        cursor.execute(
+            "SELECT pg_get_triggerdef(oid) FROM pg_trigger WHERE tgrelid = %s::regclass AND NOT tgisinternal",
+            [TABLE]
+        )
+        triggers = [row[0] for row in cursor.fetchall()]
+        cursor.execute(f"SELECT min(event_date), max(event_date), coalesce(max(id), 0) FROM {TABLE}")
+        first, last, max_id = cursor.fetchone()
+
+        cursor.execute(
+            f"CREATE TABLE {TABLE}_new (LIKE {TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+            f"PARTITION BY RANGE (event_date)"
+        )
+        cursor.execute(f"CREATE SEQUENCE {SEQUENCE} START WITH {max_id + 1}")
+        cursor.execute(f"ALTER TABLE {TABLE}_new ALTER COLUMN id SET DEFAULT nextval('{SEQUENCE}')")
+
+        now = datetime.now(dt_timezone.utc).date()
+        first = first.date() if first else now
+        last = max(last.date() if last else now, now)
+        start = period_start(first, interval)
+        while start <= last:
+            cursor.execute(
+                f"CREATE TABLE {partition_name(start, interval)} PARTITION OF {TABLE}_new "
+                f"FOR VALUES FROM (%s) TO (%s)",
+                [bound(start), bound(next_period(start, interval))]
+            )
+            start = next_period(start, interval)
+        cursor.execute(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF {TABLE}_new DEFAULT")
+
+        cursor.execute(f"INSERT INTO {TABLE}_new SELECT * FROM {TABLE}")
+        cursor.execute(f"DROP TABLE {TABLE}")
+        cursor.execute(f"ALTER TABLE {TABLE}_new RENAME TO {TABLE}")
+        cursor.execute(f"ALTER SEQUENCE {SEQUENCE} OWNED BY {TABLE}.id")
+        cursor.execute(f"ALTER TABLE {TABLE} ADD CONSTRAINT {TABLE}_pkey PRIMARY KEY (id, event_date)")
+        for statement in indexes:
+            cursor.execute(statement)
+        for name, definition in foreign_keys:
+            cursor.execute(f"ALTER TABLE {TABLE} ADD CONSTRAINT {name} {definition}")
+        for statement in triggers:
+            cursor.execute(statement)
+        cursor.execute(UNIQUE_CONTRACT_FUNCTION)
+        cursor.execute(UNIQUE_CONTRACT_TRIGGER)
+        cursor.execute(f"ANALYZE {TABLE}")
+    return first, last
+
+
+def archive_partitions(before, drop=False):
+    """Detaches the partitions ending before a date whose events are all completed.
+
+    The archived events are reported as deleted by the change feed.
+    Detached partitions are renamed as archive tables, or dropped with drop.
+    Returns the archived partitions and the ones kept because they still hold events which are not completed.
+    """
+    archived, kept = [], []
+    with transaction.atomic(), connection.cursor() as cursor:
+        for name in list_partitions(cursor):
+            bounds = parse_partition_name(name)
+            if bounds is None or bounds[1] > before:
+                continue
+            cursor.execute(f"SELECT EXISTS (SELECT 1 FROM {name} WHERE status <> 'C')")
+            if cursor.fetchone()[0]:
+                kept.append(name)
+                continue
+            # Detaching fires no trigger: the deletions are written to the change feed as the row triggers would.
+            cursor.execute(
+                f"INSERT INTO {CHANGELOG_TABLE} (txid, model, object_id, operation, date_created) "
+                f"SELECT txid_current(), 'event', id, 'D', now() FROM {name}"
+            )
+            cursor.execute(f"ALTER TABLE {TABLE} DETACH PARTITION {name}")
+            if drop:
+                cursor.execute(f"DROP TABLE {name}")
+            else:
+                cursor.execute(f"ALTER TABLE {name} RENAME TO {name.replace(f'{TABLE}_p', f'{TABLE}_archive_')}")
+            archived.append(name)
+    return archived, kept
@@ -3,6 +3,11 @@ from rest_framework.permissions import BasePermission
 
 
 class StaffPermission(BasePermission):
+    """Checks the model permission matching the request method on the model of the view's perm_slug.
+
+    A view can check other permissions per method with its own permission_map.
+    """
+
     message = "You do not have permission to perform this action"
     permission_map = {
         "GET": "{app_label}.view_{model_name}",
@@ -11,16 +16,17 @@ class StaffPermission(BasePermission):
         "DELETE": "{app_label}.delete_{model_name}",
     }
 
-    def _get_permission(self, method, perm_slug):
+    def _get_permission(self, method, perm_slug, permission_map=None):
+        permission_map = permission_map or self.permission_map
         app, model = perm_slug.split(".")
-        if method not in self.permission_map:
+        if method not in permission_map:
             raise MethodNotAllowed(method)
-        perm = self.permission_map.get(method).format(app_label=app, model_name=model)
+        perm = permission_map.get(method).format(app_label=app, model_name=model)
         return perm
 
     def has_permission(self, request, view):
         perm = self._get_permission(
-            method=request.method, perm_slug=view.perm_slug
+            method=request.method, perm_slug=view.perm_slug, permission_map=getattr(view, "permission_map", None)
         )
         if request.user.has_perm(perm):
             return True
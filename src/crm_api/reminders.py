@@ -0,0 +1,112 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from crm_api.models import Contract, PaymentReminder
+from notifications.broker import get_broker
+from notifications.signals import notify_payment_reminders
+
+KIND_NAMES = {PaymentReminder.Kind.DUE_SOON: "due_soon", PaymentReminder.Kind.OVERDUE: "overdue"}
+
+
+def get_reminder_window(now):
+    """Gets the (start, end) window of the payment due dates to remind."""
+    config = settings.PAYMENT_REMINDERS
+    return now - timedelta(days=config["OVERDUE_DAYS"]), now + timedelta(days=config["DUE_SOON_DAYS"])
+
+
+def iter_due_batches(start, end, batch_size):
+    """Yields the signed contracts whose payment is due in a window, batch by batch.
+
+    Batches follow the (payment_due, id) keyset of the partial index of signed contracts, so that each one
+    is a short index range scan whatever the number of past contracts.
+    """
+    contracts = (
+        Contract.objects.filter(
+            signed=True, payment_due__gte=start, payment_due__lt=end, client__date_deleted__isnull=True
+        )
+        .order_by("payment_due", "id")
+        .values("id", "client_id", "sales_contact_id", "amount", "payment_due")
+    )
+    cursor = Q()
+    while True:
+        batch = list(contracts.filter(cursor)[:batch_size])
+        if not batch:
+            return
+        yield batch
+        last = batch[-1]
+        cursor = Q(payment_due__gt=last["payment_due"]) | Q(payment_due=last["payment_due"], id__gt=last["id"])
+
+
+def remind_batch(contracts, now):
+    """Records and notifies the reminders of a batch of contracts which were not reminded yet.
+
+    Reminders are grouped in one notification per sales contact and kind, sent when the batch is committed.
+    Returns the new reminders.
+    """
+    reminders = [
+        PaymentReminder(
+            contract_id=contract["id"],
+            sales_contact_id=contract["sales_contact_id"],
+            kind=PaymentReminder.Kind.OVERDUE if contract["payment_due"] < now else PaymentReminder.Kind.DUE_SOON,
+            payment_due=contract["payment_due"],
+        )
+        for contract in contracts
+    ]
+    with transaction.atomic():
+        sent = set(
+            PaymentReminder.objects.filter(contract_id__in=[contract["id"] for contract in contracts])
+            .values_list("contract_id", "kind", "payment_due")
+        )
+        reminders = [
+            reminder for reminder in reminders
+            if (reminder.contract_id, reminder.kind, reminder.payment_due) not in sent
+        ]
+        PaymentReminder.objects.bulk_create(reminders, ignore_conflicts=True)
+
+        contracts = {contract["id"]: contract for contract in contracts}
+        groups = defaultdict(list)
+        for reminder in reminders:
+            if reminder.sales_contact_id:
+                groups[reminder.sales_contact_id, reminder.kind].append(contracts[reminder.contract_id])
+        for (sales_contact_id, kind), group in groups.items():
+            notify_payment_reminders(sales_contact_id, KIND_NAMES[kind], group)
+    return reminders
+
+
+def scan_payment_dues(now=None, batch_size=None):
+    """Reminds the sales contacts of their signed contracts whose payment is due soon or overdue.
+
+    Contracts are scanned in batches within the reminder window only, and the reminders already sent are
+    skipped, so the scan can run as often as needed. Returns the number of scanned contracts and the new
+    reminders per sales contact.
+
+    The scan runs in a command or a background job, away from the notification streams: it needs a broker
+    delivering to other processes, otherwise reminders would be recorded as sent without reaching anyone.
+    """
+    if not get_broker().crosses_processes:
+        raise ImproperlyConfigured(
+            "Payment reminders need NOTIFICATIONS['BROKER'] to deliver to other processes, "
+            "e.g. notifications.broker.PostgresBroker."
+        )
+    now = now or timezone.now()
+    batch_size = batch_size or settings.PAYMENT_REMINDERS["BATCH_SIZE"]
+    scanned = 0
+    sales_contacts = defaultdict(lambda: {"due_soon": 0, "overdue": 0})
+    for batch in iter_due_batches(*get_reminder_window(now), batch_size):
+        scanned += len(batch)
+        for reminder in remind_batch(batch, now):
+            sales_contacts[reminder.sales_contact_id][KIND_NAMES[reminder.kind]] += 1
+    return {
+        "scanned": scanned,
+        "reminded": sum(sum(counts.values()) for counts in sales_contacts.values()),
+        "sales_contacts": [
+            {"user": user_id, **counts}
+            for user_id, counts in sorted(sales_contacts.items(), key=lambda item: item[0] or 0)
+        ],
+    }
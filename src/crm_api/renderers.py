@@ -0,0 +1,64 @@
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+try:
+    import orjson
+except ImportError:
+    orjson = None
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+ORJSON_OPTIONS = (orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME) if orjson else 0
+
+
+class ICalendarRenderer(BaseRenderer):
+    """Declares the iCalendar media type for the content negotiation of calendar feeds.
+
+    Feeds are streamed by the views themselves, so this renderer only has to render error payloads.
+    """
+
+    media_type = "text/calendar"
+    format = "ics"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return str(data.get("detail", data) if isinstance(data, dict) else data).encode(self.charset)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer encoding with orjson when it is installed, with the same output as the standard encoder.
+
+    Datetimes and the types orjson does not know are handed to the encoder of DRF.
+    Indented output (browsable API, "indent" media type parameter) keeps the standard encoder.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        ret = orjson.dumps(data, default=self.encoder_class().default, option=ORJSON_OPTIONS)
+        # Same escaping of the line separators as the standard renderer, for JavaScript.
+        if b"\xe2\x80\xa8" in ret or b"\xe2\x80\xa9" in ret:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+        return ret
+
+
+class MessagePackRenderer(BaseRenderer):
+    """Renders MessagePack for the clients sending "Accept: application/msgpack". Requires msgpack.
+
+    Datetimes are encoded as MessagePack timestamps, the serializers' DateTimeField keeping them as datetimes
+    for renderers with native_datetimes. The other types unknown to MessagePack are encoded as in JSON.
+    """
+
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+    native_datetimes = True
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return msgpack.packb(data, datetime=True, default=JSONEncoder().default)
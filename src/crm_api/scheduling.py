@@ -0,0 +1,102 @@
+"""Detection of the events of a support staff member taking place at the same time.
+
+An event lasts from its event_date for its duration. On PostgreSQL, this period is kept by a trigger in a
+tstzrange column, period, indexed with GiST together with the support contact for the events which are not
+completed (see migration 0012), so that looking for the overlaps of a staff member is a single index probe.
+Other databases compare the dates instead.
+"""
+from django.db import connection
+from django.db.models import BooleanField, DateTimeField, ExpressionWrapper, F
+from django.db.models.expressions import RawSQL
+from django.utils import timezone
+
+from authentication.models import CustomUser
+from crm_api.models import Event
+
+
+def with_end_date(events):
+    """Annotates events with their end date, event_date plus duration."""
+    return events.annotate(
+        end_date=ExpressionWrapper(F("event_date") + F("duration"), output_field=DateTimeField())
+    )
+
+
+def overlapping_events(support_contact_id, start, end):
+    """Gets the events of a support contact which are not completed and overlap the period [start, end)."""
+    events = Event.objects.filter(support_contact_id=support_contact_id).exclude(status=Event.Status.COMPLETED)
+    if connection.vendor == "postgresql":
+        return events.filter(
+            RawSQL(f"{Event._meta.db_table}.period && tstzrange(%s, %s)", [start, end], output_field=BooleanField())
+        )
+    return with_end_date(events).filter(event_date__lt=end, end_date__gt=start)
+
+
+def lock_support_contact(support_contact_id):
+    """Locks a support contact until the end of the transaction, to serialize the checks of their schedule."""
+    list(CustomUser.objects.select_for_update().filter(pk=support_contact_id).values_list("pk"))
+
+
+def find_assignment_conflicts(events, support_contact_id):
+    """Gets the conflicts that assigning events to a support contact would create.
+
+    events is a list of (id, start, end) tuples. Checks the events against each other and against the events
+    already assigned to the support contact. Returns a list of (event id, conflicting event id) tuples.
+    """
+    conflicts = []
+    ids = {event_id for event_id, _, _ in events}
+    running = []
+    for event_id, start, end in sorted(events, key=lambda event: event[1]):
+        running = [other for other in running if other[2] > start]
+        conflicts.extend((event_id, other[0]) for other in running)
+        running.append((event_id, start, end))
+        conflicts.extend(
+            (event_id, other_id)
+            for other_id in overlapping_events(support_contact_id, start, end)
+            .exclude(id__in=ids)
+            .values_list("id", flat=True)
+        )
+    return conflicts
+
+
+CONFLICTS_SQL = f"""
+SELECT a.id, b.id FROM {Event._meta.db_table} a
+JOIN {Event._meta.db_table} b ON b.support_contact_id = a.support_contact_id AND b.period && a.period
+    AND b.status <> 'C' AND b.id > a.id AND upper(b.period) > %s
+WHERE a.support_contact_id IS NOT NULL AND a.status <> 'C' AND upper(a.period) > %s
+    AND (%s IS NULL OR a.support_contact_id = %s)
+"""
+
+
+def by_start(event):
+    return event.event_date, event.id
+
+
+def list_conflicts(support_contact_id=None):
+    """Gets the pairs of events of a same support contact which take place at the same time and are not over yet.
+
+    Optionally restricted to one support contact. Returns a list of (event, conflicting event) tuples, ordered by start.
+    """
+    now = timezone.now()
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute(CONFLICTS_SQL, [now, now, support_contact_id, support_contact_id])
+            pairs = cursor.fetchall()
+    else:
+        events = with_end_date(
+            Event.objects.filter(support_contact__isnull=False).exclude(status=Event.Status.COMPLETED)
+        ).filter(end_date__gt=now)
+        if support_contact_id is not None:
+            events = events.filter(support_contact_id=support_contact_id)
+        pairs = []
+        running = []
+        for event in events.order_by("support_contact_id", "event_date", "id"):
+            running = [
+                other for other in running
+                if other.support_contact_id == event.support_contact_id and other.end_date > event.event_date
+            ]
+            pairs.extend((other.id, event.id) for other in running)
+            running.append(event)
+
+    events = Event.objects.in_bulk({event_id for pair in pairs for event_id in pair})
+    pairs = [tuple(sorted((events[first], events[second]), key=by_start)) for first, second in pairs]
+    return sorted(pairs, key=lambda pair: (by_start(pair[0]), by_start(pair[1])))
@@ -1,7 +1,8 @@
 from rest_framework.exceptions import ValidationError
-from rest_framework.serializers import ModelSerializer, CharField
+from rest_framework.serializers import CharField
 
 from authentication.models import CustomUser
+from crm_api.fields import ModelSerializer
 from crm_api.models import Client, Contract, Event
 from django.contrib.auth.password_validation import validate_password
 
@@ -52,7 +53,10 @@ class ClientListSerializer(ModelSerializer):
 
     class Meta:
         model = Client
-        fields = ["id", "first_name", "last_name", "email", "phone", "mobile", "company_name", "sales_contact"]
+        fields = [
+            "id", "first_name", "last_name", "email", "phone", "mobile", "company_name", "sales_contact",
+            "contract_count", "signed_amount", "open_event_count", "next_event_date"
+        ]
 
 
 class ClientDetailSerializer(ModelSerializer):
@@ -71,8 +75,13 @@ class ClientDetailSerializer(ModelSerializer):
             "date_created",
             "date_updated",
             "sales_contact_id",
+            "contract_count",
+            "signed_amount",
+            "open_event_count",
+            "next_event_date",
             "contract",
-            "client_event"
+            "client_event",
+            "version"
         ]
 
     def get_contract(self, instance):
@@ -110,7 +119,8 @@ class ContractDetailSerializer(ModelSerializer):
             "date_updated",
             "sales_contact_id",
             "client_id",
-            "contract_event"
+            "contract_event",
+            "version"
         ]
 
 
@@ -119,7 +129,10 @@ class EventListSerializer(ModelSerializer):
 
     class Meta:
         model = Event
-        fields = ["id", "title", "notes", "attendees", "status", "event_date", "support_contact_id", "client_id", "contract_id"]
+        fields = [
+            "id", "title", "notes", "attendees", "status", "event_date", "duration", "support_contact_id", "client_id",
+            "contract_id"
+        ]
 
 
 class EventDetailSerializer(ModelSerializer):
@@ -134,9 +147,11 @@ class EventDetailSerializer(ModelSerializer):
             "attendees",
             "status",
             "event_date",
+            "duration",
             "date_created",
             "date_updated",
             "support_contact_id",
             "client_id",
-            "contract_id"
+            "contract_id",
+            "version"
         ]
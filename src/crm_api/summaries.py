@@ -0,0 +1,63 @@
+import math
+
+from django.db import transaction
+from django.db.models import Count, FloatField, Min, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from crm_api.models import Client, Contract, Event
+
+
+def with_computed_summaries(clients):
+    """Annotates clients with their summary computed from their contracts and events, prefixed by computed_."""
+    contracts = Contract.objects.filter(client=OuterRef("pk")).order_by().values("client")
+    open_events = (
+        Event.objects.filter(client=OuterRef("pk")).exclude(status=Event.Status.COMPLETED).order_by().values("client")
+    )
+    return clients.annotate(
+        computed_contract_count=Coalesce(Subquery(contracts.annotate(count=Count("id")).values("count")), 0),
+        computed_signed_amount=Coalesce(
+            Subquery(contracts.filter(signed=True).annotate(total=Sum("amount")).values("total")),
+            Value(0.0),
+            output_field=FloatField(),
+        ),
+        computed_open_event_count=Coalesce(Subquery(open_events.annotate(count=Count("id")).values("count")), 0),
+        computed_next_event_date=Subquery(open_events.annotate(first=Min("event_date")).values("first")),
+    )
+
+
+def is_stale(client):
+    """Checks whether the summary of a client annotated by with_computed_summaries differs from the computed one."""
+    return (
+        client.contract_count != client.computed_contract_count
+        or not math.isclose(client.signed_amount, client.computed_signed_amount, abs_tol=0.005)
+        or client.open_event_count != client.computed_open_event_count
+        or client.next_event_date != client.computed_next_event_date
+    )
+
+
+def reconcile_summaries(batch_size=1000, dry_run=False):
+    """Recomputes the summaries of all clients batch by batch and fixes the ones which drifted.
+
+    Each batch of clients is locked while it is checked, so that the triggers maintaining the summaries wait
+    for the fixed values. Returns the number of checked clients and the ids of the fixed ones.
+    """
+    checked = 0
+    fixed = []
+    last_id = 0
+    while True:
+        with transaction.atomic():
+            clients = Client.all_objects.filter(id__gt=last_id).order_by("id")
+            if not dry_run:
+                clients = clients.select_for_update()
+            batch = list(with_computed_summaries(clients)[:batch_size])
+            if not batch:
+                return {"checked": checked, "fixed": fixed}
+            stale = [client for client in batch if is_stale(client)]
+            for client in stale:
+                for field in Client.SUMMARY_FIELDS:
+                    setattr(client, field, getattr(client, f"computed_{field}"))
+            if stale and not dry_run:
+                Client.all_objects.bulk_update(stale, Client.SUMMARY_FIELDS)
+        checked += len(batch)
+        fixed.extend(client.id for client in stale)
+        last_id = batch[-1].id
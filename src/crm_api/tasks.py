@@ -0,0 +1,24 @@
+from authentication.models import CustomUser
+from crm_api.deletion import purge_client
+from crm_api.handover import hand_over_sales_contact
+from crm_api.reminders import scan_payment_dues
+from jobs.registry import register
+
+
+@register("crm_api.handover")
+def handover(from_user_id, to_user_ids, user_id=None):
+    """Hands over all clients and contracts of a sales staff member in the background, on behalf of user_id."""
+    user = CustomUser.objects.filter(pk=user_id).first() if user_id else None
+    return hand_over_sales_contact(from_user_id, to_user_ids, user=user)
+
+
+@register("crm_api.purge_client")
+def purge(client_id):
+    """Deletes a soft-deleted client with all its contracts and events in the background."""
+    return purge_client(client_id)
+
+
+@register("crm_api.scan_payment_dues")
+def payment_reminders():
+    """Reminds the sales contacts of the payments due soon or overdue in the background."""
+    return scan_payment_dues()
@@ -1,3 +1,96 @@
-from django.test import TestCase
+from datetime import datetime, timedelta, timezone
 
-# Create your tests here.
+from django.test import SimpleTestCase
+
+from crm_api.assignment import Schedule, plan_assignment
+from crm_api.handover import plan_contract_handover
+
+MONDAY = datetime(2023, 1, 2, 9, tzinfo=timezone.utc)
+HOUR = timedelta(hours=1)
+
+
+class ScheduleTestCase(SimpleTestCase):
+    """Checks the availability of a support contact given their events."""
+
+    def setUp(self):
+        self.schedule = Schedule(max_duration=4 * HOUR)
+        self.schedule.add(MONDAY, MONDAY + 2 * HOUR)
+
+    def test_free_around_periods(self):
+        self.assertTrue(self.schedule.is_free(MONDAY - 2 * HOUR, MONDAY))
+        self.assertTrue(self.schedule.is_free(MONDAY + 2 * HOUR, MONDAY + 4 * HOUR))
+
+    def test_busy_when_overlapping(self):
+        self.assertFalse(self.schedule.is_free(MONDAY - HOUR, MONDAY + HOUR))
+        self.assertFalse(self.schedule.is_free(MONDAY + HOUR, MONDAY + 3 * HOUR))
+        self.assertFalse(self.schedule.is_free(MONDAY - HOUR, MONDAY + 3 * HOUR))
+
+    def test_busy_within_a_longer_period_starting_before(self):
+        self.schedule.add(MONDAY + 3 * HOUR, MONDAY + 7 * HOUR)
+        self.schedule.add(MONDAY + 4 * HOUR, MONDAY + 5 * HOUR)
+        self.assertFalse(self.schedule.is_free(MONDAY + 6 * HOUR, MONDAY + 8 * HOUR))
+        self.assertTrue(self.schedule.is_free(MONDAY + 7 * HOUR, MONDAY + 8 * HOUR))
+
+
+class PlanAssignmentTestCase(SimpleTestCase):
+    """Checks that events are given to the least loaded support contact who is free."""
+
+    def event(self, event_id, start, attendees=10):
+        return event_id, start, start + 2 * HOUR, attendees
+
+    def assigned_event(self, start, support_id, attendees=10):
+        return (*self.event(None, start, attendees), support_id)
+
+    def test_balances_the_number_of_events(self):
+        events = [self.event(event_id, MONDAY + timedelta(days=event_id)) for event_id in range(1, 5)]
+        plan, unassigned = plan_assignment(events, [], [10, 20], window_days=7)
+        self.assertEqual(unassigned, [])
+        self.assertEqual(sorted(plan.values()), [10, 10, 20, 20])
+
+    def test_balances_attendees_between_equal_numbers_of_events(self):
+        assigned = [
+            self.assigned_event(MONDAY, 10, attendees=100),
+            self.assigned_event(MONDAY + timedelta(days=1), 20, attendees=5),
+        ]
+        plan, unassigned = plan_assignment([self.event(1, MONDAY + timedelta(days=2))], assigned, [10, 20], 7)
+        self.assertEqual(plan, {1: 20})
+
+    def test_counts_the_load_per_window(self):
+        assigned = [self.assigned_event(MONDAY - timedelta(days=7 * week), 10) for week in range(1, 4)]
+        plan, unassigned = plan_assignment([self.event(1, MONDAY + timedelta(days=1))], assigned, [10, 20], 7)
+        self.assertEqual(plan, {1: 10})
+
+    def test_skips_busy_support_contacts(self):
+        assigned = [
+            self.assigned_event(MONDAY, 10),
+            self.assigned_event(MONDAY + timedelta(days=1), 20),
+            self.assigned_event(MONDAY + timedelta(days=2), 20),
+        ]
+        plan, unassigned = plan_assignment([self.event(1, MONDAY + HOUR)], assigned, [10, 20], 7)
+        self.assertEqual(plan, {1: 20})
+
+    def test_leaves_events_nobody_is_free_for(self):
+        events = [self.event(1, MONDAY), self.event(2, MONDAY + HOUR), self.event(3, MONDAY + HOUR)]
+        plan, unassigned = plan_assignment(events, [], [10, 20], 7)
+        self.assertEqual(len(plan), 2)
+        self.assertEqual(plan[1], 10)
+        self.assertEqual(unassigned, [3])
+
+    def test_respects_the_maximum_of_events_per_window(self):
+        events = [self.event(event_id, MONDAY + timedelta(days=event_id)) for event_id in range(1, 4)]
+        plan, unassigned = plan_assignment(events, [], [10], 7, max_events_per_window=2)
+        self.assertEqual(plan, {1: 10, 2: 10})
+        self.assertEqual(unassigned, [3])
+
+
+class PlanContractHandoverTestCase(SimpleTestCase):
+    """Checks that handed over contracts follow their client, or go to the least loaded target."""
+
+    def test_contracts_follow_their_client(self):
+        plan = plan_contract_handover([(1, 100), (2, 200), (3, 100)], {10: [100], 20: [200]}, {})
+        self.assertEqual(plan, {10: [1, 3], 20: [2]})
+
+    def test_spreads_contracts_of_other_clients_by_load(self):
+        contracts = [(1, 100), (2, 300), (3, 300), (4, None)]
+        plan = plan_contract_handover(contracts, {10: [100], 20: []}, {10: 1, 20: 1})
+        self.assertEqual(plan, {10: [1, 3], 20: [2, 4]})
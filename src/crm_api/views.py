@@ -1,13 +1,40 @@
-from django.db import IntegrityError
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Max
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, parse_etags
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.http import http_date, quote_etag, urlencode
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.mixins import ListModelMixin
+from rest_framework.response import Response
 from rest_framework.serializers import ValidationError
-from rest_framework.viewsets import ModelViewSet
+from rest_framework.viewsets import GenericViewSet, ModelViewSet
 
+from audit.recorder import record_deletion
+from audit.views import AuditHistoryMixin
+from authentication.authentication import FeedTokenAuthentication, make_feed_token
 from authentication.models import CustomUser
 from crm_api import serializers
+from crm_api.assignment import assign_support_contacts
+from crm_api.changes import get_changes, get_head_cursor
+from crm_api.deletion import delete_client
+from crm_api.exceptions import Conflict, PreconditionFailed
 from crm_api.filters import ClientFilter, CustomUserFilter, ContractFilter, EventFilter
-from crm_api.models import Client, Contract, Event
+from crm_api.handover import hand_over_sales_contact, validate_handover
+from crm_api.ical import iter_calendar
+from crm_api.models import Client, Contract, Event, VersionConflict
 from crm_api.permissions import StaffPermission
+from crm_api.renderers import ICalendarRenderer
+from crm_api.scheduling import find_assignment_conflicts, list_conflicts, lock_support_contact
+from jobs.registry import enqueue
+from jobs.serializers import JobSerializer
 
 
 class MultipleSerializerMixin:
@@ -26,12 +53,58 @@ class MultipleSerializerMixin:
         return super().get_serializer_class()
 
 
-class CustomUserViewset(MultipleSerializerMixin, ModelViewSet):
+class OptimisticConcurrencyMixin:
+    """Makes the [PATCH] method of a viewset conditional on the version of the object.
+
+    The detail and the update responses carry the version as ETag. A client can send it back in an If-Match
+    header (412 when outdated) or as the "version" field of the body (409 when outdated). In any case, the
+    update is conditional on the version loaded by the request, so concurrent writers never block each other
+    and a lost update ends with a 409 instead.
+    """
+
+    def get_version_etag(self, instance):
+        return quote_etag(str(instance.version))
+
+    def check_version(self, request, instance):
+        """Checks the version expected by the request against the version of the object."""
+        if_match = request.headers.get("If-Match")
+        if if_match and if_match.strip() != "*":
+            etags = [etag[2:] if etag.startswith("W/") else etag for etag in parse_etags(if_match)]
+            if self.get_version_etag(instance) not in etags:
+                raise PreconditionFailed()
+        version = request.data.get("version")
+        if version is not None and str(version) != str(instance.version):
+            raise Conflict()
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        serializer = self.get_serializer(instance)
+        return Response(serializer.data, headers={"ETag": self.get_version_etag(instance)})
+
+    def update(self, request, *args, **kwargs):
+        partial = kwargs.pop("partial", False)
+        instance = self.get_object()
+        self.check_version(request, instance)
+        serializer = self.get_serializer(instance, data=request.data, partial=partial)
+        serializer.is_valid(raise_exception=True)
+        try:
+            self.perform_update(serializer)
+        except VersionConflict:
+            raise Conflict()
+
+        if getattr(instance, "_prefetched_objects_cache", None):
+            instance._prefetched_objects_cache = {}
+        return Response(serializer.data, headers={"ETag": self.get_version_etag(instance)})
+
+
+class CustomUserViewset(AuditHistoryMixin, MultipleSerializerMixin, ModelViewSet):
     """Displays users from :model:`authentication.CustomUser`.
 
     Manages the following endpoints:
     /users
     /users/:user_id
+    /users/:user_id/handover
+    /users/:user_id/history
     """
 
     serializer_class = serializers.CustomUserListSerializer
@@ -45,13 +118,44 @@ class CustomUserViewset(MultipleSerializerMixin, ModelViewSet):
         """Gets all users for every staff member."""
         return CustomUser.objects.all()
 
+    @action(detail=True, methods=["post"])
+    def handover(self, request, pk=None):
+        """Defines the [POST] method handing over all clients and contracts of a sales staff member.
+        Accessible only for management staff and superusers.
+
+        Body: "to" (list of sales staff ids, the clients are spread by load between them), optional "dry_run"
+        and optional "async" to run the handover as a background job (202 with the job).
+        """
+        if request.user.role != "M" and not request.user.is_superuser:
+            raise ValidationError({"detail": "You do not have permissions to hand over clients."})
+        to_user_ids = request.data.get("to", [])
+        if not isinstance(to_user_ids, list):
+            to_user_ids = [to_user_ids]
+        try:
+            to_user_ids = [int(user_id) for user_id in to_user_ids]
+        except (TypeError, ValueError):
+            raise ValidationError({"detail": "'to' must be a list of user ids."})
+        dry_run = str(request.data.get("dry_run", False)).lower() in ("true", "1")
+        run_async = str(request.data.get("async", False)).lower() in ("true", "1")
+        user = self.get_object()
+        if run_async and not dry_run:
+            validate_handover(user.id, to_user_ids)
+            job = enqueue(
+                "crm_api.handover",
+                {"from_user_id": user.id, "to_user_ids": to_user_ids, "user_id": request.user.id},
+                user=request.user,
+            )
+            return Response(JobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+        return Response(hand_over_sales_contact(user.id, to_user_ids, dry_run=dry_run, user=request.user))
+
 
-class ClientViewset(MultipleSerializerMixin, ModelViewSet):
+class ClientViewset(AuditHistoryMixin, OptimisticConcurrencyMixin, MultipleSerializerMixin, ModelViewSet):
     """Displays clients from :model:`crm_api.Client`.
 
     Manages the following endpoints:
     /clients
     /clients/:client_id
+    /clients/:client_id/history
     """
 
     serializer_class = serializers.ClientListSerializer
@@ -72,9 +176,7 @@ class ClientViewset(MultipleSerializerMixin, ModelViewSet):
             return Client.objects.filter(sales_contact=self.request.user)
         elif self.request.user.role == "SU":
             return Client.objects.filter(
-                client_event__in=Event.objects.filter(
-                    support_contact=self.request.user
-                ).distinct("client")
+                id__in=Event.objects.filter(support_contact=self.request.user).values("client_id")
             )
         else:
             return Client.objects.all()
@@ -106,13 +208,27 @@ class ClientViewset(MultipleSerializerMixin, ModelViewSet):
                 else:
                     serializer.save(sales_contact=sales_contact)
 
+    def destroy(self, request, *args, **kwargs):
+        """Re-defines the [DELETE] method for a client, deleting its contracts and events in chunks.
+
+        A client with a large history is hidden at once and purged by a background job (202 with the job).
+        """
+        client = self.get_object()
+        with transaction.atomic():
+            record_deletion(client, user=request.user)
+            job = delete_client(client, user=request.user)
+        if job is not None:
+            return Response(JobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
 
-class ContractViewset(MultipleSerializerMixin, ModelViewSet):
+class ContractViewset(AuditHistoryMixin, OptimisticConcurrencyMixin, MultipleSerializerMixin, ModelViewSet):
     """Displays contracts from :model:`crm_api.Contract`.
 
     Manages the following endpoints:
     /clients/:client_id/contracts
-    /clients/:client_id/contracts/:contract_id.
+    /clients/:client_id/contracts/:contract_id
+    /clients/:client_id/contracts/:contract_id/history
     """
 
     serializer_class = serializers.ContractListSerializer
@@ -129,11 +245,13 @@ class ContractViewset(MultipleSerializerMixin, ModelViewSet):
         Management and superusers: all contracts from the client.
         Sales: all contracts from the client whose sales contact is the user.
         Support: no contract.
+        Contracts of a client being deleted in the background are left out.
         """
+        queryset = Contract.objects.filter(client_id=self.kwargs['client_pk'], client__date_deleted__isnull=True)
         if self.request.user.role == "SA":
-            return Contract.objects.filter(client_id=self.kwargs['client_pk'], sales_contact=self.request.user)
+            return queryset.filter(sales_contact=self.request.user)
         else:
-            return Contract.objects.filter(client_id=self.kwargs['client_pk'])
+            return queryset
 
     def perform_create(self, serializer):
         """Defines the [POST] method for a contract. Accessible only for sales staff.
@@ -195,12 +313,62 @@ class ContractViewset(MultipleSerializerMixin, ModelViewSet):
             super().perform_update(serializer)
 
 
-class EventViewset(MultipleSerializerMixin, ModelViewSet):
+class ContractCollectionViewset(ContractViewset):
+    """Displays contracts from :model:`crm_api.Contract` across all clients, in read-only.
+
+    Manages the following endpoints:
+    /contracts
+    /contracts/:contract_id
+    /contracts/:contract_id/history
+    /contracts/overdue
+    """
+
+    http_method_names = ["get"]
+
+    def get_queryset(self):
+        """Gets the suitable queryset depending on the user's group.
+
+        Management and superusers: all contracts.
+        Sales: all contracts whose sales contact is the user.
+        Support: no contract.
+        Contracts of clients being deleted in the background are left out.
+        """
+        queryset = Contract.objects.filter(client__date_deleted__isnull=True)
+        if self.request.user.role == "SA":
+            return queryset.filter(sales_contact=self.request.user).order_by("id")
+        else:
+            return queryset.order_by("id")
+
+    @action(detail=False)
+    def overdue(self, request):
+        """Lists the signed contracts whose payment is overdue, the oldest first.
+
+        Only the last PAYMENT_REMINDERS["OVERDUE_DAYS"] days are looked at, unless the "days" query parameter
+        is given, so that the list is read from the partial index of signed contracts.
+        """
+        try:
+            days = int(request.query_params.get("days", settings.PAYMENT_REMINDERS["OVERDUE_DAYS"]))
+        except ValueError:
+            days = 0
+        if not 1 <= days <= 3660:
+            raise ValidationError({"detail": "'days' must be a number of days between 1 and 3660."})
+        now = timezone.now()
+        queryset = self.filter_queryset(self.get_queryset()).filter(
+            signed=True, payment_due__gte=now - timedelta(days=days), payment_due__lt=now
+        ).order_by("payment_due", "id")
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(self.get_serializer(page, many=True).data)
+        return Response(self.get_serializer(queryset, many=True).data)
+
+
+class EventViewset(AuditHistoryMixin, OptimisticConcurrencyMixin, MultipleSerializerMixin, ModelViewSet):
     """Displays events from :model:`crm_api.Event`.
 
     Manages the following endpoints:
     /clients/:client_id/events
     /clients/:client_id/events/:event_id
+    /clients/:client_id/events/:event_id/history
     """
 
     serializer_class = serializers.EventListSerializer
@@ -216,11 +384,13 @@ class EventViewset(MultipleSerializerMixin, ModelViewSet):
         Management and superusers: all events associated to the client.
         Sales: no event.
         Support: all events (associated to the client) whose support contact is the user.
+        Events of a client being deleted in the background are left out.
         """
+        queryset = Event.objects.filter(client_id=self.kwargs['client_pk'], client__date_deleted__isnull=True)
         if self.request.user.role == "SU":
-            return Event.objects.filter(client_id=self.kwargs['client_pk'], support_contact=self.request.user)
+            return queryset.filter(support_contact=self.request.user)
         else:
-            return Event.objects.filter(client_id=self.kwargs['client_pk'])
+            return queryset
 
     def perform_create(self, serializer):
         """Defines the [POST] method for an event. Accessible only for sales staff.
@@ -239,6 +409,32 @@ class EventViewset(MultipleSerializerMixin, ModelViewSet):
         else:
             serializer.save(support_contact=None, client_id=self.kwargs['client_pk'], contract_id=contract_id)
 
+    def check_schedule(self, serializer, support_contact=None):
+        """Refuses an update giving the support contact of the event two events at the same time.
+
+        Checked when the support contact, the date, the duration or the status of the event changes.
+        The support contact stays locked until the update is committed, so that concurrent updates can't
+        both pass the check.
+        """
+        event = serializer.instance
+        data = serializer.validated_data
+        if not support_contact and not {"event_date", "duration", "status"} & data.keys():
+            return
+        support_contact_id = support_contact.id if support_contact else event.support_contact_id
+        if support_contact_id is None or data.get("status", event.status) == Event.Status.COMPLETED:
+            return
+        lock_support_contact(support_contact_id)
+        start = data.get("event_date", event.event_date)
+        conflicts = find_assignment_conflicts(
+            [(event.id, start, start + data.get("duration", event.duration))], support_contact_id
+        )
+        if conflicts:
+            event_ids = ", ".join(str(conflict[1]) for conflict in conflicts)
+            raise ValidationError({
+                "detail": f"User {support_contact_id} already has events at that time: {event_ids}."
+            })
+
+    @transaction.atomic
     def perform_update(self, serializer):
         """Re-defines the [PATCH] method for a contract. Accessible only for support, management staff and superusers.
 
@@ -274,6 +470,7 @@ class EventViewset(MultipleSerializerMixin, ModelViewSet):
         if self.request.user.role == "SU" and (contract or client or support_contact):
             raise ValidationError("You can't change the contract id, client id or support contact")
         elif self.request.user.role == "SU":
+            self.check_schedule(serializer)
             super().perform_update(serializer)
         else:
             if support_contact:
@@ -287,6 +484,7 @@ class EventViewset(MultipleSerializerMixin, ModelViewSet):
                     if contract.client != client:
                         raise ValidationError({"detail": f"This contract is not attributed to this client."})
 
+            self.check_schedule(serializer, support_contact or None)
             try:
                 if support_contact and contract and client:
                     serializer.save(support_contact=support_contact, contract=contract, client=client)
@@ -306,3 +504,234 @@ class EventViewset(MultipleSerializerMixin, ModelViewSet):
                     super().perform_update(serializer)
             except IntegrityError:
                 raise ValidationError({"detail": "This contract already has an event"})
+
+
+class EventCollectionViewset(EventViewset):
+    """Displays events from :model:`crm_api.Event` across all clients, in read-only.
+
+    Manages the following endpoints:
+    /events
+    /events/:event_id
+    /events/:event_id/history
+    /events/conflicts
+    """
+
+    http_method_names = ["get"]
+
+    def get_queryset(self):
+        """Gets the suitable queryset depending on the user's group.
+
+        Management and superusers: all events.
+        Sales: no event.
+        Support: all events whose support contact is the user.
+        Events of clients being deleted in the background are left out.
+        """
+        queryset = Event.objects.filter(client__date_deleted__isnull=True)
+        if self.request.user.role == "SU":
+            return queryset.filter(support_contact=self.request.user).order_by("id")
+        else:
+            return queryset.order_by("id")
+
+    @action(detail=False)
+    def conflicts(self, request):
+        """Lists the pairs of events of a same support contact taking place at the same time, not over yet.
+
+        Support staff only get their own conflicts.
+        """
+        support_contact_id = request.user.id if request.user.role == "SU" else None
+        conflicts = list_conflicts(support_contact_id)
+        page = self.paginate_queryset(conflicts)
+        data = [
+            {
+                "support_contact_id": event.support_contact_id,
+                "event": self.get_serializer(event).data,
+                "conflicting_event": self.get_serializer(conflicting_event).data,
+            }
+            for event, conflicting_event in (conflicts if page is None else page)
+        ]
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
+
+
+class DateWindowMixin:
+    """Reads a date window from the "start" and "end" query parameters."""
+
+    default_window = timedelta(days=7)
+    max_window = timedelta(days=366)
+
+    def _get_date_param(self, name):
+        """Gets a date or datetime query parameter as an aware datetime, or None if it is not given."""
+        value = self.request.query_params.get(name)
+        if not value:
+            return None
+        try:
+            parsed = parse_datetime(value)
+            parsed_date = parse_date(value) if parsed is None else None
+        except ValueError:
+            parsed = parsed_date = None
+        if parsed is None:
+            if parsed_date is None:
+                raise ValidationError({"detail": f"'{name}' must be a date or a datetime."})
+            parsed = datetime.combine(parsed_date, time.min)
+        if timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed)
+        return parsed
+
+    def get_window(self):
+        """Gets the (start, end) window. Defaults to default_window from now."""
+        start = self._get_date_param("start") or timezone.now()
+        end = self._get_date_param("end") or start + self.default_window
+        if end <= start:
+            raise ValidationError({"detail": "'end' must be after 'start'."})
+        if end - start > self.max_window:
+            raise ValidationError({"detail": f"The window can't exceed {self.max_window.days} days."})
+        return start, end
+
+
+class CalendarViewset(DateWindowMixin, ListModelMixin, GenericViewSet):
+    """Displays events from :model:`crm_api.Event` of a date window, across all clients.
+
+    Manages the following endpoints:
+    /calendar?start=<date>&end=<date>
+    /calendar/support/:user_id/subscription
+    /calendar/support/:user_id/ics?token=<feed token>
+    """
+
+    serializer_class = serializers.EventListSerializer
+    permission_classes = (StaffPermission,)
+    http_method_names = ["get"]
+    filterset_class = EventFilter
+    perm_slug = "crm_api.event"
+    feed_history = timedelta(days=30)
+
+    def get_queryset(self):
+        """Gets the events of the window, depending on the user's group.
+
+        Management and superusers: all events.
+        Sales: no event.
+        Support: all events whose support contact is the user.
+        """
+        start, end = self.get_window()
+        queryset = Event.objects.filter(event_date__gte=start, event_date__lt=end, client__date_deleted__isnull=True)
+        if self.request.user.role == "SU":
+            queryset = queryset.filter(support_contact=self.request.user)
+        return queryset.order_by("event_date", "id")
+
+    def get_support_contact(self, user_pk):
+        """Gets the support staff member of a feed. Support staff can only access their own feed."""
+        support_contact = get_object_or_404(CustomUser, pk=user_pk, role="SU")
+        if self.request.user.role == "SU" and self.request.user != support_contact:
+            raise ValidationError({"detail": "You do not have permissions to access this calendar."})
+        return support_contact
+
+    @action(detail=False, url_path=r"support/(?P<user_pk>[^/.]+)/subscription")
+    def subscription(self, request, user_pk=None):
+        """Gets the URL to subscribe to the iCalendar feed of a support staff member from a calendar client.
+
+        The URL holds a token of the requesting user, revoked when they change their password.
+        """
+        support_contact = self.get_support_contact(user_pk)
+        url = request.build_absolute_uri(reverse("calendar-support-feed", kwargs={"user_pk": support_contact.pk}))
+        return Response({"url": f"{url}?{urlencode({'token': make_feed_token(request.user)})}"})
+
+    @action(
+        detail=False,
+        url_path=r"support/(?P<user_pk>[^/.]+)/ics",
+        renderer_classes=[ICalendarRenderer],
+        authentication_classes=[FeedTokenAuthentication],
+    )
+    def support_feed(self, request, user_pk=None):
+        """Streams the iCalendar feed of a support staff member's events, from the last 30 days onwards.
+
+        Calendar clients can't send an Authorization header: the user is authenticated by the token of the
+        subscription URL only. ETag and Last-Modified headers allow calendar clients to poll the feed with
+        conditional requests, answered with 304 when nothing has changed.
+        """
+        support_contact = self.get_support_contact(user_pk)
+
+        events = Event.objects.filter(
+            support_contact=support_contact,
+            event_date__gte=timezone.now() - self.feed_history,
+            client__date_deleted__isnull=True,
+        ).order_by("event_date", "id")
+        state = events.aggregate(last_modified=Max("date_updated"), count=Count("id"))
+        last_modified = int(state["last_modified"].timestamp()) if state["last_modified"] else None
+        etag = quote_etag(f"{support_contact.pk}-{state['count']}-{last_modified}")
+
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            name = f"{support_contact.first_name} {support_contact.last_name}"
+            response = StreamingHttpResponse(
+                iter_calendar(events.iterator(chunk_size=2000), name=name),
+                content_type="text/calendar; charset=utf-8",
+            )
+        response["ETag"] = etag
+        if last_modified:
+            response["Last-Modified"] = http_date(last_modified)
+        return response
+
+
+class SupportAssignmentViewset(DateWindowMixin, GenericViewSet):
+    """Assigns the upcoming events without support contact to the support staff, balancing their workload.
+    Accessible only for management staff and superusers.
+
+    Manages the following endpoint:
+    /support-assignments?start=<date>&end=<date>
+    """
+
+    permission_classes = (StaffPermission,)
+    permission_map = {"GET": "{app_label}.change_{model_name}", "POST": "{app_label}.change_{model_name}"}
+    http_method_names = ["get", "post"]
+    perm_slug = "crm_api.event"
+    default_window = timedelta(days=settings.SUPPORT_ASSIGNMENT["HORIZON_DAYS"])
+
+    def check_role(self, request):
+        if request.user.role != "M" and not request.user.is_superuser:
+            raise ValidationError({"detail": "You do not have permissions to assign support contacts."})
+
+    def list(self, request):
+        """Defines the [GET] method previewing the assignments of the window, without modifying anything."""
+        self.check_role(request)
+        return Response(assign_support_contacts(*self.get_window(), dry_run=True))
+
+    def create(self, request):
+        """Defines the [POST] method assigning the events of the window. Body: optional "dry_run"."""
+        self.check_role(request)
+        dry_run = str(request.data.get("dry_run", False)).lower() in ("true", "1")
+        return Response(assign_support_contacts(*self.get_window(), dry_run=dry_run))
+
+
+class ChangeFeedViewset(GenericViewSet):
+    """Displays the creations, updates and deletions of clients, contracts and events for downstream sync.
+
+    Manages the following endpoint:
+    /changes?since=<cursor>&limit=<batch size>
+    """
+
+    permission_classes = (StaffPermission,)
+    http_method_names = ["get"]
+    perm_slug = "crm_api.client"
+    default_limit = 500
+    max_limit = 5000
+
+    def list(self, request):
+        """Gets the batch of changes following the "since" cursor.
+        Accessible only for management staff and superusers.
+
+        since=latest returns the cursor of the last change without any change,
+        to follow the feed after a full download.
+        """
+        if request.user.role != "M" and not request.user.is_superuser:
+            raise ValidationError({"detail": "You do not have permissions to access the change feed."})
+        since = request.query_params.get("since", "")
+        if since == "latest":
+            return Response({"changes": [], "cursor": get_head_cursor(), "has_more": False})
+        try:
+            limit = min(int(request.query_params.get("limit", self.default_limit)), self.max_limit)
+        except ValueError:
+            raise ValidationError({"detail": "'limit' must be an integer."})
+        if limit < 1:
+            raise ValidationError({"detail": "'limit' must be positive."})
+        changes, cursor, has_more = get_changes(since, limit)
+        return Response({"changes": changes, "cursor": cursor, "has_more": has_more})
@@ -13,4 +13,8 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'eventmanager.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from notifications.asgi import NotificationRouter  # noqa: E402 (needs the apps to be loaded)
+
+application = NotificationRouter(django_application)
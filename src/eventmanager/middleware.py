@@ -0,0 +1,159 @@
+import cProfile
+import hmac
+import random
+import time
+import zlib
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+from eventmanager.profiling import write_profile
+
+# Window bits of zlib: gzip container for "gzip", zlib container for "deflate" (RFC 9110).
+WBITS = {"gzip": 31, "deflate": 15}
+
+
+def choose_encoding(accept_encoding):
+    """Gets the preferred of gzip and deflate from an Accept-Encoding header, gzip winning ties, or None."""
+    best, best_quality = None, 0.0
+    for item in accept_encoding.split(","):
+        coding, *params = [part.strip() for part in item.split(";")]
+        coding = coding.lower()
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding == "*":
+            coding = "gzip"
+        if coding in WBITS and (quality > best_quality or (quality == best_quality and coding == "gzip")):
+            best, best_quality = coding, quality
+    return best if best_quality > 0 else None
+
+
+def get_compressor(encoding, level):
+    return zlib.compressobj(level, zlib.DEFLATED, WBITS[encoding])
+
+
+def compress(content, encoding, level):
+    compressor = get_compressor(encoding, level)
+    return compressor.compress(content) + compressor.flush()
+
+
+def compress_stream(chunks, encoding, level, flush_size):
+    """Compresses a streamed body, flushing the compressor every flush_size bytes of input
+    so that the client keeps receiving data while the body is produced.
+    """
+    compressor = get_compressor(encoding, level)
+    pending = 0
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode()
+        data = compressor.compress(chunk)
+        pending += len(chunk)
+        if pending >= flush_size:
+            data += compressor.flush(zlib.Z_SYNC_FLUSH)
+            pending = 0
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """Compresses the API responses with gzip or deflate, as negotiated with the Accept-Encoding header.
+
+    Only the content types of COMPRESSION["CONTENT_TYPES"] are compressed: HTML pages holding CSRF tokens
+    are left out, as compressing them exposes the tokens to BREACH.
+    Bodies smaller than COMPRESSION["MIN_SIZE"] are sent as is and streamed bodies are compressed on the fly.
+    """
+
+    def process_response(self, request, response):
+        config = settings.COMPRESSION
+        content_type = response.get("Content-Type", "").split(";")[0].strip().lower()
+        if content_type not in config["CONTENT_TYPES"] or response.has_header("Content-Encoding"):
+            return response
+        if not response.streaming and len(response.content) < config["MIN_SIZE"]:
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        encoding = choose_encoding(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            response.streaming_content = compress_stream(
+                response.streaming_content, encoding, config["LEVEL"], config["STREAM_FLUSH_SIZE"]
+            )
+            del response.headers["Content-Length"]
+        else:
+            compressed = compress(response.content, encoding, config["LEVEL"])
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers["Content-Length"] = str(len(compressed))
+
+        # The compressed body differs from the original one, a strong ETag can't be kept as is.
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = encoding
+        return response
+
+
+class ProfilingMiddleware:
+    """Profiles with cProfile a sample of the requests, and the requests carrying the profiling header.
+
+    The profile, with the SQL queries and their duration, is written to PROFILING["DIRECTORY"].
+    The header (X-Profile by default) must hold the PROFILING["SECRET"] value.
+    When PROFILING["ENABLED"] is false, the middleware removes itself from the chain.
+    """
+
+    def __init__(self, get_response):
+        config = settings.PROFILING
+        if not config["ENABLED"]:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sample_rate = config["SAMPLE_RATE"]
+        self.secret = config["SECRET"]
+        self.header = "HTTP_" + config["HEADER"].upper().replace("-", "_")
+
+    def should_profile(self, request):
+        # Compared as bytes: compare_digest rejects str holding non-ASCII characters.
+        header = request.META.get(self.header, "").encode("latin-1", "replace")
+        if self.secret and hmac.compare_digest(header, self.secret.encode()):
+            return True
+        return random.random() < self.sample_rate
+
+    def __call__(self, request):
+        if not self.should_profile(request):
+            return self.get_response(request)
+
+        queries = []
+
+        def record_query(execute, sql, params, many, context):
+            start = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                queries.append((time.perf_counter() - start, sql))
+
+        profiler = cProfile.Profile()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(record_query))
+            start = time.perf_counter()
+            profiler.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.disable()
+            duration = time.perf_counter() - start
+        write_profile(request, response, duration, profiler, queries)
+        return response
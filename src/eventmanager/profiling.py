@@ -0,0 +1,86 @@
+import json
+import os
+import pstats
+import uuid
+
+from django.conf import settings
+from django.utils import timezone
+
+
+def summarize_stats(profiler, limit):
+    """Gets the top functions of a profile by own time, and the project's functions by cumulative time."""
+    stats = pstats.Stats(profiler).stats
+    base_dir = str(settings.BASE_DIR)
+
+    def describe(key, value):
+        filename, line, name = key
+        calls, _, own_time, cumulative_time, _ = value
+        return {
+            "function": f"{filename}:{line}({name})",
+            "calls": calls,
+            "own_ms": round(own_time * 1000, 3),
+            "cumulative_ms": round(cumulative_time * 1000, 3),
+        }
+
+    by_own_time = sorted(stats.items(), key=lambda item: item[1][2], reverse=True)[:limit]
+    project = [item for item in stats.items() if item[0][0].startswith(base_dir)]
+    by_cumulative_time = sorted(project, key=lambda item: item[1][3], reverse=True)[:limit]
+    return (
+        [describe(key, value) for key, value in by_own_time],
+        [describe(key, value) for key, value in by_cumulative_time],
+    )
+
+
+def write_profile(request, response, duration, profiler, queries):
+    """Writes the profile of a request to the profiles directory, as a pstats dump and a JSON summary.
+
+    Only the most recent PROFILING["KEEP"] profiles are kept.
+    """
+    config = settings.PROFILING
+    directory = config["DIRECTORY"]
+    os.makedirs(directory, exist_ok=True)
+    now = timezone.now()
+    name = f"{now:%Y%m%d%H%M%S}-{uuid.uuid4().hex[:8]}"
+    profiler.dump_stats(os.path.join(directory, f"{name}.prof"))
+
+    top_functions, project_functions = summarize_stats(profiler, config["TOP_FUNCTIONS"])
+    slowest_queries = sorted(queries, reverse=True)[:config["TOP_QUERIES"]]
+    summary = {
+        "date": now.isoformat(),
+        "method": request.method,
+        "path": request.get_full_path(),
+        "status": response.status_code,
+        "duration_ms": round(duration * 1000, 3),
+        "queries": len(queries),
+        "queries_ms": round(sum(query[0] for query in queries) * 1000, 3),
+        "slowest_queries": [{"ms": round(time * 1000, 3), "sql": sql[:1000]} for time, sql in slowest_queries],
+        "top_functions": top_functions,
+        "project_functions": project_functions,
+    }
+    with open(os.path.join(directory, f"{name}.json"), "w") as file:
+        json.dump(summary, file)
+
+    summaries = sorted(entry for entry in os.listdir(directory) if entry.endswith(".json"))
+    for old in summaries[:-config["KEEP"]]:
+        for extension in (".json", ".prof"):
+            try:
+                os.remove(os.path.join(directory, old[:-len(".json")] + extension))
+            except FileNotFoundError:
+                pass
+
+
+def read_profiles(directory):
+    """Reads the JSON summaries of the profiled requests, each with the name of its pstats dump."""
+    if not os.path.isdir(directory):
+        return []
+    profiles = []
+    for entry in os.listdir(directory):
+        if entry.endswith(".json"):
+            try:
+                with open(os.path.join(directory, entry)) as file:
+                    profile = json.load(file)
+            except (OSError, ValueError):
+                continue
+            profile["dump"] = os.path.join(directory, entry[:-len(".json")] + ".prof")
+            profiles.append(profile)
+    return profiles
@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/4.1/ref/settings/
 """
 import os
 from datetime import timedelta
+from importlib.util import find_spec
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -45,15 +46,24 @@ INSTALLED_APPS = [
     "rest_framework",
     'authentication',
     'crm_api',
+    'jobs',
+    'webhooks',
+    'notifications',
+    'metrics',
+    'audit',
     'django_filters'
 ]
 
 MIDDLEWARE = [
+    'metrics.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'eventmanager.middleware.CompressionMiddleware',
+    'eventmanager.middleware.ProfilingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'audit.middleware.AuditMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -140,15 +150,133 @@ AUTH_USER_MODEL = "authentication.CustomUser"
 
 REST_FRAMEWORK = {
     'DATETIME_FORMAT': "%Y-%m-%d %H:%M",
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.LimitOffsetPagination',
+    'DEFAULT_RENDERER_CLASSES': [
+        'crm_api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'crm_api.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    'DEFAULT_PAGINATION_CLASS': 'crm_api.pagination.CountModeLimitOffsetPagination',
     'PAGE_SIZE': 5,
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'authentication.authentication.JWTAuthentication',
     ),
     'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend']
 }
 
 
+COMPRESSION = {
+    'CONTENT_TYPES': ('application/json', 'text/calendar'),
+    'MIN_SIZE': 1024,
+    'LEVEL': 6,
+    'STREAM_FLUSH_SIZE': 16384,
+}
+
+# MessagePack for the clients asking for it, JSON staying the default.
+if find_spec('msgpack') is not None:
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'].append('crm_api.renderers.MessagePackRenderer')
+    REST_FRAMEWORK['DEFAULT_PARSER_CLASSES'].append('crm_api.parsers.MessagePackParser')
+
+
+PROFILING = {
+    'ENABLED': os.getenv("PROFILING_ENABLED", "") == "1",
+    # Share of the requests profiled, the requests with the header holding the secret always are.
+    'SAMPLE_RATE': 0.01,
+    'HEADER': 'X-Profile',
+    'SECRET': os.getenv("PROFILING_SECRET"),
+    'DIRECTORY': os.path.join(BASE_DIR.parent, "log", "profiles"),
+    'KEEP': 500,
+    'TOP_FUNCTIONS': 15,
+    'TOP_QUERIES': 5,
+}
+
+
+METRICS = {
+    # Shared directory of the per-process metric files, for servers running several processes.
+    'DIRECTORY': os.getenv("METRICS_DIRECTORY"),
+    'FLUSH_INTERVAL': 5,
+    # Bearer token required by the /metrics endpoint. When unset, only logged in staff users can read the metrics.
+    'TOKEN': os.getenv("METRICS_TOKEN"),
+}
+
+
+JOBS = {
+    'CONCURRENCY': 4,
+    'MODE': 'thread',
+    'POLL_INTERVAL': 1,
+    'RETRY_BACKOFF': 10,
+    # Running jobs whose heartbeat is older than STALE_TIMEOUT seconds are queued again when a worker starts.
+    'HEARTBEAT_INTERVAL': 30,
+    'STALE_TIMEOUT': 600,
+}
+
+
+WEBHOOKS = {
+    'BATCH_SIZE': 100,
+    'CONCURRENCY': 8,
+    'TIMEOUT': 10,
+    'RETRY_BACKOFF': 5,
+    'MAX_BACKOFF': 600,
+    'POLL_INTERVAL': 1,
+}
+
+
+CLIENT_DELETION = {
+    'BATCH_SIZE': 1000,
+    # Clients with more contracts and events are deleted by a background job.
+    'ASYNC_THRESHOLD': 5000,
+}
+
+
+PAYMENT_REMINDERS = {
+    # Signed contracts whose payment is due within this number of days are reminded as due soon.
+    'DUE_SOON_DAYS': 7,
+    # Overdue contracts are looked for over this number of days, older ones having been reminded already.
+    'OVERDUE_DAYS': 30,
+    'BATCH_SIZE': 500,
+}
+
+
+SUPPORT_ASSIGNMENT = {
+    # Unassigned events of the coming days are assigned automatically.
+    'HORIZON_DAYS': 30,
+    # Workloads are balanced per period of this number of days.
+    'LOAD_WINDOW_DAYS': 7,
+    # None for no limit.
+    'MAX_EVENTS_PER_WINDOW': None,
+}
+
+
+EVENT_PARTITIONS = {
+    'INTERVAL': 'month',
+    'AHEAD_MONTHS': 3,
+    # 0 never archives.
+    'ARCHIVE_AFTER_MONTHS': 24,
+}
+
+
+NOTIFICATIONS = {
+    # notifications.broker.PostgresBroker when the API and the stream are served by different processes,
+    # and for the payment reminders sent by the scan_payment_dues command or job.
+    'BROKER': 'notifications.broker.InProcessBroker',
+    'QUEUE_SIZE': 100,
+    'HEARTBEAT': 15,
+}
+
+
+AUDIT = {
+    # Entries per INSERT, also the number of waiting entries which triggers a flush.
+    'BATCH_SIZE': 500,
+    # Seconds between the flushes of the buffered entries.
+    'FLUSH_INTERVAL': 2,
+    # Waiting entries beyond which the writers flush by themselves.
+    'MAX_PENDING': 10000,
+}
+
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=1),
     'ROTATE_REFRESH_TOKENS': True,
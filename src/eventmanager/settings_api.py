@@ -0,0 +1,45 @@
+"""
+API-only settings for the workers serving the JWT endpoints.
+
+Use with DJANGO_SETTINGS_MODULE=eventmanager.settings_api. The admin, sessions, messages and static files
+are left out, with the middleware serving them (sessions, CSRF, authentication, messages, clickjacking)
+and the browsable API. Migrations and the admin keep running with eventmanager.settings.
+"""
+from eventmanager.settings import *  # noqa: F401,F403
+from eventmanager.settings import INSTALLED_APPS, REST_FRAMEWORK
+
+INSTALLED_APPS = [
+    app for app in INSTALLED_APPS
+    if app not in (
+        'django.contrib.admin',
+        'django.contrib.sessions',
+        'django.contrib.messages',
+        'django.contrib.staticfiles',
+    )
+]
+
+MIDDLEWARE = [
+    'metrics.middleware.MetricsMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    'eventmanager.middleware.CompressionMiddleware',
+    'eventmanager.middleware.ProfilingMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'audit.middleware.AuditMiddleware',
+]
+
+ROOT_URLCONF = 'eventmanager.urls_api'
+
+TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'APP_DIRS': True,
+    },
+]
+
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    'DEFAULT_RENDERER_CLASSES': [
+        renderer for renderer in REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES']
+        if renderer != 'rest_framework.renderers.BrowsableAPIRenderer'
+    ],
+}
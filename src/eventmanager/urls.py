@@ -14,24 +14,10 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 from django.contrib import admin
-from django.urls import path, include
-from rest_framework_nested import routers
-from rest_framework_simplejwt.views import TokenRefreshView, TokenObtainPairView
+from django.urls import path
 
-from crm_api import views
-
-router = routers.SimpleRouter()
-router.register(r'clients', views.ClientViewset, basename="client")
-router.register(r'users', views.CustomUserViewset, basename="user")
-
-clients_router = routers.NestedSimpleRouter(router, r'clients', lookup='client')
-clients_router.register(r'contracts', views.ContractViewset, basename='client-contracts')
-clients_router.register(r'events', views.EventViewset, basename='client-events')
+from eventmanager import urls_api
 
 urlpatterns = [
     path('admin/', admin.site.urls),
-    path('login/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
-    path('login/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
-    path(r'', include(router.urls)),
-    path(r'', include(clients_router.urls)),
-]
+] + urls_api.urlpatterns
@@ -0,0 +1,30 @@
+"""URL configuration of the API endpoints, used alone by the API-only settings profile."""
+from django.urls import path, include
+from rest_framework_nested import routers
+from rest_framework_simplejwt.views import TokenRefreshView, TokenObtainPairView
+
+from crm_api import views
+from jobs.views import JobViewset
+from metrics.views import metrics
+
+router = routers.SimpleRouter()
+router.register(r'clients', views.ClientViewset, basename="client")
+router.register(r'users', views.CustomUserViewset, basename="user")
+router.register(r'contracts', views.ContractCollectionViewset, basename="contract")
+router.register(r'events', views.EventCollectionViewset, basename="event")
+router.register(r'calendar', views.CalendarViewset, basename="calendar")
+router.register(r'support-assignments', views.SupportAssignmentViewset, basename="support-assignment")
+router.register(r'jobs', JobViewset, basename="job")
+router.register(r'changes', views.ChangeFeedViewset, basename="change")
+
+clients_router = routers.NestedSimpleRouter(router, r'clients', lookup='client')
+clients_router.register(r'contracts', views.ContractViewset, basename='client-contracts')
+clients_router.register(r'events', views.EventViewset, basename='client-events')
+
+urlpatterns = [
+    path('login/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
+    path('login/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('metrics', metrics, name='metrics'),
+    path(r'', include(router.urls)),
+    path(r'', include(clients_router.urls)),
+]
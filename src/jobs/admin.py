@@ -0,0 +1,13 @@
+from django.contrib import admin
+
+from jobs.models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    """Defines how background jobs appear in the admin panel."""
+
+    list_display = ("id", "name", "status", "attempts", "run_after", "created_by", "date_updated")
+    list_filter = ("status", "name")
+    list_select_related = ("created_by",)
+    readonly_fields = ("worker", "result", "error", "attempts", "date_created", "date_updated")
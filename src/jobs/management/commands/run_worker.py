@@ -0,0 +1,62 @@
+import multiprocessing
+import signal
+import threading
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from jobs.worker import requeue_stale_jobs, work
+
+
+def _work_in_process(stop, poll_interval, retry_backoff, once):
+    """Entry point of a worker process, ignoring SIGINT so that the parent handles the shutdown."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    work(stop, poll_interval, retry_backoff, once)
+
+
+class Command(BaseCommand):
+    """Runs the background jobs queued in :model:`jobs.Job`."""
+
+    help = "Runs queued background jobs with a pool of threads or processes."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--concurrency", type=int, default=settings.JOBS["CONCURRENCY"])
+        parser.add_argument("--mode", choices=("thread", "process"), default=settings.JOBS["MODE"])
+        parser.add_argument("--poll-interval", type=float, default=settings.JOBS["POLL_INTERVAL"])
+        parser.add_argument("--once", action="store_true", help="Stops when the queue is empty.")
+
+    def handle(self, *args, **options):
+        """Starts the workers and waits for them until the queue is empty (--once) or until SIGINT/SIGTERM."""
+        requeued = requeue_stale_jobs(settings.JOBS["STALE_TIMEOUT"])
+        if requeued:
+            self.stdout.write(f"{requeued} stale jobs queued again")
+
+        worker_args = (options["poll_interval"], settings.JOBS["RETRY_BACKOFF"], options["once"])
+        if options["mode"] == "process":
+            # Connections must not be shared with the forked processes.
+            connections.close_all()
+            stop = multiprocessing.Event()
+            workers = [
+                multiprocessing.Process(target=_work_in_process, args=(stop, *worker_args))
+                for _ in range(options["concurrency"])
+            ]
+        else:
+            stop = threading.Event()
+            workers = [
+                threading.Thread(target=work, args=(stop, *worker_args))
+                for _ in range(options["concurrency"])
+            ]
+
+        def shutdown(signum, frame):
+            self.stdout.write("Stopping workers after their current job...")
+            stop.set()
+
+        signal.signal(signal.SIGINT, shutdown)
+        signal.signal(signal.SIGTERM, shutdown)
+
+        self.stdout.write(f"Starting {options['concurrency']} {options['mode']} workers")
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
@@ -0,0 +1,18 @@
+# Generated by Django 4.1.5 on 2026-10-19 02:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='heartbeat',
+            field=models.DateTimeField(blank=True, help_text='Refreshed periodically by the worker while the job is running.', null=True),
+        ),
+    ]
@@ -0,0 +1,41 @@
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+from eventmanager import settings
+
+
+class Job(models.Model):
+    """Stores a background job, run by the worker command and related to :model:`authentication.CustomUser`."""
+
+    class Status(models.TextChoices):
+        QUEUED = 'Q', _('Queued')
+        RUNNING = 'R', _('Running')
+        DONE = 'D', _('Done')
+        FAILED = 'F', _('Failed')
+
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=1, choices=Status.choices, default=Status.QUEUED)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    run_after = models.DateTimeField(default=timezone.now)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    worker = models.CharField(max_length=100, blank=True)
+    heartbeat = models.DateTimeField(
+        null=True, blank=True, help_text="Refreshed periodically by the worker while the job is running."
+    )
+    created_by = models.ForeignKey(to=settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
+    date_created = models.DateTimeField(auto_now_add=True)
+    date_updated = models.DateTimeField(auto_now=True)
+
+    objects = models.Manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "run_after"], name="job_status_run_after_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.id}. {self.name} - {self.status}"
@@ -0,0 +1,29 @@
+from django.utils import timezone
+
+from jobs.models import Job
+
+handlers = {}
+
+
+def register(name):
+    """Registers the decorated function as the handler of the jobs of the given name.
+
+    A handler receives the job's payload as keyword arguments and returns a JSON-serializable result.
+    """
+    def decorator(func):
+        handlers[name] = func
+        return func
+    return decorator
+
+
+def enqueue(name, payload=None, user=None, run_after=None, max_attempts=3):
+    """Creates a queued job, to be run by the worker command. Returns the job."""
+    if name not in handlers:
+        raise KeyError(f"No handler registered for the job {name}.")
+    return Job.objects.create(
+        name=name,
+        payload=payload or {},
+        created_by=user,
+        run_after=run_after or timezone.now(),
+        max_attempts=max_attempts,
+    )
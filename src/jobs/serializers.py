@@ -0,0 +1,23 @@
+from rest_framework.serializers import ModelSerializer
+
+from jobs.models import Job
+
+
+class JobSerializer(ModelSerializer):
+    """Serializes objects from :model:`jobs.Job`."""
+
+    class Meta:
+        model = Job
+        fields = [
+            "id",
+            "name",
+            "status",
+            "attempts",
+            "max_attempts",
+            "run_after",
+            "result",
+            "error",
+            "created_by_id",
+            "date_created",
+            "date_updated",
+        ]
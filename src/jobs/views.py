@@ -0,0 +1,27 @@
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.viewsets import ReadOnlyModelViewSet
+
+from jobs.models import Job
+from jobs.serializers import JobSerializer
+
+
+class JobViewset(ReadOnlyModelViewSet):
+    """Displays background jobs from :model:`jobs.Job`.
+
+    Manages the following endpoints:
+    /jobs
+    /jobs/:job_id
+    """
+
+    serializer_class = JobSerializer
+    permission_classes = (IsAuthenticated,)
+
+    def get_queryset(self):
+        """Gets the suitable queryset depending on the user's group.
+
+        Management and superusers: all jobs.
+        Sales and support: the jobs they created.
+        """
+        if self.request.user.role == "M" or self.request.user.is_superuser:
+            return Job.objects.order_by("-id")
+        return Job.objects.filter(created_by=self.request.user).order_by("-id")
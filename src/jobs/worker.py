@@ -0,0 +1,131 @@
+import logging
+import os
+import socket
+import threading
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from jobs.models import Job
+from jobs.registry import handlers
+
+logger = logging.getLogger(__name__)
+
+
+def worker_name():
+    """Gets a name identifying the current worker thread or process."""
+    return f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+
+
+def claim_job(worker):
+    """Locks and marks as running the next due job, skipping jobs already locked by other workers.
+
+    The update is conditional on the job still being queued, so that a job is never claimed twice
+    even by a database ignoring row locks. Returns None when no job is due.
+    """
+    with transaction.atomic():
+        job = (
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(status=Job.Status.QUEUED, run_after__lte=timezone.now())
+            .order_by("run_after", "id")
+            .first()
+        )
+        if job is None:
+            return None
+        now = timezone.now()
+        claimed = Job.objects.filter(pk=job.pk, status=Job.Status.QUEUED).update(
+            status=Job.Status.RUNNING, attempts=F("attempts") + 1, worker=worker, heartbeat=now, date_updated=now
+        )
+    if not claimed:
+        return None
+    job.refresh_from_db()
+    return job
+
+
+def beat(job, done, interval):
+    """Refreshes the heartbeat of a running job every interval seconds until done is set, in its own thread."""
+    try:
+        while not done.wait(interval):
+            try:
+                Job.objects.filter(pk=job.pk, status=Job.Status.RUNNING, worker=job.worker).update(
+                    heartbeat=timezone.now()
+                )
+            except DatabaseError:
+                logger.exception("Heartbeat of job %s failed", job.id)
+                connection.close()
+    finally:
+        connection.close()
+
+
+def run_job(job, retry_backoff):
+    """Runs the handler of a claimed job and stores its result.
+
+    The heartbeat of the job is refreshed by a thread while the handler runs, so that the job is not taken
+    for the job of a dead worker. A failed job is queued again with an exponential backoff until its maximum
+    number of attempts is reached.
+    """
+    done = threading.Event()
+    heartbeat = threading.Thread(target=beat, args=(job, done, settings.JOBS["HEARTBEAT_INTERVAL"]), daemon=True)
+    heartbeat.start()
+    try:
+        handler = handlers[job.name]
+        result = handler(**job.payload)
+    except Exception:
+        job.error = traceback.format_exc()
+        logger.exception("Job %s (%s) failed on attempt %s", job.id, job.name, job.attempts)
+        if job.attempts < job.max_attempts:
+            job.status = Job.Status.QUEUED
+            job.run_after = timezone.now() + timedelta(seconds=retry_backoff * 2 ** (job.attempts - 1))
+        else:
+            job.status = Job.Status.FAILED
+        update_fields = ["status", "error", "run_after", "date_updated"]
+    else:
+        job.status = Job.Status.DONE
+        job.result = result
+        job.error = ""
+        update_fields = ["status", "result", "error", "date_updated"]
+    finally:
+        done.set()
+        heartbeat.join()
+    job.save(update_fields=update_fields)
+
+
+def requeue_stale_jobs(timeout):
+    """Queues again the running jobs whose heartbeat stopped for more than timeout seconds, their worker having died.
+
+    Jobs claimed before heartbeats existed have none, their last update is looked at instead.
+    """
+    limit = timezone.now() - timedelta(seconds=timeout)
+    return Job.objects.filter(
+        Q(heartbeat__lt=limit) | Q(heartbeat__isnull=True, date_updated__lt=limit), status=Job.Status.RUNNING
+    ).update(status=Job.Status.QUEUED, worker="", date_updated=timezone.now())
+
+
+def work(stop, poll_interval, retry_backoff, once=False):
+    """Claims and runs jobs until stop is set, waiting poll_interval seconds when the queue is empty.
+
+    With once, returns as soon as the queue is empty.
+    """
+    name = worker_name()
+    try:
+        while not stop.is_set():
+            close_old_connections()
+            try:
+                job = claim_job(name)
+            except DatabaseError:
+                logger.exception("Worker %s could not claim a job", name)
+                connection.close()
+                stop.wait(poll_interval)
+                continue
+            if job is None:
+                if once:
+                    return
+                stop.wait(poll_interval)
+                continue
+            run_job(job, retry_backoff)
+    finally:
+        connection.close()
@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class MetricsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'metrics'
+
+    def ready(self):
+        """Connects the signal counting the database connections opened."""
+        from metrics import signals  # noqa: F401
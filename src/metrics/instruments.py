@@ -0,0 +1,19 @@
+from metrics.registry import Counter, Gauge, Histogram
+
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "Duration of the requests per view action.", ("view", "method", "status")
+)
+REQUESTS_IN_PROGRESS = Gauge("http_requests_in_progress", "Requests being served.")
+CONDITIONAL_REQUESTS = Counter(
+    "http_conditional_requests_total",
+    "Conditional requests per view, result being hit (304 Not Modified) or miss.",
+    ("view", "result"),
+)
+DB_QUERIES = Counter("db_queries_total", "Database queries per view action.", ("view",))
+DB_QUERY_SECONDS = Counter("db_query_seconds_total", "Time spent in database queries per view action.", ("view",))
+DB_CONNECTIONS_OPENED = Counter("db_connections_opened_total", "Database connections opened.", ("alias",))
+SERIALIZER_SECONDS = Histogram("serializer_duration_seconds", "Duration of the serializations.", ("serializer",))
+AUTHENTICATION_SECONDS = Histogram(
+    "jwt_authentication_duration_seconds", "Duration of the JWT authentications.", ("result",)
+)
+NOTIFICATION_STREAMS = Gauge("notification_streams", "Open notification streams.")
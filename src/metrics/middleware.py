@@ -0,0 +1,58 @@
+import time
+from contextlib import ExitStack
+
+from django.db import connections
+
+from metrics.instruments import (
+    CONDITIONAL_REQUESTS, DB_QUERIES, DB_QUERY_SECONDS, REQUEST_SECONDS, REQUESTS_IN_PROGRESS
+)
+
+
+def get_view_label(request):
+    """Gets the label of the view serving a request, "ClientViewset.list" for a viewset action."""
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "unmatched"
+    view_class = getattr(match.func, "cls", None)
+    if view_class is None:
+        return match.view_name or match._func_path
+    actions = getattr(match.func, "actions", None) or {}
+    return f"{view_class.__name__}.{actions.get(request.method.lower(), request.method.lower())}"
+
+
+class MetricsMiddleware:
+    """Records the duration, database queries and conditional request results of every request."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        queries = [0, 0.0]
+
+        def record_query(execute, sql, params, many, context):
+            start = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                queries[0] += 1
+                queries[1] += time.perf_counter() - start
+
+        REQUESTS_IN_PROGRESS.inc()
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(record_query))
+                response = self.get_response(request)
+        finally:
+            REQUESTS_IN_PROGRESS.dec()
+        duration = time.perf_counter() - start
+
+        view = get_view_label(request)
+        REQUEST_SECONDS.observe(duration, view=view, method=request.method, status=response.status_code)
+        if queries[0]:
+            DB_QUERIES.inc(queries[0], view=view)
+            DB_QUERY_SECONDS.inc(queries[1], view=view)
+        if "HTTP_IF_NONE_MATCH" in request.META or "HTTP_IF_MODIFIED_SINCE" in request.META:
+            CONDITIONAL_REQUESTS.inc(view=view, result="hit" if response.status_code == 304 else "miss")
+        return response
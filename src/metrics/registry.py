@@ -0,0 +1,220 @@
+"""In-process metrics registry exposed in the Prometheus text format.
+
+Each process records its metrics in memory. When METRICS["DIRECTORY"] is set, it also writes them
+every METRICS["FLUSH_INTERVAL"] seconds to its own file of this directory, so that the scrape endpoint,
+served by any process of a pre-fork server, adds up the metrics of all of them. Counters and histograms
+of exited processes are kept, gauges only count the living processes. Clear the directory when deploying.
+"""
+import atexit
+import bisect
+import json
+import math
+import os
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+def format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+def escape_label(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{escape_label(value)}"' for name, value in pairs) + "}"
+
+
+class Metric:
+    """Base of the metrics, holding a value per combination of label values."""
+
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=(), registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+        self.registry = registry or REGISTRY
+        self.registry.register(self)
+
+    def key(self, labels):
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def merge(self, current, value):
+        return current + value
+
+    def samples(self, values):
+        """Gets the (suffix, label values, extra labels, value) of the exposition lines."""
+        for key, value in sorted(values.items()):
+            yield "", key, (), value
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self.key(labels)
+        with self.registry.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+        self.registry.maybe_flush()
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def inc(self, amount=1, **labels):
+        key = self.key(labels)
+        with self.registry.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+        self.registry.maybe_flush()
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    """Histogram whose value is a list of counts per bucket, the last one for +Inf, followed by the sum."""
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS, registry=None):
+        self.buckets = tuple(buckets)
+        super().__init__(name, documentation, labelnames, registry)
+
+    def observe(self, amount, **labels):
+        key = self.key(labels)
+        index = bisect.bisect_left(self.buckets, amount)
+        with self.registry.lock:
+            value = self.values.get(key)
+            if value is None:
+                value = self.values[key] = [0] * (len(self.buckets) + 2)
+            value[index] += 1
+            value[-1] += amount
+        self.registry.maybe_flush()
+
+    def merge(self, current, value):
+        return [a + b for a, b in zip(current, value)]
+
+    def samples(self, values):
+        for key, value in sorted(values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), value[:-1]):
+                cumulative += count
+                yield "_bucket", key, (("le", format_value(bound)),), cumulative
+            yield "_sum", key, (), value[-1]
+            yield "_count", key, (), cumulative
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = {}
+        self.lock = threading.Lock()
+        self.last_flush = time.monotonic()
+        os.register_at_fork(after_in_child=self.reset)
+        atexit.register(self.flush)
+
+    def register(self, metric):
+        self.metrics[metric.name] = metric
+
+    def reset(self):
+        """Forgets the values inherited from the parent process after a fork."""
+        self.lock = threading.Lock()
+        self.last_flush = time.monotonic()
+        for metric in self.metrics.values():
+            metric.values = {}
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                name: [[list(key), value] for key, value in metric.values.items()]
+                for name, metric in self.metrics.items()
+            }
+
+    def maybe_flush(self):
+        config = settings.METRICS
+        if config["DIRECTORY"] and time.monotonic() - self.last_flush >= config["FLUSH_INTERVAL"]:
+            self.flush()
+
+    def flush(self):
+        """Writes the metrics of this process to its file, atomically."""
+        directory = settings.METRICS["DIRECTORY"] if settings.configured else None
+        if not directory:
+            return
+        self.last_flush = time.monotonic()
+        os.makedirs(directory, exist_ok=True)
+        data = json.dumps(self.snapshot())
+        descriptor, path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+        with os.fdopen(descriptor, "w") as file:
+            file.write(data)
+        os.replace(path, os.path.join(directory, f"metrics-{os.getpid()}.json"))
+
+    def read_processes(self):
+        """Gets the snapshots of all the processes, with whether each process is alive, this one being live."""
+        pid = os.getpid()
+        processes = [(self.snapshot(), True)]
+        directory = settings.METRICS["DIRECTORY"]
+        if not directory or not os.path.isdir(directory):
+            return processes
+        for entry in os.listdir(directory):
+            if not (entry.startswith("metrics-") and entry.endswith(".json")):
+                continue
+            other_pid = int(entry[len("metrics-"):-len(".json")])
+            if other_pid == pid:
+                continue
+            try:
+                with open(os.path.join(directory, entry)) as file:
+                    snapshot = json.load(file)
+            except (OSError, ValueError):
+                continue
+            processes.append((snapshot, is_alive(other_pid)))
+        return processes
+
+    def collect(self):
+        """Adds up the values of every metric over the processes."""
+        totals = {name: {} for name in self.metrics}
+        for snapshot, alive in self.read_processes():
+            for name, samples in snapshot.items():
+                metric = self.metrics.get(name)
+                if metric is None or (metric.kind == "gauge" and not alive):
+                    continue
+                values = totals[name]
+                for key, value in samples:
+                    key = tuple(key)
+                    values[key] = metric.merge(values[key], value) if key in values else value
+        return totals
+
+    def exposition(self):
+        """Renders all the metrics in the Prometheus text format."""
+        lines = []
+        for name, values in self.collect().items():
+            metric = self.metrics[name]
+            lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            for suffix, key, extra, value in metric.samples(values):
+                lines.append(f"{name}{suffix}{format_labels(metric.labelnames, key, extra)} {format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def is_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+REGISTRY = Registry()
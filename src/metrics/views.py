@@ -0,0 +1,25 @@
+import hmac
+
+from django.conf import settings
+from django.http import HttpResponse
+
+from metrics.registry import REGISTRY
+
+
+def metrics(request):
+    """Serves the metrics of all the processes in the Prometheus text format.
+
+    When METRICS["TOKEN"] is set, the scraper must send it as a bearer token.
+    Otherwise, only staff users logged in to the admin panel can read them.
+    """
+    token = settings.METRICS["TOKEN"]
+    if token:
+        # Compared as bytes: compare_digest rejects str holding non-ASCII characters.
+        authorization = request.META.get("HTTP_AUTHORIZATION", "").encode("latin-1", "replace")
+        if not hmac.compare_digest(authorization, f"Bearer {token}".encode()):
+            return HttpResponse(status=401)
+    else:
+        user = getattr(request, "user", None)
+        if user is None or not user.is_staff:
+            return HttpResponse(status=403)
+    return HttpResponse(REGISTRY.exposition(), content_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,102 @@
+import asyncio
+import json
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.tokens import AccessToken
+
+from authentication.models import CustomUser
+from metrics.instruments import NOTIFICATION_STREAMS
+from notifications.broker import get_broker
+
+
+def get_token(scope):
+    """Gets the JWT access token from the Authorization header or, for EventSource clients, the token parameter."""
+    for name, value in scope["headers"]:
+        if name == b"authorization" and value.startswith(b"Bearer "):
+            return value[7:].decode()
+    return parse_qs(scope["query_string"].decode()).get("token", [None])[0]
+
+
+@sync_to_async
+def get_active_user_id(token):
+    """Gets the id of the active user of a valid access token, or None."""
+    try:
+        user_id = AccessToken(token)[settings.SIMPLE_JWT.get("USER_ID_CLAIM", "user_id")]
+    except (TokenError, KeyError):
+        return None
+    return CustomUser.objects.filter(pk=user_id, is_active=True).values_list("id", flat=True).first()
+
+
+async def send_error(send, status, detail):
+    await send({"type": "http.response.start", "status": status, "headers": [(b"content-type", b"application/json")]})
+    await send({"type": "http.response.body", "body": json.dumps({"detail": detail}).encode()})
+
+
+async def event_stream(scope, receive, send):
+    """Streams the notifications of the authenticated user as server-sent events.
+
+    Each connection is a coroutine waiting on a bounded queue, with a comment sent as heartbeat
+    when idle, so that thousands of idle connections only cost memory.
+    """
+    token = get_token(scope)
+    user_id = await get_active_user_id(token) if token else None
+    if user_id is None:
+        await send_error(send, 401, "Authentication credentials were not provided or are invalid.")
+        return
+
+    broker = get_broker()
+    subscription = broker.subscribe(user_id)
+    NOTIFICATION_STREAMS.inc()
+    disconnected = asyncio.Event()
+
+    async def wait_for_disconnect():
+        while (await receive())["type"] != "http.disconnect":
+            pass
+        disconnected.set()
+
+    watcher = asyncio.create_task(wait_for_disconnect())
+    try:
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"text/event-stream"),
+                (b"cache-control", b"no-cache"),
+                (b"x-accel-buffering", b"no"),
+            ],
+        })
+        await send({"type": "http.response.body", "body": b": connected\n\n", "more_body": True})
+        while not disconnected.is_set():
+            message = await subscription.get(settings.NOTIFICATIONS["HEARTBEAT"])
+            if disconnected.is_set():
+                break
+            if message is None:
+                chunk = b": heartbeat\n\n"
+            else:
+                if subscription.dropped:
+                    message = dict(message, dropped=subscription.dropped)
+                    subscription.dropped = 0
+                chunk = f"event: {message['type']}\ndata: {json.dumps(message)}\n\n".encode()
+            await send({"type": "http.response.body", "body": chunk, "more_body": True})
+    finally:
+        broker.unsubscribe(subscription)
+        NOTIFICATION_STREAMS.dec()
+        watcher.cancel()
+
+
+class NotificationRouter:
+    """Serves the notification stream and hands every other request to the Django application."""
+
+    path = "/notifications/stream/"
+
+    def __init__(self, django_application):
+        self.django_application = django_application
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"] == self.path:
+            await event_stream(scope, receive, send)
+        else:
+            await self.django_application(scope, receive, send)
@@ -0,0 +1,141 @@
+import asyncio
+import json
+import logging
+import select
+import threading
+
+from django.conf import settings
+from django.db import connection, connections, transaction
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    """Receives the notifications of a user for one connection, in a bounded queue.
+
+    When the client reads slower than notifications arrive, the oldest ones are dropped
+    and the number of dropped notifications is reported, so that the client can resync.
+    """
+
+    def __init__(self, user_id, maxsize):
+        self.user_id = user_id
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def put(self, message):
+        """Queues a message. Must be called from the subscription's event loop."""
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(message)
+
+    async def get(self, timeout):
+        """Waits for the next message, returning None after timeout seconds."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class InProcessBroker:
+    """Dispatches notifications to the subscriptions of the current process.
+
+    Messages are published once the current transaction is committed. Subscriptions only exist in ASGI
+    processes, so this broker needs the API to be served by the same process as the push channel, and can't
+    deliver what commands or background jobs publish.
+    """
+
+    crosses_processes = False
+
+    def __init__(self):
+        self.subscriptions = {}
+        self.lock = threading.Lock()
+
+    def subscribe(self, user_id):
+        subscription = Subscription(user_id, settings.NOTIFICATIONS["QUEUE_SIZE"])
+        with self.lock:
+            self.subscriptions.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            user_subscriptions = self.subscriptions.get(subscription.user_id, set())
+            user_subscriptions.discard(subscription)
+            if not user_subscriptions:
+                self.subscriptions.pop(subscription.user_id, None)
+
+    def dispatch(self, user_id, message):
+        """Hands a message to every subscription of the user, from any thread."""
+        with self.lock:
+            user_subscriptions = list(self.subscriptions.get(user_id, ()))
+        for subscription in user_subscriptions:
+            subscription.loop.call_soon_threadsafe(subscription.put, message)
+
+    def publish(self, user_id, message):
+        transaction.on_commit(lambda: self.dispatch(user_id, message))
+
+
+class PostgresBroker(InProcessBroker):
+    """Dispatches notifications between processes with PostgreSQL LISTEN/NOTIFY.
+
+    NOTIFY is sent in the current transaction, so PostgreSQL delivers it on commit only.
+    Each process with subscriptions runs a listener thread with its own connection.
+    """
+
+    channel = "crm_notifications"
+    crosses_processes = True
+    # PostgreSQL refuses NOTIFY payloads of 8000 bytes or more.
+    max_payload = 7999
+
+    def __init__(self):
+        super().__init__()
+        self.listener = None
+
+    def subscribe(self, user_id):
+        with self.lock:
+            if self.listener is None:
+                self.listener = threading.Thread(target=self.listen, daemon=True)
+                self.listener.start()
+        return super().subscribe(user_id)
+
+    def publish(self, user_id, message):
+        payload = json.dumps({"user": user_id, "message": message})
+        if len(payload.encode()) > self.max_payload:
+            raise ValueError(f"The {message.get('type')} notification exceeds {self.max_payload} bytes.")
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_notify(%s, %s)", [self.channel, payload])
+
+    def listen(self):
+        """Listens to the notifications of all processes and dispatches them to the local subscriptions."""
+        while True:
+            try:
+                database = connections.create_connection("default")
+                database.ensure_connection()
+                pg_connection = database.connection
+                pg_connection.autocommit = True
+                with pg_connection.cursor() as cursor:
+                    cursor.execute(f"LISTEN {self.channel}")
+                while True:
+                    if select.select([pg_connection], [], [], 30) == ([], [], []):
+                        continue
+                    pg_connection.poll()
+                    while pg_connection.notifies:
+                        notify = pg_connection.notifies.pop(0)
+                        data = json.loads(notify.payload)
+                        self.dispatch(data["user"], data["message"])
+            except Exception:
+                logger.exception("Notification listener disconnected, reconnecting")
+                threading.Event().wait(5)
+
+
+_broker = None
+
+
+def get_broker():
+    """Gets the broker of the process, as configured by NOTIFICATIONS["BROKER"]."""
+    global _broker
+    if _broker is None:
+        _broker = import_string(settings.NOTIFICATIONS["BROKER"])()
+    return _broker
@@ -0,0 +1,72 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from crm_api.models import Event
+from notifications.broker import get_broker
+
+# Up to about 135 bytes per contract, so that 50 contracts fit in a PostgreSQL notification.
+PAYMENT_REMINDER_CHUNK_SIZE = 50
+
+
+def event_message(kind, event):
+    """Builds the notification of a change of an event."""
+    return {
+        "type": kind,
+        "event_id": event.id,
+        "client_id": event.client_id,
+        "title": event.title,
+        "status": event.status,
+        "event_date": event.event_date.isoformat(),
+    }
+
+
+def notify_event_update(event, previous_support_contact_id, previous_status):
+    """Notifies the support contacts concerned by the assignment or the status change of an event."""
+    broker = get_broker()
+    if event.support_contact_id != previous_support_contact_id:
+        if event.support_contact_id:
+            broker.publish(event.support_contact_id, event_message("event.assigned", event))
+        if previous_support_contact_id:
+            broker.publish(previous_support_contact_id, event_message("event.unassigned", event))
+    elif event.status != previous_status and event.support_contact_id:
+        broker.publish(event.support_contact_id, event_message("event.status", event))
+
+
+@receiver(post_save, sender=Event)
+def notify_saved_event(sender, instance, created, **kwargs):
+    """Notifies the changes of an event saved through the API or the admin panel."""
+    loaded_values = getattr(instance, "_loaded_values", None)
+    if not created and loaded_values is not None:
+        notify_event_update(instance, loaded_values.get("support_contact_id"), loaded_values.get("status"))
+    instance._loaded_values = {"support_contact_id": instance.support_contact_id, "status": instance.status}
+
+
+def notify_bulk_update(events, **values):
+    """Notifies the changes of events updated in bulk, given their state before the update."""
+    for event in events:
+        previous_support_contact_id, previous_status = event.support_contact_id, event.status
+        for field, value in values.items():
+            setattr(event, field, value)
+        notify_event_update(event, previous_support_contact_id, previous_status)
+
+
+def notify_payment_reminders(sales_contact_id, kind, contracts):
+    """Notifies a sales contact of their contracts whose payment is due soon or overdue.
+
+    Contracts are sent by chunks of PAYMENT_REMINDER_CHUNK_SIZE, so that each message stays below
+    the size limit of PostgreSQL notifications.
+    """
+    broker = get_broker()
+    for index in range(0, len(contracts), PAYMENT_REMINDER_CHUNK_SIZE):
+        broker.publish(sales_contact_id, {
+            "type": f"contract.payment_{kind}",
+            "contracts": [
+                {
+                    "contract_id": contract["id"],
+                    "client_id": contract["client_id"],
+                    "amount": contract["amount"],
+                    "payment_due": contract["payment_due"].isoformat(),
+                }
+                for contract in contracts[index:index + PAYMENT_REMINDER_CHUNK_SIZE]
+            ],
+        })
@@ -0,0 +1,21 @@
+from django.contrib import admin
+
+from webhooks.models import OutboxMessage, WebhookEndpoint
+
+
+@admin.register(WebhookEndpoint)
+class WebhookEndpointAdmin(admin.ModelAdmin):
+    """Defines how webhook endpoints appear in the admin panel."""
+
+    list_display = ("id", "name", "url", "is_active", "cursor", "failures", "paused_until")
+    list_filter = ("is_active",)
+    readonly_fields = ("failures", "paused_until", "last_error", "date_created", "date_updated")
+
+
+@admin.register(OutboxMessage)
+class OutboxMessageAdmin(admin.ModelAdmin):
+    """Defines how outbox messages appear in the admin panel."""
+
+    list_display = ("id", "topic", "txid", "date_created")
+    list_filter = ("topic",)
+    show_full_result_count = False
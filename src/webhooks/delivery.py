@@ -0,0 +1,125 @@
+import hashlib
+import hmac
+import json
+import logging
+import time
+import urllib.error
+import urllib.request
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import close_old_connections
+from django.utils import timezone
+
+from crm_api.changes import FINISHED_TRANSACTIONS, format_cursor, parse_cursor
+from webhooks.models import OutboxMessage, WebhookEndpoint
+
+logger = logging.getLogger(__name__)
+
+SIGNATURE_HEADER = "X-Epic-Signature"
+TIMESTAMP_HEADER = "X-Epic-Timestamp"
+
+
+def sign(secret, timestamp, body):
+    """Gets the HMAC-SHA256 signature of a delivery, computed on "<timestamp>.<body>"."""
+    return hmac.new(secret.encode(), f"{timestamp}.".encode() + body, hashlib.sha256).hexdigest()
+
+
+def get_next_batch(endpoint, batch_size):
+    """Gets the messages following the endpoint's cursor, for the topics it is subscribed to."""
+    txid, message_id = parse_cursor(endpoint.cursor)
+    return list(
+        OutboxMessage.objects.filter(topic__in=endpoint.topics)
+        .extra(where=["(txid, id) > (%s, %s)", FINISHED_TRANSACTIONS], params=[txid, message_id])
+        .order_by("txid", "id")[:batch_size]
+    )
+
+
+def post_batch(endpoint, messages, timeout):
+    """Posts a batch of messages to an endpoint.
+
+    Returns None on success, otherwise the error and the delay asked by the endpoint through Retry-After, if any.
+    """
+    body = json.dumps({
+        "messages": [
+            {"id": message.id, "topic": message.topic, "date": message.date_created, "payload": message.payload}
+            for message in messages
+        ]
+    }, cls=DjangoJSONEncoder).encode()
+    timestamp = str(int(time.time()))
+    request = urllib.request.Request(endpoint.url, data=body, method="POST", headers={
+        "Content-Type": "application/json",
+        TIMESTAMP_HEADER: timestamp,
+        SIGNATURE_HEADER: f"sha256={sign(endpoint.secret, timestamp, body)}",
+    })
+    try:
+        with urllib.request.urlopen(request, timeout=timeout):
+            return None
+    except urllib.error.HTTPError as error:
+        retry_after = error.headers.get("Retry-After")
+        return f"HTTP {error.code}", int(retry_after) if retry_after and retry_after.isdigit() else None
+    except (urllib.error.URLError, OSError, ValueError) as error:
+        return str(error), None
+
+
+def deliver(endpoint_id):
+    """Delivers the next batch of messages of an endpoint, logging any error so that the worker keeps running.
+
+    Returns the number of delivered messages.
+    """
+    try:
+        return deliver_batch(endpoint_id)
+    except Exception:
+        logger.exception("Delivery to webhook %s aborted", endpoint_id)
+        return 0
+
+
+def deliver_batch(endpoint_id):
+    """Delivers the next batch of messages of an endpoint and updates its cursor or its backoff.
+
+    An endpoint failing is paused with an exponential backoff, or for the delay it asked for.
+    Returns the number of delivered messages.
+    """
+    config = settings.WEBHOOKS
+    close_old_connections()
+    endpoint = WebhookEndpoint.objects.filter(pk=endpoint_id).first()
+    if endpoint is None:
+        return 0
+    messages = get_next_batch(endpoint, config["BATCH_SIZE"])
+    if not messages:
+        return 0
+
+    failure = post_batch(endpoint, messages, config["TIMEOUT"])
+    if failure is None:
+        endpoint.cursor = format_cursor(messages[-1])
+        endpoint.failures = 0
+        endpoint.paused_until = None
+        endpoint.last_error = ""
+        endpoint.save(update_fields=["cursor", "failures", "paused_until", "last_error", "date_updated"])
+        return len(messages)
+
+    error, retry_after = failure
+    endpoint.failures += 1
+    delay = retry_after or min(config["RETRY_BACKOFF"] * 2 ** (endpoint.failures - 1), config["MAX_BACKOFF"])
+    endpoint.paused_until = timezone.now() + timedelta(seconds=delay)
+    endpoint.last_error = error
+    endpoint.save(update_fields=["failures", "paused_until", "last_error", "date_updated"])
+    logger.warning("Delivery to webhook %s failed (%s), paused for %s seconds", endpoint.id, error, delay)
+    return 0
+
+
+def get_due_endpoints():
+    """Gets the ids of the active endpoints which are not paused."""
+    now = timezone.now()
+    return list(
+        WebhookEndpoint.objects.filter(is_active=True)
+        .exclude(paused_until__gt=now)
+        .values_list("id", flat=True)
+    )
+
+
+def get_delivered_cursor():
+    """Gets the position up to which every active endpoint has received its messages, as (txid, id)."""
+    cursors = WebhookEndpoint.objects.filter(is_active=True).values_list("cursor", flat=True)
+    return min((parse_cursor(cursor) for cursor in cursors), default=None)
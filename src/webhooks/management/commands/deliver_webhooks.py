@@ -0,0 +1,39 @@
+import signal
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from webhooks.delivery import deliver, get_due_endpoints
+
+
+class Command(BaseCommand):
+    """Delivers the outbox messages to the webhook endpoints."""
+
+    help = "Delivers outbox messages in signed batches to the active webhook endpoints."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--concurrency", type=int, default=settings.WEBHOOKS["CONCURRENCY"])
+        parser.add_argument("--poll-interval", type=float, default=settings.WEBHOOKS["POLL_INTERVAL"])
+        parser.add_argument("--once", action="store_true", help="Stops when nothing is left to deliver.")
+
+    def handle(self, *args, **options):
+        """Delivers rounds of batches, one batch per due endpoint and round, until SIGINT/SIGTERM.
+
+        An endpoint never has more than one batch in flight, so its messages are delivered in order
+        and a slow endpoint only holds one thread of the pool.
+        """
+        stop = threading.Event()
+        signal.signal(signal.SIGINT, lambda signum, frame: stop.set())
+        signal.signal(signal.SIGTERM, lambda signum, frame: stop.set())
+
+        with ThreadPoolExecutor(max_workers=options["concurrency"]) as executor:
+            while not stop.is_set():
+                delivered = sum(executor.map(deliver, get_due_endpoints()))
+                if delivered:
+                    self.stdout.write(f"{delivered} messages delivered")
+                    continue
+                if options["once"]:
+                    break
+                stop.wait(options["poll_interval"])
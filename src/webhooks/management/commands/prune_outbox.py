@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from webhooks.delivery import get_delivered_cursor
+from webhooks.models import OutboxMessage
+
+
+class Command(BaseCommand):
+    """Deletes the outbox messages delivered to every active webhook endpoint."""
+
+    help = "Deletes outbox messages up to the lowest cursor of the active webhook endpoints."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=10000)
+
+    def handle(self, *args, **options):
+        """Deletes the messages batch by batch so that no long transaction is held.
+
+        Without any active endpoint, the messages are kept for the endpoints still to be registered or reactivated.
+        """
+        cursor = get_delivered_cursor()
+        deleted = 0
+        while cursor is not None:
+            ids = list(
+                OutboxMessage.objects.extra(where=["(txid, id) <= (%s, %s)"], params=cursor)
+                .values_list("id", flat=True)[:options["batch_size"]]
+            )
+            if not ids:
+                break
+            deleted += OutboxMessage.objects.filter(id__in=ids).delete()[0]
+        self.stdout.write(f"{deleted} outbox messages deleted")
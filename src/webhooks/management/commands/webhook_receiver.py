@@ -0,0 +1,55 @@
+import json
+import random
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.core.management.base import BaseCommand
+
+from webhooks.delivery import SIGNATURE_HEADER, TIMESTAMP_HEADER, sign
+
+
+class Command(BaseCommand):
+    """Runs a local stand-in receiver to test the webhook deliveries."""
+
+    help = "Runs a local HTTP server printing and checking the webhook deliveries it receives."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--port", type=int, default=8001)
+        parser.add_argument("--secret", default="", help="Secret of the endpoint, to check the signatures.")
+        parser.add_argument("--failure-rate", type=float, default=0, help="Share of deliveries answered with 503.")
+        parser.add_argument("--retry-after", type=int, default=0, help="Retry-After of the 503 answers.")
+
+    def handle(self, *args, **options):
+        command = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                if random.random() < options["failure_rate"]:
+                    self.send_response(503)
+                    if options["retry_after"]:
+                        self.send_header("Retry-After", str(options["retry_after"]))
+                    self.end_headers()
+                    command.stdout.write("Delivery refused (simulated failure)")
+                    return
+                if options["secret"]:
+                    expected = f"sha256={sign(options['secret'], self.headers.get(TIMESTAMP_HEADER, ''), body)}"
+                    if self.headers.get(SIGNATURE_HEADER) != expected:
+                        self.send_response(401)
+                        self.end_headers()
+                        command.stderr.write("Delivery with an invalid signature")
+                        return
+                messages = json.loads(body)["messages"]
+                for message in messages:
+                    command.stdout.write(json.dumps(message))
+                self.send_response(204)
+                self.end_headers()
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", options["port"]), Handler)
+        self.stdout.write(f"Listening on http://127.0.0.1:{options['port']}/")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            server.server_close()
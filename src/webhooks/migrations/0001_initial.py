@@ -0,0 +1,46 @@
+# Generated by Django 4.1.5 on 2026-10-19 00:45
+
+from django.db import migrations, models
+import webhooks.models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboxMessage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('txid', models.BigIntegerField()),
+                ('topic', models.CharField(max_length=50)),
+                ('payload', models.JSONField()),
+                ('date_created', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='WebhookEndpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('url', models.URLField()),
+                ('secret', models.CharField(help_text='Key of the HMAC-SHA256 signature of the deliveries.', max_length=100)),
+                ('topics', models.JSONField(default=webhooks.models.default_topics)),
+                ('is_active', models.BooleanField(default=True)),
+                ('cursor', models.CharField(blank=True, help_text='Position of the last delivered message.', max_length=50)),
+                ('failures', models.PositiveIntegerField(default=0)),
+                ('paused_until', models.DateTimeField(blank=True, null=True)),
+                ('last_error', models.TextField(blank=True)),
+                ('date_created', models.DateTimeField(auto_now_add=True)),
+                ('date_updated', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='outboxmessage',
+            index=models.Index(fields=['txid', 'id'], name='outbox_cursor_idx'),
+        ),
+    ]
@@ -0,0 +1,77 @@
+from django.db import migrations
+
+CREATE_FUNCTIONS = """
+CREATE OR REPLACE FUNCTION webhooks_contract_signed() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO webhooks_outboxmessage (txid, topic, payload, date_created)
+    VALUES (txid_current(), 'contract.signed', jsonb_build_object(
+        'id', NEW.id,
+        'client_id', NEW.client_id,
+        'sales_contact_id', NEW.sales_contact_id,
+        'amount', NEW.amount,
+        'signed', NEW.signed
+    ), now());
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION webhooks_event_status() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO webhooks_outboxmessage (txid, topic, payload, date_created)
+    VALUES (txid_current(), 'event.status', jsonb_build_object(
+        'id', NEW.id,
+        'client_id', NEW.client_id,
+        'contract_id', NEW.contract_id,
+        'support_contact_id', NEW.support_contact_id,
+        'previous_status', OLD.status,
+        'status', NEW.status
+    ), now());
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+CREATE_TRIGGERS = [
+    "CREATE TRIGGER crm_api_contract_signed_outbox AFTER UPDATE OF signed ON crm_api_contract "
+    "FOR EACH ROW WHEN (OLD.signed IS DISTINCT FROM NEW.signed) EXECUTE PROCEDURE webhooks_contract_signed()",
+    "CREATE TRIGGER crm_api_contract_created_signed_outbox AFTER INSERT ON crm_api_contract "
+    "FOR EACH ROW WHEN (NEW.signed) EXECUTE PROCEDURE webhooks_contract_signed()",
+    "CREATE TRIGGER crm_api_event_status_outbox AFTER UPDATE OF status ON crm_api_event "
+    "FOR EACH ROW WHEN (OLD.status IS DISTINCT FROM NEW.status) EXECUTE PROCEDURE webhooks_event_status()",
+]
+
+DROP = [
+    "DROP TRIGGER IF EXISTS crm_api_contract_signed_outbox ON crm_api_contract",
+    "DROP TRIGGER IF EXISTS crm_api_contract_created_signed_outbox ON crm_api_contract",
+    "DROP TRIGGER IF EXISTS crm_api_event_status_outbox ON crm_api_event",
+    "DROP FUNCTION IF EXISTS webhooks_contract_signed()",
+    "DROP FUNCTION IF EXISTS webhooks_event_status()",
+]
+
+
+def create_triggers(apps, schema_editor):
+    """Writes an outbox message in the transaction of every signature of a contract or event status change."""
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(CREATE_FUNCTIONS)
+    for statement in CREATE_TRIGGERS:
+        schema_editor.execute(statement)
+
+
+def drop_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for statement in DROP:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crm_api', '0008_changelog_triggers'),
+        ('webhooks', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_triggers, drop_triggers),
+    ]
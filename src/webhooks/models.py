@@ -0,0 +1,50 @@
+from django.db import models
+
+
+def default_topics():
+    return list(OutboxMessage.TOPICS)
+
+
+class OutboxMessage(models.Model):
+    """Stores a state change of a :model:`crm_api.Contract` or :model:`crm_api.Event` to be sent to webhooks.
+
+    Rows are written by database triggers, in the same transaction as the change itself.
+    """
+
+    TOPICS = ("contract.signed", "event.status")
+
+    txid = models.BigIntegerField()
+    topic = models.CharField(max_length=50)
+    payload = models.JSONField()
+    date_created = models.DateTimeField(auto_now_add=True)
+
+    objects = models.Manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["txid", "id"], name="outbox_cursor_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.id}. {self.topic}"
+
+
+class WebhookEndpoint(models.Model):
+    """Stores a downstream endpoint receiving batches of :model:`webhooks.OutboxMessage`, with its delivery state."""
+
+    name = models.CharField(max_length=100)
+    url = models.URLField()
+    secret = models.CharField(max_length=100, help_text="Key of the HMAC-SHA256 signature of the deliveries.")
+    topics = models.JSONField(default=default_topics)
+    is_active = models.BooleanField(default=True)
+    cursor = models.CharField(max_length=50, blank=True, help_text="Position of the last delivered message.")
+    failures = models.PositiveIntegerField(default=0)
+    paused_until = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    date_created = models.DateTimeField(auto_now_add=True)
+    date_updated = models.DateTimeField(auto_now=True)
+
+    objects = models.Manager()
+
+    def __str__(self):
+        return f"{self.id}. {self.name} - {self.url}"